@@ -0,0 +1,123 @@
+"""
+Benchmark: microphone capture hand-off.
+
+Replays stream callbacks for a long listening session (no audio device
+needed) through the previous hand-off, which copied every block into a
+bytes object on a queue and prepended the pre-roll block with '+', and
+through AudioCapture, which writes into a preallocated ring buffer and
+hands memoryviews to the consumer. Reports callback and consumer time per
+block, and the traced memory after the session when the consumer keeps up
+and when it stalls (e.g. during a long action).
+
+Usage:
+    python benchmarks/bench_capture.py --hours 1
+"""
+import argparse
+import queue
+import time
+import tracemalloc
+from typing import Dict
+
+import numpy as np
+
+from common import save_results
+
+from utils.capture import AudioCapture
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 1600
+
+
+def previous_handoff(blocks: int, block: np.ndarray, consume: bool) -> Dict[str, float]:
+    """Queue of bytes copies, as VoskASR._audio_callback did."""
+    audio_queue = queue.Queue()
+
+    def callback(indata, frames, time_info, status):
+        audio_queue.put(bytes(indata))
+
+    callback_seconds = consumer_seconds = 0.0
+    preroll = None
+    for index in range(blocks):
+        start = time.perf_counter()
+        callback(block, BLOCK_SIZE, None, None)
+        callback_seconds += time.perf_counter() - start
+        if consume:
+            start = time.perf_counter()
+            data = audio_queue.get_nowait()
+            if index % 2:
+                data = preroll + data
+            preroll = data
+            consumer_seconds += time.perf_counter() - start
+    return {'callback_us': callback_seconds / blocks * 1e6,
+            'consumer_us': consumer_seconds / blocks * 1e6,
+            'retained_bytes': _traced()}
+
+
+def ring_handoff(blocks: int, block: np.ndarray, consume: bool) -> Dict[str, float]:
+    """AudioCapture ring buffer with memoryview chunks."""
+    capture = AudioCapture(sample_rate=SAMPLE_RATE, block_size=BLOCK_SIZE)
+    callback_seconds = consumer_seconds = 0.0
+    position = 0
+    for index in range(blocks):
+        start = time.perf_counter()
+        capture._callback(block, BLOCK_SIZE, None, None)
+        callback_seconds += time.perf_counter() - start
+        if consume:
+            start = time.perf_counter()
+            # Pre-roll is just an earlier start position, not a copy
+            begin = position - BLOCK_SIZE if index % 2 else position
+            for chunk in capture.chunks(max(0, begin)):
+                pass
+            position = capture.position
+            consumer_seconds += time.perf_counter() - start
+    return {'callback_us': callback_seconds / blocks * 1e6,
+            'consumer_us': consumer_seconds / blocks * 1e6,
+            'retained_bytes': _traced()}
+
+
+def _traced() -> int:
+    """Bytes allocated since tracing started (0 when not tracing)."""
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+def retained(handoff, blocks: int, block: np.ndarray, consume: bool) -> int:
+    """Bytes the hand-off still holds at the end of a session."""
+    tracemalloc.start()
+    size = handoff(blocks, block, consume)['retained_bytes']
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Capture hand-off benchmark")
+    parser.add_argument("--hours", type=float, default=0.25,
+                        help="Simulated listening time")
+    parser.add_argument("--stall", type=float, default=60.0,
+                        help="Seconds the consumer stops reading in the stalled run")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    args = parser.parse_args()
+
+    blocks = int(args.hours * 3600 * SAMPLE_RATE / BLOCK_SIZE)
+    stalled_blocks = int(args.stall * SAMPLE_RATE / BLOCK_SIZE)
+    block = (np.random.default_rng(0).normal(0, 3000, (BLOCK_SIZE, 1))).astype(np.int16)
+
+    results = {}
+    for name, handoff in (('queue', previous_handoff), ('ring', ring_handoff)):
+        results[name] = handoff(blocks, block, consume=True)
+        results[name]['retained_bytes'] = retained(handoff, blocks, block, True)
+        results[name]['stalled_retained_bytes'] = retained(handoff, stalled_blocks, block, False)
+
+    print(f"{blocks} blocks ({args.hours} h of audio)")
+    print(f"{'hand-off':<10}{'callback us':>13}{'consumer us':>13}"
+          f"{'retained KB':>13}{f'{args.stall:.0f}s stall KB':>15}")
+    for name in ('queue', 'ring'):
+        row = results[name]
+        print(f"{name:<10}{row['callback_us']:>13.2f}{row['consumer_us']:>13.2f}"
+              f"{row['retained_bytes'] / 1024:>13.1f}{row['stalled_retained_bytes'] / 1024:>15.1f}")
+
+    save_results("capture", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Benchmark: file decoding real-time factor on hour-long recordings.
+
+Generates a long 16-bit WAV and decodes it through:
+
+- readframes: the previous path, wave.readframes() chunks of 4000 frames
+  (a new bytes object each) passed to AcceptWaveform, with every segment
+  parsed through Transcript.add
+- mmap/<frames>: VoskASR.recognize_from_file, which memory-maps the
+  sample data, feeds read-only views of --chunk-frames frames and keeps
+  the segments unparsed until the end
+
+and reports decode time over audio duration (RTF) for each path. The file
+is read right after being written, so it comes from the page cache in
+every run.
+
+With --model the recognizer is a real KaldiRecognizer. Without a model a
+stand-in returns Vosk-style results with word timings (and N-best
+alternatives with --alternatives) every few seconds of audio and spends
+--fake-rtf of the audio duration decoding; the default 0 isolates the
+file reading and result handling overhead. The stand-in has no libvosk
+handle, so accept_waveform copies its views into bytes, which real
+recognizers are spared.
+
+Usage:
+    python benchmarks/bench_file.py --minutes 60
+    python benchmarks/bench_file.py --model models/vosk-model-small-es-0.42 --minutes 60
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import wave
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from common import Timer, save_results
+
+from asr.alternatives import Transcript
+
+SAMPLE_RATE = 16000
+WORDS = ['enciende', 'la', 'luz', 'de', 'la', 'cocina', 'por', 'favor',
+         'y', 'apaga', 'la', 'del', 'salón', 'qué', 'hora', 'es']
+
+
+def generate_wav(path: str, minutes: float, sample_rate: int = SAMPLE_RATE, seed: int = 0):
+    """
+    Write a long mono WAV of noise with speech-like bursts, a minute at a time.
+
+    Args:
+        path: Output file
+        minutes: Duration in minutes
+        sample_rate: Sample rate in Hz
+        seed: Random seed
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(sample_rate * 60) / sample_rate
+    envelope = np.abs(np.sin(np.pi * 2 * t)) * (np.sin(np.pi * t / 5) > 0)
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        remaining = int(minutes * 60 * sample_rate)
+        while remaining > 0:
+            count = min(remaining, len(t))
+            pitch = rng.uniform(100, 220)
+            voice = 6000 * envelope[:count] * np.sin(2 * np.pi * pitch * t[:count])
+            audio = voice + rng.normal(0, 200, count)
+            wf.writeframes(np.clip(audio, -32768, 32767).astype('<i2').tobytes())
+            remaining -= count
+
+
+def vosk_result(words: List[str], start: float, alternatives: int) -> str:
+    """Format a segment the way Vosk does with SetWords (and N-best)."""
+    entries = [{'conf': 0.9, 'end': start + 0.3 * (i + 1), 'start': start + 0.3 * i, 'word': word}
+               for i, word in enumerate(words)]
+    text = ' '.join(words)
+    if alternatives:
+        return json.dumps({'alternatives': [
+            {'confidence': 300.0 - 10 * rank, 'result': entries, 'text': text}
+            for rank in range(alternatives)
+        ]}, ensure_ascii=False, indent=2)
+    return json.dumps({'result': entries, 'text': text}, ensure_ascii=False, indent=2)
+
+
+class SegmentRecognizer:
+    """KaldiRecognizer stand-in ending a segment every few seconds of audio."""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, rtf: float = 0.0,
+                 segment_seconds: float = 5.0, alternatives: int = 0):
+        self.sample_rate = sample_rate
+        self.rtf = rtf
+        self.segment_bytes = int(segment_seconds * sample_rate * 2)
+        self.alternatives = alternatives
+        self.calls = 0
+        self.Reset()
+
+    def Reset(self):
+        """Drop any buffered audio."""
+        self._pending = 0
+        self._segments = 0
+
+    def SetWords(self, enabled: bool):
+        """Accepted for API compatibility."""
+
+    def SetMaxAlternatives(self, count: int):
+        """Accepted for API compatibility."""
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        """Consume audio; True when a segment ends."""
+        self.calls += 1
+        if self.rtf:
+            until = time.process_time() + len(data) / 2 / self.sample_rate * self.rtf
+            while time.process_time() < until:
+                pass
+        self._pending += len(data)
+        if self._pending >= self.segment_bytes:
+            self._pending = 0
+            return True
+        return False
+
+    def _result(self) -> str:
+        self._segments += 1
+        return vosk_result(WORDS, self._segments * 5.0, self.alternatives)
+
+    def Result(self) -> str:
+        return self._result()
+
+    def FinalResult(self) -> str:
+        return self._result() if self._pending else '{"text" : ""}'
+
+
+def decode_readframes(path: str, recognizer, chunk_frames: int = 4000) -> str:
+    """The previous file path: readframes chunks and parsed segments."""
+    transcript = Transcript()
+    with wave.open(path, "rb") as wf:
+        while True:
+            data = wf.readframes(chunk_frames)
+            if len(data) == 0:
+                break
+            if recognizer.AcceptWaveform(data):
+                transcript.add(recognizer.Result())
+        transcript.add(recognizer.FinalResult())
+    return transcript.text
+
+
+def best_time(decode, runs: int) -> float:
+    """Fastest of several timed decodes."""
+    best = None
+    for _ in range(max(1, runs)):
+        with Timer() as timer:
+            decode()
+        best = timer.elapsed if best is None else min(best, timer.elapsed)
+    return best
+
+
+def load_asr(model_path: Optional[str], factory):
+    """VoskASR with a real model, or with the stand-in in its pool."""
+    from asr.recognizer_pool import RecognizerPool
+    from asr.vosk_asr import VoskASR
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        asr = VoskASR(model_path=model_path or 'missing-model')
+    if asr.model is None:
+        asr.pool = RecognizerPool(None, asr.sample_rate, max_size=1, factory=factory)
+    return asr
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="File decoding RTF benchmark")
+    parser.add_argument("--minutes", type=float, default=60.0, help="Recording length")
+    parser.add_argument("--chunk-frames", type=int, nargs='+', default=[4000, 16000, 64000],
+                        help="Chunk sizes of the mmap path")
+    parser.add_argument("--model", default=None, help="Path to Vosk model directory")
+    parser.add_argument("--alternatives", type=int, default=0,
+                        help="N-best hypotheses per segment")
+    parser.add_argument("--runs", type=int, default=3, help="Decodes per path (fastest kept)")
+    parser.add_argument("--fake-rtf", type=float, default=0.0,
+                        help="Decoding cost of the stand-in recognizer (no model)")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    args = parser.parse_args()
+
+    def factory():
+        return SegmentRecognizer(rtf=args.fake_rtf, alternatives=args.alternatives)
+
+    asr = load_asr(args.model if args.model and os.path.isdir(args.model) else None, factory)
+    label = 'vosk' if asr.model is not None else 'simulated'
+    asr.max_alternatives = args.alternatives
+    audio_seconds = args.minutes * 60
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "recording.wav")
+        generate_wav(path, args.minutes)
+
+        def readframes():
+            with asr.pool.session() as recognizer:
+                decode_readframes(path, recognizer)
+
+        results['readframes'] = {'decode_seconds': best_time(readframes, args.runs)}
+        for frames in args.chunk_frames:
+            asr.file_chunk_frames = frames
+            seconds = best_time(lambda: asr.recognize_from_file(path), args.runs)
+            results[f'mmap/{frames}'] = {'decode_seconds': seconds}
+
+    baseline = results['readframes']['decode_seconds']
+    print(f"{args.minutes:.0f} min recording, {label} recognizer, "
+          f"{args.alternatives} alternatives")
+    print(f"{'path':<14}{'decode s':>10}{'RTF':>10}{'speedup':>10}")
+    for name, row in results.items():
+        row['rtf'] = row['decode_seconds'] / audio_seconds
+        row['speedup'] = baseline / row['decode_seconds']
+        print(f"{name:<14}{row['decode_seconds']:>10.2f}{row['rtf']:>10.5f}"
+              f"{row['speedup']:>9.1f}x")
+
+    save_results("file", {'recognizer': label, 'audio_seconds': audio_seconds,
+                          'alternatives': args.alternatives, 'paths': results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: grammar-constrained vs open-vocabulary decoding.
+
+Decodes a directory of mono 16 kHz WAV files in both modes and compares
+real-time factor, word error rate and intent accuracy. Each WAV needs a
+sidecar .txt file with the reference transcript (e.g. luz.wav + luz.txt).
+
+Usage:
+    python benchmarks/bench_grammar.py examples/commands \
+        --model models/vosk-model-small-es-0.42
+"""
+import argparse
+import sys
+import wave
+from pathlib import Path
+
+from common import Timer, save_results, word_error_rate
+
+from asr.vosk_asr import VoskASR
+from nlu.matcher import match_intent
+
+
+def load_corpus(directory: str) -> list:
+    """
+    Load WAV files with their reference transcripts.
+    
+    Args:
+        directory: Directory with .wav and .txt pairs
+        
+    Returns:
+        List of (wav path, reference text, duration in seconds)
+    """
+    corpus = []
+    for wav_path in sorted(Path(directory).glob("*.wav")):
+        txt_path = wav_path.with_suffix(".txt")
+        if not txt_path.exists():
+            print(f"Skipping {wav_path.name}: no reference transcript")
+            continue
+        with wave.open(str(wav_path), "rb") as wf:
+            duration = wf.getnframes() / wf.getframerate()
+        reference = txt_path.read_text(encoding='utf-8').strip()
+        corpus.append((str(wav_path), reference, duration))
+    return corpus
+
+
+def run_mode(asr: VoskASR, corpus: list, grammar: bool) -> dict:
+    """
+    Decode the corpus in one mode.
+    
+    Args:
+        asr: Loaded VoskASR
+        corpus: Output of load_corpus
+        grammar: Use grammar-constrained decoding
+        
+    Returns:
+        Aggregated timing and accuracy figures
+    """
+    asr.set_grammar_mode(grammar)
+    
+    audio_seconds = 0.0
+    decode_seconds = 0.0
+    wer_total = 0.0
+    intents_ok = 0
+    
+    for wav_path, reference, duration in corpus:
+        with Timer() as timer:
+            hypothesis = asr.recognize_from_file(wav_path) or ''
+        audio_seconds += duration
+        decode_seconds += timer.elapsed
+        wer_total += word_error_rate(reference, hypothesis)
+        if match_intent(hypothesis)['intent'] == match_intent(reference)['intent']:
+            intents_ok += 1
+    
+    return {
+        'files': len(corpus),
+        'audio_seconds': audio_seconds,
+        'decode_seconds': decode_seconds,
+        'rtf': decode_seconds / audio_seconds if audio_seconds else 0.0,
+        'wer': wer_total / len(corpus),
+        'intent_accuracy': intents_ok / len(corpus)
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", help="Directory with .wav/.txt pairs")
+    parser.add_argument("--model", required=True, help="Path to Vosk model directory")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    args = parser.parse_args()
+    
+    corpus = load_corpus(args.directory)
+    if not corpus:
+        print("No WAV files with reference transcripts found")
+        sys.exit(1)
+    
+    asr = VoskASR(model_path=args.model)
+    if asr.model is None:
+        sys.exit(1)
+    
+    results = {
+        'open_vocabulary': run_mode(asr, corpus, grammar=False),
+        'grammar': run_mode(asr, corpus, grammar=True)
+    }
+    open_rtf = results['open_vocabulary']['rtf']
+    grammar_rtf = results['grammar']['rtf']
+    results['speedup'] = open_rtf / grammar_rtf if grammar_rtf else 0.0
+    
+    print(f"{'mode':<18}{'RTF':>8}{'WER':>8}{'intent acc':>12}")
+    for mode in ('open_vocabulary', 'grammar'):
+        r = results[mode]
+        print(f"{mode:<18}{r['rtf']:>8.3f}{r['wer']:>8.2%}{r['intent_accuracy']:>12.2%}")
+    print(f"Grammar decoding speedup: {results['speedup']:.2f}x")
+    
+    save_results("grammar", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
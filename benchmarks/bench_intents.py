@@ -0,0 +1,177 @@
+"""
+Benchmark: intent matching latency as the number of intents grows.
+
+Registers synthetic intents (two literal phrase patterns each, plus a
+regex-only pattern for a share of them, 1% by default) and times
+match_intent-style lookups with the 'regex' and 'index' registry backends
+at every size, after one warm-up pass. The phrase index keeps the index
+backend nearly flat from 10 to 10,000 intents; what growth remains comes
+from the regex-only patterns (try --regex-share 0).
+
+Usage:
+    python benchmarks/bench_intents.py --sizes 10 100 1000 10000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import List, Tuple
+
+from common import Timer, percentile, save_results
+
+from nlu.registry import IntentRegistry
+
+SYLLABLES = ['ba', 'ce', 'di', 'fo', 'gu', 'la', 'me', 'ni', 'po', 'ru',
+             'sa', 'te', 'vi', 'zo', 'ca', 'del', 'mon', 'tar', 'sin', 'pel']
+
+
+def make_word(rng: random.Random) -> str:
+    """Random pseudo-word of two or three syllables."""
+    return ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 3)))
+
+
+def make_intents(count: int, regex_share: float = 0.01,
+                 seed: int = 0) -> List[Tuple[str, List[str], List[str]]]:
+    """
+    Build synthetic intents.
+
+    Args:
+        count: Number of intents
+        regex_share: Fraction of intents with an extra regex-only pattern
+        seed: Random seed
+
+    Returns:
+        List of (name, patterns, phrases)
+    """
+    rng = random.Random(seed)
+    intents = []
+    for i in range(count):
+        phrases = [' '.join(make_word(rng) for _ in range(rng.randint(2, 3)))
+                   for _ in range(4)]
+        patterns = [
+            r'\b(' + '|'.join(phrases[:2]) + r')\b',
+            r'\b(' + '|'.join(phrases[2:]) + r')\b',
+        ]
+        if rng.random() < regex_share:
+            patterns.append(r'\b' + make_word(rng) + r'\d+')
+        intents.append((f"intent_{i}", patterns, phrases))
+    return intents
+
+
+def make_utterances(intents: list, count: int, seed: int = 1) -> List[str]:
+    """
+    Build utterances: two thirds contain a phrase of a random intent.
+
+    Args:
+        intents: Output of make_intents
+        count: Number of utterances
+        seed: Random seed
+
+    Returns:
+        List of utterances
+    """
+    rng = random.Random(seed)
+    utterances = []
+    for i in range(count):
+        words = [make_word(rng) for _ in range(rng.randint(2, 6))]
+        if i % 3 != 2:
+            _, _, phrases = rng.choice(intents)
+            words.insert(rng.randint(0, len(words)), rng.choice(phrases))
+        utterances.append(' '.join(words))
+    return utterances
+
+
+def write_intents(intents: list, path: str):
+    """Write intents as a registry definition file."""
+    data = {'intents': [{'name': name, 'patterns': patterns, 'phrases': phrases}
+                        for name, patterns, phrases in intents]}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def measure(backend: str, intents_file: str, utterances: List[str]) -> dict:
+    """
+    Time registry loading and per-utterance matching.
+
+    Args:
+        backend: Registry backend
+        intents_file: Definition file written by write_intents
+        utterances: Texts to match
+
+    Returns:
+        Load time in seconds and per-match latency in microseconds
+    """
+    with Timer() as build:
+        registry = IntentRegistry(intents_file, reload_interval=None, backend=backend)
+
+    # Warm-up: compiles the lazily built priority regexes
+    for text in utterances:
+        registry.match(text)
+
+    latencies = []
+    matched = 0
+    clock = time.perf_counter
+    for text in utterances:
+        start = clock()
+        if registry.match(text) is not None:
+            matched += 1
+        latencies.append((clock() - start) * 1e6)
+
+    return {
+        'build_seconds': build.elapsed,
+        'latency_us': {
+            'mean': sum(latencies) / len(latencies),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99)
+        },
+        'matched_ratio': matched / len(utterances)
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Intent matching scalability benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="Numbers of intents to test")
+    parser.add_argument("--backends", nargs="+", default=list(IntentRegistry.BACKENDS),
+                        choices=IntentRegistry.BACKENDS, help="Backends to compare")
+    parser.add_argument("--utterances", type=int, default=3000,
+                        help="Utterances matched per size")
+    parser.add_argument("--regex-share", type=float, default=0.01,
+                        help="Fraction of intents with a regex-only pattern")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    args = parser.parse_args()
+
+    results = {backend: {} for backend in args.backends}
+    print(f"{'intents':>8}" + ''.join(f"{backend + ' p50':>14}{backend + ' p95':>14}"
+                                      for backend in args.backends))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            intents = make_intents(size, args.regex_share)
+            utterances = make_utterances(intents, args.utterances)
+            intents_file = os.path.join(directory, f"intents_{size}.json")
+            write_intents(intents, intents_file)
+
+            row = f"{size:>8}"
+            for backend in args.backends:
+                result = measure(backend, intents_file, utterances)
+                results[backend][str(size)] = result
+                row += (f"{result['latency_us']['p50']:>11.1f} us"
+                        f"{result['latency_us']['p95']:>11.1f} us")
+            print(row)
+
+    for backend in args.backends:
+        sizes = results[backend]
+        smallest, largest = str(min(args.sizes)), str(max(args.sizes))
+        growth = sizes[largest]['latency_us']['p50'] / sizes[smallest]['latency_us']['p50']
+        results[backend]['p50_growth'] = growth
+        print(f"{backend}: p50 latency x{growth:.1f} from {smallest} to {largest} intents")
+
+    save_results("intents", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Benchmark: parsing Vosk results per utterance.
+
+Replays synthetic recognizer output (Vosk-formatted Result()/FinalResult()
+segments with word data, plus the PartialResult() polled after every
+audio block) through the previous handling, a json.loads() of every string
+keeping only the text, and through RecognitionResult, which parses lazily
+and stores word data as array columns. Reports time and peak traced
+allocation per utterance, and the memory retained when the word timings
+of many utterances are kept.
+
+Usage:
+    python benchmarks/bench_results.py --utterances 2000
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from common import save_results
+
+from asr.result import RecognitionResult, partial_text
+
+WORDS = ['enciende', 'apaga', 'la', 'luz', 'de', 'cocina', 'qué', 'hora', 'es',
+         'pon', 'un', 'temporizador', 'veinte', 'minutos', 'salón', 'por', 'favor']
+
+
+def vosk_result(words: List[str], start: float, rng: random.Random) -> str:
+    """Format a segment the way Vosk prints it (sorted keys, ' : ')."""
+    items = []
+    for word in words:
+        end = start + rng.uniform(0.15, 0.6)
+        items.append('{\n      "conf" : %f,\n      "end" : %f,\n      "start" : %f,\n'
+                     '      "word" : "%s"\n    }' % (rng.uniform(0.4, 1.0), end, start, word))
+        start = end + rng.uniform(0.0, 0.2)
+    return '{\n  "result" : [%s],\n  "text" : "%s"\n}' % (', '.join(items), ' '.join(words))
+
+
+def make_utterances(count: int, segments: int = 2, blocks: int = 30,
+                    seed: int = 0) -> List[Tuple[List[str], List[str]]]:
+    """
+    Build recognizer output for many utterances.
+
+    Args:
+        count: Number of utterances
+        segments: Result() segments per utterance (the last is FinalResult())
+        blocks: Audio blocks per utterance, each polled with PartialResult()
+        seed: Random seed
+
+    Returns:
+        List of (segment JSON strings, partial JSON strings)
+    """
+    rng = random.Random(seed)
+    utterances = []
+    for _ in range(count):
+        raws = []
+        start = 0.0
+        spoken: List[str] = []
+        for _ in range(segments):
+            words = rng.choices(WORDS, k=rng.randint(3, 8))
+            raws.append(vosk_result(words, start, rng))
+            spoken.extend(words)
+            start += 3.0
+        # The partial hypothesis grows a word every few blocks
+        partials = []
+        for block in range(blocks):
+            shown = spoken[:block * len(spoken) // blocks]
+            partials.append('{\n  "partial" : "%s"\n}' % ' '.join(shown))
+        utterances.append((raws, partials))
+    return utterances
+
+
+def previous_handling(raws: List[str], partials: List[str]) -> str:
+    """Parse everything with json.loads and keep the text (before RecognitionResult)."""
+    last = ''
+    for raw in partials:
+        partial = json.loads(raw).get('partial', '')
+        if partial and partial != last:
+            last = partial
+    texts = []
+    for raw in raws:
+        result = json.loads(raw)
+        if result.get('text'):
+            texts.append(result['text'])
+    return ' '.join(texts).strip()
+
+
+def lazy_partials(partials: List[str]):
+    """Compare raw partials and only parse the ones that changed."""
+    last = ''
+    for raw in partials:
+        if raw != last:
+            last = raw
+            partial_text(raw)
+
+
+def lazy_text(raws: List[str], partials: List[str]) -> str:
+    """Read only the text of the result."""
+    lazy_partials(partials)
+    return RecognitionResult(raws).text
+
+
+def lazy_words(raws: List[str], partials: List[str]) -> RecognitionResult:
+    """Read the text and decode the word columns."""
+    lazy_partials(partials)
+    result = RecognitionResult(raws)
+    result.text
+    result.conf
+    return result
+
+
+def previous_words(raws: List[str], partials: List[str]) -> list:
+    """json.loads() keeping the per-word dicts."""
+    previous_handling(raws, partials)
+    return [item for raw in raws for item in json.loads(raw).get('result', [])]
+
+
+def measure(handler: Callable, utterances: list, rounds: int = 3) -> Dict[str, float]:
+    """
+    Time a handler and trace its peak allocation per utterance.
+
+    Args:
+        handler: Function of (segments, partials)
+        utterances: Output of make_utterances
+        rounds: Timed passes (best is kept)
+
+    Returns:
+        Microseconds and peak traced bytes per utterance
+    """
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for raws, partials in utterances:
+            handler(raws, partials)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peaks = []
+    tracemalloc.start()
+    for raws, partials in utterances[:200]:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        handler(raws, partials)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return {
+        'us_per_utterance': best / len(utterances) * 1e6,
+        'peak_bytes_per_utterance': sum(peaks) / len(peaks)
+    }
+
+
+def retained(utterances: list) -> Dict[str, float]:
+    """
+    Memory kept per utterance when its word data is stored.
+
+    Args:
+        utterances: Output of make_utterances
+
+    Returns:
+        Bytes per utterance for per-word dicts and for RecognitionResult
+    """
+    sizes = {}
+    for name in ('dicts', 'columns'):
+        tracemalloc.start()
+        if name == 'dicts':
+            kept = [[item for raw in raws for item in json.loads(raw).get('result', [])]
+                    for raws, _ in utterances]
+        else:
+            kept = []
+            for raws, _ in utterances:
+                result = RecognitionResult(raws)
+                result.conf
+                kept.append(result)
+        sizes[name] = tracemalloc.get_traced_memory()[0] / len(utterances)
+        tracemalloc.stop()
+        del kept
+    return sizes
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Recognition result parsing benchmark")
+    parser.add_argument("--utterances", type=int, default=2000,
+                        help="Synthetic utterances replayed")
+    parser.add_argument("--segments", type=int, default=2,
+                        help="Result() segments per utterance")
+    parser.add_argument("--blocks", type=int, default=30,
+                        help="PartialResult() polls per utterance")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    args = parser.parse_args()
+
+    utterances = make_utterances(args.utterances, args.segments, args.blocks)
+    handlers = {
+        'json_text': previous_handling,
+        'lazy_text': lazy_text,
+        'json_words': previous_words,
+        'lazy_words': lazy_words,
+    }
+    results = {name: measure(handler, utterances) for name, handler in handlers.items()}
+    results['retained_bytes_per_utterance'] = retained(utterances)
+
+    print(f"{'handler':<12}{'us/utterance':>14}{'peak bytes':>14}")
+    for name in handlers:
+        print(f"{name:<12}{results[name]['us_per_utterance']:>14.1f}"
+              f"{results[name]['peak_bytes_per_utterance']:>14.0f}")
+    kept = results['retained_bytes_per_utterance']
+    print(f"Retained word data: {kept['dicts']:.0f} bytes/utterance as dicts, "
+          f"{kept['columns']:.0f} as RecognitionResult")
+    for kind in ('text', 'words'):
+        speedup = (results[f'json_{kind}']['us_per_utterance']
+                   / results[f'lazy_{kind}']['us_per_utterance'])
+        results[f'{kind}_speedup'] = speedup
+        print(f"{kind}: x{speedup:.1f} faster")
+
+    save_results("results", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: startup time of the voice recognizer.
+
+Each measurement runs in a fresh interpreter, so module imports and model
+loading are included:
+
+- text_only: import main, build a text-only VoiceRecognizer and answer one
+  process_text() call (the NLU worker / CI path)
+- full: the same plus preload(), which imports vosk, sounddevice and
+  pyttsx3, loads the acoustic model and initializes the TTS driver
+
+Usage:
+    python benchmarks/bench_startup.py --model models/vosk-model-small-es-0.42
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+from common import SRC_DIR, Timer, save_results
+
+SCRIPTS = {
+    'text_only': (
+        "import main; "
+        "r = main.VoiceRecognizer(model_path={model!r}, text_only=True); "
+        "r.process_text('hola')"
+    ),
+    'full': (
+        "import main; "
+        "r = main.VoiceRecognizer(model_path={model!r}); "
+        "r.preload(); "
+        "r.process_text('hola')"
+    ),
+}
+
+
+def measure(script: str, runs: int) -> dict:
+    """
+    Time a startup script in fresh interpreters.
+    
+    Args:
+        script: Python code to run
+        runs: Number of runs
+        
+    Returns:
+        Dictionary with per-run times and their mean/median/min
+    """
+    times = []
+    for _ in range(runs):
+        with Timer() as timer:
+            subprocess.run(
+                [sys.executable, "-c", script],
+                cwd=str(SRC_DIR),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False
+            )
+        times.append(timer.elapsed)
+    return {
+        'runs': times,
+        'mean': statistics.mean(times),
+        'median': statistics.median(times),
+        'min': min(times)
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Startup time benchmark")
+    parser.add_argument("--model", default="../models/vosk-model-small-es-0.42",
+                        help="Path to Vosk model directory")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per mode")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    args = parser.parse_args()
+    
+    results = {}
+    for mode, script in SCRIPTS.items():
+        results[mode] = measure(script.format(model=args.model), args.runs)
+        print(f"{mode:<10} median {results[mode]['median'] * 1000:8.1f} ms")
+    
+    results['ratio'] = results['text_only']['median'] / results['full']['median']
+    print(f"Text-only startup takes {results['ratio']:.1%} of full startup")
+    
+    save_results("startup", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
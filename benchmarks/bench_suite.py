@@ -0,0 +1,471 @@
+"""
+Benchmark suite: NLU throughput, ASR real-time factor and end-to-end latency.
+
+- nlu: match_intent() calls per second and per-call latency over a large
+  synthetic corpus of utterances (matching and non-matching), and
+  extract_entities() latency
+- asr: VoskASR.recognize_from_file() real-time factor on generated WAVs.
+  Without a Vosk model a FakeRecognizer stands in for KaldiRecognizer, so
+  the file reading, pooling and result handling are still measured
+  (results are tagged with the recognizer used)
+- e2e: VoiceRecognizer.process_text() latency, text to response
+
+Results are saved as JSON; pass --baseline with an earlier results file to
+flag regressions (exit status 1 when a tracked metric got worse by more
+than --tolerance).
+
+Usage:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --model models/vosk-model-small-es-0.42 \
+        --baseline benchmarks/results/suite-baseline.json
+"""
+import argparse
+import array
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import wave
+from typing import Dict, List, Optional
+
+from common import Timer, compare_results, load_results, lookup, percentile, save_results
+
+from nlu.matcher import (INTENT_PHRASES, extract_entities, match_intent, match_intents,
+                         set_cache_size)
+
+SECTIONS = ('nlu', 'asr', 'e2e')
+
+# Metrics compared against the baseline and which direction is better
+TRACKED_METRICS = {
+    'nlu.calls_per_second': 'higher',
+    'nlu.latency_us.p95': 'lower',
+    'nlu.batch_calls_per_second': 'higher',
+    'nlu.entities_latency_us.p95': 'lower',
+    'asr.rtf': 'lower',
+    'e2e.latency_ms.p50': 'lower',
+    'e2e.latency_ms.p95': 'lower',
+}
+
+FILLER_WORDS = [
+    'oye', 'por favor', 'ahora', 'ya', 'gracias', 'rápido', 'un momento',
+    'asistente', 'please', 'now', 'en la cocina', 'otra vez'
+]
+
+OTHER_WORDS = [
+    'pon', 'música', 'abre', 'la', 'puerta', 'cuál', 'es', 'el', 'clima',
+    'mañana', 'recuérdame', 'comprar', 'pan', 'leche', 'llama', 'a', 'mamá',
+    'sube', 'volumen', 'baja', 'temperatura', 'del', 'salón', 'cierra',
+    'persianas', 'what', 'is', 'weather', 'play', 'some', 'jazz'
+]
+
+
+def build_corpus(size: int = 10000, seed: int = 0) -> List[str]:
+    """
+    Build a synthetic utterance corpus.
+
+    About two thirds of the utterances contain an intent phrase wrapped in
+    filler words; the rest are out-of-domain sentences that match nothing
+    (the worst case for a first-match matcher).
+
+    Args:
+        size: Number of utterances
+        seed: Random seed (the corpus is deterministic for a given seed)
+
+    Returns:
+        List of utterances
+    """
+    rng = random.Random(seed)
+    phrases = [phrase for values in INTENT_PHRASES.values() for phrase in values]
+
+    corpus = []
+    for i in range(size):
+        if i % 3 == 2:
+            words = rng.choices(OTHER_WORDS, k=rng.randint(3, 12))
+        else:
+            words = [rng.choice(phrases)]
+            if rng.random() < 0.6:
+                words.insert(0, rng.choice(FILLER_WORDS))
+            if rng.random() < 0.4:
+                words.append(rng.choice(FILLER_WORDS))
+        corpus.append(' '.join(words))
+    return corpus
+
+
+def bench_nlu(corpus: List[str], rounds: int = 3) -> dict:
+    """
+    Measure match_intent throughput and per-call latency.
+
+    Args:
+        corpus: Utterances to match
+        rounds: Passes over the corpus for the throughput figure (best is kept)
+
+    Returns:
+        Calls per second, per-call latency percentiles in microseconds,
+        log-replay throughput of match_intent and of the cached
+        match_intents batch API, entity extraction latency, and the share
+        of utterances that matched an intent
+    """
+    best = None
+    for _ in range(rounds):
+        with Timer() as timer:
+            for text in corpus:
+                match_intent(text)
+        best = timer.elapsed if best is None else min(best, timer.elapsed)
+
+    latencies = []
+    matched = 0
+    clock = time.perf_counter
+    for text in corpus:
+        start = clock()
+        result = match_intent(text)
+        latencies.append((clock() - start) * 1e6)
+        if result['intent'] != 'unknown':
+            matched += 1
+
+    entity_latencies = []
+    for text in corpus:
+        start = clock()
+        extract_entities(text)
+        entity_latencies.append((clock() - start) * 1e6)
+
+    # Log replay: 1,000 distinct utterances, each repeated many times,
+    # through match_intent and through the cached batch API
+    replay = random.Random(0).choices(corpus[:1000], k=len(corpus))
+    with Timer() as single:
+        for text in replay:
+            match_intent(text)
+    set_cache_size(4096)
+    with Timer() as batch:
+        for _ in match_intents(replay):
+            pass
+
+    return {
+        'utterances': len(corpus),
+        'calls_per_second': len(corpus) / best if best else 0.0,
+        'replay_calls_per_second': len(replay) / single.elapsed if single.elapsed else 0.0,
+        'batch_calls_per_second': len(replay) / batch.elapsed if batch.elapsed else 0.0,
+        'latency_us': summarize(latencies),
+        'entities_latency_us': summarize(entity_latencies),
+        'matched_ratio': matched / len(corpus) if corpus else 0.0
+    }
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """
+    Summarize latency samples.
+
+    Args:
+        values: Samples
+
+    Returns:
+        Mean, p50, p95, p99 and max
+    """
+    return {
+        'mean': sum(values) / len(values) if values else 0.0,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else 0.0
+    }
+
+
+def generate_wav(path: str, duration: float, sample_rate: int = 16000, seed: int = 0):
+    """
+    Write a mono 16-bit WAV with speech-like audio.
+
+    The signal alternates bursts of amplitude-modulated harmonics (syllables)
+    with low-level noise (pauses), so endpointing and decoding see both.
+
+    Args:
+        path: Output file
+        duration: Length in seconds
+        sample_rate: Sample rate (Hz)
+        seed: Random seed for the noise
+    """
+    rng = random.Random(seed)
+    samples = array.array('h')
+    total = int(duration * sample_rate)
+    syllable = int(0.25 * sample_rate)
+
+    for start in range(0, total, syllable):
+        length = min(syllable, total - start)
+        voiced = rng.random() < 0.7
+        pitch = rng.uniform(100, 220)
+        for n in range(length):
+            noise = rng.gauss(0, 200)
+            if voiced:
+                t = (start + n) / sample_rate
+                envelope = math.sin(math.pi * n / syllable)
+                tone = sum(math.sin(2 * math.pi * pitch * k * t) / k for k in (1, 2, 3))
+                value = 6000 * envelope * tone + noise
+            else:
+                value = noise
+            samples.append(max(-32768, min(32767, int(value))))
+
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.tobytes())
+
+
+class FakeRecognizer:
+    """
+    Stand-in for KaldiRecognizer when no Vosk model is available.
+
+    Emits a canned phrase for every second of audio and spends a
+    configurable fraction of the audio duration "decoding", so the
+    surrounding code paths can be timed without a model.
+    """
+
+    PHRASES = ['enciende la luz', 'qué hora es', 'apaga la luz', 'hola']
+
+    def __init__(self, sample_rate: int = 16000, rtf: float = 0.05):
+        """
+        Initialize the fake recognizer.
+
+        Args:
+            sample_rate: Audio sample rate (Hz)
+            rtf: Simulated real-time factor (decode time / audio time)
+        """
+        self.sample_rate = sample_rate
+        self.rtf = rtf
+        self.Reset()
+
+    def Reset(self):
+        """Drop any buffered audio."""
+        self._pending = 0
+        self._utterances = 0
+
+    def SetWords(self, enabled: bool):
+        """Accepted for API compatibility."""
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        """Consume audio; returns True when an utterance is complete."""
+        seconds = len(data) / 2 / self.sample_rate
+        if self.rtf:
+            time.sleep(seconds * self.rtf)
+        self._pending += len(data)
+        if self._pending >= 2 * self.sample_rate:
+            self._pending = 0
+            return True
+        return False
+
+    def _text(self) -> str:
+        text = self.PHRASES[self._utterances % len(self.PHRASES)]
+        self._utterances += 1
+        return text
+
+    def Result(self) -> str:
+        """Result of the completed utterance."""
+        return json.dumps({'text': self._text()})
+
+    def PartialResult(self) -> str:
+        """Partial hypothesis (always empty)."""
+        return json.dumps({'partial': ''})
+
+    def FinalResult(self) -> str:
+        """Flush the remaining audio."""
+        text = self._text() if self._pending else ''
+        self._pending = 0
+        return json.dumps({'text': text})
+
+
+def load_asr(model_path: Optional[str], fake_rtf: float):
+    """
+    Build a VoskASR, falling back to FakeRecognizer without a model.
+
+    Args:
+        model_path: Path to Vosk model directory (None forces the fake)
+        fake_rtf: Simulated real-time factor of the fake recognizer
+
+    Returns:
+        (VoskASR instance, recognizer label)
+    """
+    from asr.vosk_asr import VoskASR
+    from asr.recognizer_pool import RecognizerPool
+
+    if model_path and os.path.isdir(model_path):
+        with contextlib.redirect_stdout(io.StringIO()):
+            asr = VoskASR(model_path=model_path)
+        if asr.model is not None:
+            return asr, 'vosk'
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        asr = VoskASR(model_path=model_path or 'missing-model')
+    asr.pool = RecognizerPool(
+        None, asr.sample_rate, max_size=1,
+        factory=lambda: FakeRecognizer(asr.sample_rate, rtf=fake_rtf)
+    )
+    return asr, 'fake'
+
+
+def bench_asr(model_path: Optional[str], durations: List[float], runs: int = 3,
+              fake_rtf: float = 0.05) -> dict:
+    """
+    Measure recognize_from_file real-time factor on generated WAVs.
+
+    Args:
+        model_path: Path to Vosk model directory
+        durations: Lengths of the generated files in seconds
+        runs: Decodes per file (the fastest is kept)
+        fake_rtf: Simulated real-time factor of the fake recognizer
+
+    Returns:
+        Overall RTF, per-file figures and the recognizer used, or a
+        'skipped' reason when the ASR module cannot be imported
+    """
+    try:
+        asr, label = load_asr(model_path, fake_rtf)
+    except ImportError as e:
+        return {'skipped': f"ASR dependencies not installed: {e}"}
+
+    files = []
+    audio_total = 0.0
+    decode_total = 0.0
+    with tempfile.TemporaryDirectory() as directory:
+        for index, duration in enumerate(durations):
+            path = os.path.join(directory, f"utterance_{index}.wav")
+            generate_wav(path, duration, asr.sample_rate, seed=index)
+
+            best = None
+            for _ in range(runs):
+                with Timer() as timer:
+                    asr.recognize_from_file(path)
+                best = timer.elapsed if best is None else min(best, timer.elapsed)
+
+            audio_total += duration
+            decode_total += best
+            files.append({'duration': duration, 'decode_seconds': best,
+                          'rtf': best / duration})
+
+    return {
+        'recognizer': label,
+        'audio_seconds': audio_total,
+        'decode_seconds': decode_total,
+        'rtf': decode_total / audio_total if audio_total else 0.0,
+        'files': files
+    }
+
+
+def bench_e2e(corpus: List[str]) -> dict:
+    """
+    Measure VoiceRecognizer.process_text latency (intent matching + action).
+
+    Args:
+        corpus: Utterances to process
+
+    Returns:
+        Per-call latency percentiles in milliseconds and the per-stage
+        breakdown recorded by the recognizer's metrics
+    """
+    from main import VoiceRecognizer
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        recognizer = VoiceRecognizer(text_only=True)
+
+    latencies = []
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        for text in corpus:
+            with Timer() as timer:
+                recognizer.process_text(text)
+            latencies.append(timer.elapsed * 1000)
+            # Keep the captured console output from growing without bound
+            sink.seek(0)
+            sink.truncate()
+
+    snapshot = recognizer.metrics.snapshot()
+    return {
+        'utterances': len(corpus),
+        'latency_ms': summarize(latencies),
+        'stages_ms': {stage: snapshot['latency_ms'][stage]['p50']
+                      for stage in ('nlu', 'action') if stage in snapshot['latency_ms']}
+    }
+
+
+def report_comparison(rows: List[dict]) -> bool:
+    """
+    Print the baseline comparison.
+
+    Args:
+        rows: Output of compare_results
+
+    Returns:
+        True if any tracked metric regressed
+    """
+    print(f"\n{'metric':<24}{'baseline':>14}{'current':>14}{'change':>10}")
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['metric']:<24}{row['baseline']:>14.4g}{row['current']:>14.4g}"
+              f"{row['change']:>+10.1%}{flag}")
+    return any(row['regression'] for row in rows)
+
+
+def main():
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description="NLU, ASR and end-to-end benchmark suite")
+    parser.add_argument("--only", choices=SECTIONS, action="append",
+                        help="Run only this section (repeatable)")
+    parser.add_argument("--corpus-size", type=int, default=20000,
+                        help="Synthetic utterances for the NLU benchmark")
+    parser.add_argument("--e2e-size", type=int, default=2000,
+                        help="Utterances for the end-to-end benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument("--model", default=None,
+                        help="Path to Vosk model directory (default: fake recognizer)")
+    parser.add_argument("--durations", type=float, nargs="+", default=[2.0, 5.0, 15.0],
+                        help="Lengths of the generated WAV files in seconds")
+    parser.add_argument("--fake-rtf", type=float, default=0.05,
+                        help="Simulated real-time factor of the fake recognizer")
+    parser.add_argument("--baseline", default=None, help="Results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Relative change tolerated before flagging a regression")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    args = parser.parse_args()
+
+    sections = args.only or list(SECTIONS)
+    results = {}
+
+    if 'nlu' in sections:
+        corpus = build_corpus(args.corpus_size, args.seed)
+        results['nlu'] = bench_nlu(corpus)
+        r = results['nlu']
+        print(f"nlu  {r['calls_per_second']:>12,.0f} calls/s   "
+              f"batch {r['batch_calls_per_second']:>12,.0f} calls/s   "
+              f"p50 {r['latency_us']['p50']:.1f} us   p95 {r['latency_us']['p95']:.1f} us")
+
+    if 'asr' in sections:
+        results['asr'] = bench_asr(args.model, args.durations, fake_rtf=args.fake_rtf)
+        r = results['asr']
+        if 'skipped' in r:
+            print(f"asr  skipped: {r['skipped']}")
+        else:
+            print(f"asr  RTF {r['rtf']:.3f} over {r['audio_seconds']:.0f} s of audio "
+                  f"({r['recognizer']} recognizer)")
+
+    if 'e2e' in sections:
+        results['e2e'] = bench_e2e(build_corpus(args.e2e_size, args.seed + 1))
+        r = results['e2e']
+        print(f"e2e  p50 {r['latency_ms']['p50']:.3f} ms   p95 {r['latency_ms']['p95']:.3f} ms")
+
+    save_results("suite", results, args.output)
+
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        tracked = dict(TRACKED_METRICS)
+        if lookup(baseline, 'asr.recognizer') != lookup(results, 'asr.recognizer'):
+            # Fake and real decoding times are not comparable
+            tracked.pop('asr.rtf')
+        rows = compare_results(results, baseline, tracked, args.tolerance)
+        if report_comparison(rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
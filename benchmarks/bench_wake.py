@@ -0,0 +1,173 @@
+"""
+Benchmark: idle CPU of wake-word listening vs always-on full decoding.
+
+Replays a long stretch of mostly quiet room audio with occasional speech
+(no microphone needed) block by block through:
+
+- full: the open-vocabulary recognizer decoding every block, as
+  stream_from_mic would if it ran around the clock
+- wake: WakeWordDetector, where the voice activity gate drops silence and
+  only the audio around speech reaches the wake-phrase grammar recognizer
+
+and reports CPU time (process_time) as a percentage of one core over the
+audio duration, plus the share of audio each recognizer decoded.
+
+With --model both recognizers are real KaldiRecognizers (the wake one with
+the wake-phrase grammar). Without a model, stand-ins burn CPU for
+--full-rtf / --wake-rtf of the audio they receive, so the figures show the
+effect of the gate under those assumed decoding costs (results are tagged
+with the recognizer used).
+
+Usage:
+    python benchmarks/bench_wake.py --minutes 10
+    python benchmarks/bench_wake.py --model models/vosk-model-small-es-0.42
+"""
+import argparse
+import os
+import time
+from typing import Dict
+
+import numpy as np
+
+from common import save_results
+
+from asr.wake_word import WakeWordDetector, wake_grammar
+from asr.waveform import accept_waveform
+from utils.capture import AudioCapture
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 1600
+
+
+class BusyRecognizer:
+    """KaldiRecognizer stand-in that spends CPU in proportion to its audio."""
+
+    def __init__(self, rtf: float):
+        self.rtf = rtf
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        """Spin for rtf times the audio duration."""
+        until = time.process_time() + len(data) / 2 / SAMPLE_RATE * self.rtf
+        while time.process_time() < until:
+            pass
+        return False
+
+    def PartialResult(self) -> str:
+        return '{"partial" : ""}'
+
+    def Result(self) -> str:
+        return '{"text" : ""}'
+
+    def Reset(self):
+        """Nothing to drop."""
+
+
+def room_audio(seconds: float, speech_ratio: float, noise_db: float = -60.0,
+               seed: int = 0) -> np.ndarray:
+    """
+    Synthesize quiet room noise with speech-like bursts.
+
+    Args:
+        seconds: Length in seconds
+        speech_ratio: Fraction of the time with speech (2 s bursts)
+        noise_db: Background noise level in dBFS
+        seed: Random seed
+
+    Returns:
+        int16 samples
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    audio = rng.normal(0, 32768 * 10 ** (noise_db / 20), total)
+
+    burst = 2 * SAMPLE_RATE
+    bursts = int(total * speech_ratio / burst)
+    t = np.arange(burst) / SAMPLE_RATE
+    syllables = np.abs(np.sin(np.pi * 4 * t))
+    for start in rng.choice(max(1, total // burst), size=bursts, replace=False) * burst:
+        pitch = rng.uniform(100, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in (1, 2, 3))
+        audio[start:start + burst] += 6000 * syllables * voice
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def run_full(audio: np.ndarray, recognizer) -> Dict[str, float]:
+    """Decode every block with the full recognizer."""
+    capture = AudioCapture(sample_rate=SAMPLE_RATE, block_size=BLOCK_SIZE)
+    cpu = 0.0
+    for start in range(0, len(audio) - BLOCK_SIZE + 1, BLOCK_SIZE):
+        capture._callback(audio[start:start + BLOCK_SIZE].reshape(-1, 1), BLOCK_SIZE, None, None)
+        begin = time.process_time()
+        for data in capture.chunks(start):
+            if not accept_waveform(recognizer, data):
+                recognizer.PartialResult()
+        cpu += time.process_time() - begin
+    return {'cpu_seconds': cpu, 'decoded_fraction': 1.0}
+
+
+def run_wake(audio: np.ndarray, recognizer, phrases) -> Dict[str, float]:
+    """Gate the blocks with VAD and decode the rest with the wake grammar."""
+    capture = AudioCapture(sample_rate=SAMPLE_RATE, block_size=BLOCK_SIZE)
+    detector = WakeWordDetector(recognizer, phrases, sample_rate=SAMPLE_RATE)
+    cpu = 0.0
+    for start in range(0, len(audio) - BLOCK_SIZE + 1, BLOCK_SIZE):
+        capture._callback(audio[start:start + BLOCK_SIZE].reshape(-1, 1), BLOCK_SIZE, None, None)
+        begin = time.process_time()
+        detector.process(capture, start, start + BLOCK_SIZE)
+        cpu += time.process_time() - begin
+    return {'cpu_seconds': cpu, 'decoded_fraction': detector.decoded_fraction,
+            'detections': detector.detections}
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Wake-word idle CPU benchmark")
+    parser.add_argument("--minutes", type=float, default=5.0, help="Audio replayed")
+    parser.add_argument("--speech-ratio", type=float, default=0.1,
+                        help="Fraction of the audio with speech")
+    parser.add_argument("--noise-db", type=float, default=-60.0,
+                        help="Background noise level in dBFS")
+    parser.add_argument("--wake-word", default="oye asistente", help="Wake phrase")
+    parser.add_argument("--model", default=None, help="Path to Vosk model directory")
+    parser.add_argument("--full-rtf", type=float, default=0.15,
+                        help="Assumed CPU/audio ratio of full decoding (no model)")
+    parser.add_argument("--wake-rtf", type=float, default=0.03,
+                        help="Assumed CPU/audio ratio of grammar decoding (no model)")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    args = parser.parse_args()
+
+    phrases = [args.wake_word]
+    if args.model and os.path.isdir(args.model):
+        from vosk import KaldiRecognizer, Model, SetLogLevel
+        SetLogLevel(-1)
+        model = Model(args.model)
+        full = KaldiRecognizer(model, SAMPLE_RATE)
+        wake = KaldiRecognizer(model, SAMPLE_RATE, wake_grammar(phrases))
+        label = 'vosk'
+    else:
+        full = BusyRecognizer(args.full_rtf)
+        wake = BusyRecognizer(args.wake_rtf)
+        label = 'simulated'
+
+    audio = room_audio(args.minutes * 60, args.speech_ratio, args.noise_db)
+    seconds = len(audio) / SAMPLE_RATE
+    results = {'recognizer': label, 'audio_seconds': seconds,
+               'speech_ratio': args.speech_ratio, 'noise_db': args.noise_db,
+               'full': run_full(audio, full),
+               'wake': run_wake(audio, wake, phrases)}
+
+    print(f"{seconds / 60:.1f} min of audio, {args.speech_ratio:.0%} speech "
+          f"({label} recognizers)")
+    print(f"{'mode':<8}{'CPU % of a core':>18}{'audio decoded':>16}")
+    for mode in ('full', 'wake'):
+        row = results[mode]
+        row['cpu_percent'] = row['cpu_seconds'] / seconds * 100
+        print(f"{mode:<8}{row['cpu_percent']:>18.2f}{row['decoded_fraction']:>16.1%}")
+    results['cpu_reduction'] = results['full']['cpu_seconds'] / max(results['wake']['cpu_seconds'], 1e-9)
+    print(f"wake-word mode uses x{results['cpu_reduction']:.1f} less CPU")
+
+    save_results("wake", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add src to path
+SRC_DIR = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Compute the word error rate between two transcripts.
+    
+    Args:
+        reference: Expected text
+        hypothesis: Recognized text
+        
+    Returns:
+        Word-level edit distance divided by the reference length
+    """
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Get a percentile of a list of values (nearest rank).
+    
+    Args:
+        values: Sample values
+        pct: Percentile in [0, 100]
+        
+    Returns:
+        Percentile value (0.0 for an empty list)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def environment() -> Dict[str, Any]:
+    """
+    Describe the machine running the benchmark.
+    
+    Returns:
+        Dictionary with Python version, platform and CPU count
+    """
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def save_results(name: str, results: Dict[str, Any], output: str = None) -> str:
+    """
+    Save benchmark results as JSON.
+    
+    Args:
+        name: Benchmark name
+        results: Measured values
+        output: Output path (defaults to benchmarks/results/<name>.json)
+        
+    Returns:
+        Path of the written file
+    """
+    if output is None:
+        output = str(Path(__file__).parent / "results" / f"{name}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    
+    document = {
+        'benchmark': name,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'results': results
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    print(f"Results saved to {output}")
+    return output
+
+
+class Timer:
+    """Context manager measuring wall-clock time with perf_counter."""
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+    
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        return False
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """
+    Load a results file written by save_results.
+    
+    Args:
+        path: JSON results file
+        
+    Returns:
+        The 'results' section of the document
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def lookup(results: Dict[str, Any], metric: str):
+    """
+    Get a nested value by dotted name (e.g. 'nlu.latency_us.p95').
+    
+    Args:
+        results: Results dictionary
+        metric: Dotted key path
+        
+    Returns:
+        The value, or None if any key is missing
+    """
+    value = results
+    for key in metric.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    metrics: Dict[str, str], tolerance: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compare tracked metrics against a baseline run.
+    
+    Args:
+        current: Results of this run
+        baseline: Results of the baseline run
+        metrics: Dotted metric name -> 'higher' or 'lower' (which is better)
+        tolerance: Relative change allowed before flagging a regression
+        
+    Returns:
+        One row per metric present in both runs, with baseline, current,
+        relative change and a 'regression' flag
+    """
+    rows = []
+    for metric, better in metrics.items():
+        old = lookup(baseline, metric)
+        new = lookup(current, metric)
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or not old:
+            continue
+        change = (new - old) / old
+        worse = -change if better == 'higher' else change
+        rows.append({
+            'metric': metric,
+            'baseline': old,
+            'current': new,
+            'change': change,
+            'regression': worse > tolerance
+        })
+    return rows
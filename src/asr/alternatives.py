@@ -0,0 +1,140 @@
+"""
+N-best alternatives module.
+Parses Vosk results into ranked (text, confidence) hypotheses and combines
+the alternatives of every segment of an utterance into utterance-level
+N-best lists.
+"""
+import json
+from typing import Any, Dict, List
+
+from asr.result import RecognitionResult, segment_text
+
+
+def parse_alternatives(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Get the ranked hypotheses of a Vosk result.
+
+    With SetMaxAlternatives(n) Vosk returns {'alternatives': [{'text',
+    'confidence'}, ...]} best first, where confidence is a decoder score
+    (higher is better, not bounded to 0-1). Without it the single 'text'
+    gets the mean word confidence (or 1.0 without word data).
+
+    Args:
+        result: Parsed Result()/FinalResult() JSON
+
+    Returns:
+        List of {'text', 'confidence'} dictionaries, best first; empty
+        hypotheses are left out
+    """
+    if 'alternatives' in result:
+        hypotheses = []
+        for alternative in result['alternatives']:
+            text = alternative.get('text', '').strip()
+            if text:
+                hypotheses.append({'text': text,
+                                   'confidence': float(alternative.get('confidence', 0.0))})
+        return hypotheses
+
+    text = result.get('text', '').strip()
+    if not text:
+        return []
+    words = result.get('result')
+    if words:
+        confidence = sum(word.get('conf', 1.0) for word in words) / len(words)
+    else:
+        confidence = 1.0
+    return [{'text': text, 'confidence': confidence}]
+
+
+def combine_alternatives(segments: List[List[Dict[str, Any]]],
+                         limit: int) -> List[Dict[str, Any]]:
+    """
+    Build utterance-level hypotheses from per-segment alternatives.
+
+    The best hypothesis joins the top alternative of every segment; the
+    others swap a single segment for one of its alternatives, scored by
+    the summed segment confidences. Utterances are usually one segment, in
+    which case this is just that segment's list.
+
+    Args:
+        segments: parse_alternatives() output of each segment, in order
+        limit: Maximum hypotheses returned
+
+    Returns:
+        List of {'text', 'confidence'} dictionaries, best first
+    """
+    if not segments:
+        return []
+    if len(segments) == 1:
+        return segments[0][:max(1, limit)]
+
+    tops = [segment[0] for segment in segments]
+    best = sum(top['confidence'] for top in tops)
+    candidates = [(best, 0, [top['text'] for top in tops])]
+    for index, segment in enumerate(segments):
+        for alternative in segment[1:]:
+            texts = [top['text'] for top in tops]
+            texts[index] = alternative['text']
+            score = best - tops[index]['confidence'] + alternative['confidence']
+            candidates.append((score, len(candidates), texts))
+    candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+
+    hypotheses = []
+    seen = set()
+    for score, _, texts in candidates:
+        text = ' '.join(texts)
+        if text in seen:
+            continue
+        seen.add(text)
+        hypotheses.append({'text': text, 'confidence': score})
+        if len(hypotheses) >= max(1, limit):
+            break
+    return hypotheses
+
+
+class Transcript:
+    """Recognized segments of one utterance, with their alternatives on demand."""
+
+    def __init__(self):
+        # Raw segments; text and word data are parsed lazily
+        self.result = RecognitionResult()
+
+    def add(self, raw: str) -> str:
+        """
+        Add a Result()/FinalResult() JSON string.
+
+        Args:
+            raw: Recognizer output
+
+        Returns:
+            Best text of the segment ('' if nothing was recognized)
+        """
+        self.result.add(raw)
+        return segment_text(raw)
+
+    @property
+    def segments(self) -> List[List[Dict[str, Any]]]:
+        """Hypotheses of every non-empty segment (parsed on each access)."""
+        segments = []
+        for raw in self.result.raw:
+            hypotheses = parse_alternatives(json.loads(raw))
+            if hypotheses:
+                segments.append(hypotheses)
+        return segments
+
+    @property
+    def text(self) -> str:
+        """Best text of the whole utterance."""
+        return self.result.text
+
+    def alternatives(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Ranked hypotheses for the whole utterance.
+
+        Args:
+            limit: Maximum hypotheses returned
+
+        Returns:
+            List of {'text', 'confidence'} dictionaries, best first
+        """
+        return combine_alternatives(self.segments, limit)
@@ -0,0 +1,252 @@
+"""
+Batch transcription module.
+Transcribes directories of WAV files in parallel, loading the Vosk model
+once per worker process and streaming results as JSONL.
+
+Usage:
+    python src/asr/batch.py examples/ --model models/vosk-model-small-es-0.42 \
+        --workers 4 --output logs/batch.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+# Make src importable when run as a script
+SRC_DIR = str(Path(__file__).resolve().parent.parent)
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from asr.result import RecognitionResult
+from asr.waveform import accept_waveform
+from utils.audio import stream_wav
+
+
+# Per-process state, set by _init_worker in each pool worker
+_worker_model = None
+_worker_error = None
+
+
+def _init_worker(model_path: str):
+    """
+    Load the Vosk model once in a pool worker.
+
+    Args:
+        model_path: Path to Vosk model directory
+    """
+    global _worker_model, _worker_error
+    try:
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+        _worker_model = Model(model_path)
+    except Exception as e:
+        _worker_model = None
+        _worker_error = f"Could not load Vosk model from {model_path}: {e}"
+
+
+def _transcribe_in_worker(file_path: str, chunk_size: int, sample_rate: int) -> Dict[str, Any]:
+    """Transcribe one file with the worker's model."""
+    if _worker_model is None:
+        return {'file': file_path, 'text': None, 'error': _worker_error}
+    return transcribe_file(_worker_model, file_path, chunk_size=chunk_size,
+                           sample_rate=sample_rate)
+
+
+def transcribe_file(model, file_path: str, chunk_size: int = 16000,
+                    sample_rate: int = 16000) -> Dict[str, Any]:
+    """
+    Transcribe a single WAV file.
+
+    Stereo or multichannel audio is mixed down, other sample rates are
+    resampled and 8/24/32-bit samples converted while the file is read
+    (see utils.audio.stream_wav), so archived recordings need no separate
+    conversion pass.
+
+    Args:
+        model: Loaded Vosk Model
+        file_path: Path to a PCM WAV file
+        chunk_size: File frames fed to the recognizer per call
+        sample_rate: Sample rate of the model (audio is converted to it)
+
+    Returns:
+        Dictionary with 'file', 'text', 'duration', 'processing_time',
+        'rtf' (real-time factor) and 'error'
+    """
+    from vosk import KaldiRecognizer
+
+    record = {
+        'file': file_path,
+        'text': None,
+        'duration': 0.0,
+        'processing_time': 0.0,
+        'rtf': None,
+        'error': None
+    }
+    start = time.perf_counter()
+
+    try:
+        recognizer = KaldiRecognizer(model, sample_rate)
+        # Segments are kept unparsed until the whole file is decoded
+        segments = RecognitionResult()
+        samples = 0
+        for block in stream_wav(file_path, target_rate=sample_rate, block_frames=chunk_size):
+            samples += len(block)
+            if accept_waveform(recognizer, block):
+                segments.add(recognizer.Result())
+        segments.add(recognizer.FinalResult())
+
+        record['duration'] = samples / sample_rate
+        record['text'] = segments.text
+    except Exception as e:
+        record['error'] = str(e)
+
+    record['processing_time'] = time.perf_counter() - start
+    if record['duration'] > 0:
+        record['rtf'] = record['processing_time'] / record['duration']
+    return record
+
+
+def find_wav_files(directory: str, recursive: bool = True) -> List[str]:
+    """
+    Find WAV files in a directory (".wav" in any letter case).
+
+    Args:
+        directory: Directory to search
+        recursive: Also search subdirectories
+
+    Returns:
+        Sorted list of file paths
+    """
+    pattern = "**/*" if recursive else "*"
+    return sorted(
+        str(path) for path in Path(directory).glob(pattern)
+        if path.suffix.lower() == ".wav" and path.is_file()
+    )
+
+
+def transcribe_batch(files: List[str], model_path: str, workers: Optional[int] = None,
+                     chunk_size: int = 16000,
+                     sample_rate: int = 16000) -> Iterator[Dict[str, Any]]:
+    """
+    Transcribe files in parallel across a process pool.
+
+    Each worker loads the model once. Results are yielded in completion
+    order, as soon as each file finishes.
+
+    Args:
+        files: WAV file paths
+        model_path: Path to Vosk model directory
+        workers: Number of worker processes (defaults to CPU count)
+        chunk_size: File frames fed to the recognizer per call
+        sample_rate: Sample rate of the model
+
+    Yields:
+        Result dictionaries as returned by transcribe_file
+    """
+    # Largest files first so no worker is left with a long file at the end
+    ordered = sorted(files, key=lambda f: os.path.getsize(f), reverse=True)
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(model_path,)) as pool:
+        futures = [pool.submit(_transcribe_in_worker, f, chunk_size, sample_rate)
+                   for f in ordered]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def transcribe_directory(directory: str, model_path: str, output: TextIO,
+                         workers: Optional[int] = None, chunk_size: int = 16000,
+                         recursive: bool = True, sample_rate: int = 16000) -> Dict[str, Any]:
+    """
+    Transcribe every WAV file in a directory and write JSONL results.
+
+    Args:
+        directory: Directory with WAV files
+        model_path: Path to Vosk model directory
+        output: Text stream receiving one JSON object per file
+        workers: Number of worker processes (defaults to CPU count)
+        chunk_size: File frames fed to the recognizer per call
+        recursive: Also search subdirectories
+        sample_rate: Sample rate of the model
+
+    Returns:
+        Summary with file count, errors, audio seconds, wall time and
+        throughput (seconds of audio transcribed per wall-clock second)
+    """
+    files = find_wav_files(directory, recursive=recursive)
+
+    summary = {
+        'files': len(files),
+        'errors': 0,
+        'audio_seconds': 0.0,
+        'wall_time': 0.0,
+        'throughput': 0.0,
+        'workers': workers or os.cpu_count()
+    }
+    if not files:
+        return summary
+
+    start = time.perf_counter()
+    for record in transcribe_batch(files, model_path, workers=workers, chunk_size=chunk_size,
+                                   sample_rate=sample_rate):
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+        if record['error']:
+            summary['errors'] += 1
+        else:
+            summary['audio_seconds'] += record['duration']
+
+    summary['wall_time'] = time.perf_counter() - start
+    if summary['wall_time'] > 0:
+        summary['throughput'] = summary['audio_seconds'] / summary['wall_time']
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Batch transcription of WAV files")
+    parser.add_argument("directory", help="Directory with WAV files")
+    parser.add_argument("--model", required=True, help="Path to Vosk model directory")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", default="-",
+                        help="JSONL output file (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=16000,
+                        help="File frames fed to the recognizer per call")
+    parser.add_argument("--sample-rate", type=int, default=16000,
+                        help="Sample rate of the model (files are converted to it)")
+    parser.add_argument("--no-recursive", action="store_true",
+                        help="Don't search subdirectories")
+    args = parser.parse_args(argv)
+
+    output = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+    try:
+        summary = transcribe_directory(
+            args.directory,
+            args.model,
+            output,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            recursive=not args.no_recursive,
+            sample_rate=args.sample_rate
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(
+        f"Transcribed {summary['files']} files ({summary['errors']} errors): "
+        f"{summary['audio_seconds']:.1f} s of audio in {summary['wall_time']:.1f} s "
+        f"with {summary['workers']} workers "
+        f"({summary['throughput']:.1f}x real time)",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
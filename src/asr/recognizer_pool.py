@@ -0,0 +1,183 @@
+"""
+Recognizer pool module.
+Shares one loaded Vosk model between several KaldiRecognizer instances so
+concurrent sessions can be recognized from a single process.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class RecognizerPool:
+    """Bounded pool of KaldiRecognizer objects built on a shared Model."""
+
+    def __init__(self, model, sample_rate: int = 16000, max_size: int = 4,
+                 factory: Optional[Callable[[], Any]] = None,
+                 grammar: Optional[str] = None, max_alternatives: int = 0):
+        """
+        Initialize the pool.
+
+        Recognizers are created lazily, up to max_size.
+
+        Args:
+            model: Loaded Vosk Model shared by every recognizer
+            sample_rate: Audio sample rate (Hz)
+            max_size: Maximum number of recognizers
+            factory: Optional callable creating a recognizer (defaults to
+                a KaldiRecognizer with word timings enabled)
+            grammar: Optional Vosk grammar (JSON list of phrases)
+            max_alternatives: N-best hypotheses requested from each
+                recognizer built by the default factory (0 disables them)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.model = model
+        self.sample_rate = sample_rate
+        self.max_size = max_size
+        self._factory = factory or self._create_recognizer
+        self.grammar = grammar
+        self.max_alternatives = max_alternatives
+
+        self._idle: List[Any] = []
+        self._created = 0
+        self._condition = threading.Condition()
+
+        # Grammar generation each live recognizer was built with
+        self._generation = 0
+        self._generations: Dict[int, int] = {}
+
+    def _create_recognizer(self):
+        """Create a KaldiRecognizer on the shared model."""
+        from vosk import KaldiRecognizer
+        if self.grammar:
+            recognizer = KaldiRecognizer(self.model, self.sample_rate, self.grammar)
+        else:
+            recognizer = KaldiRecognizer(self.model, self.sample_rate)
+        recognizer.SetWords(True)
+        if self.max_alternatives > 0:
+            recognizer.SetMaxAlternatives(self.max_alternatives)
+        return recognizer
+
+    def set_grammar(self, grammar: Optional[str]):
+        """
+        Change the grammar used by the pool's recognizers.
+
+        Idle recognizers are dropped right away; checked-out ones are
+        dropped when released, so every new session uses the new grammar.
+
+        Args:
+            grammar: Vosk grammar (JSON list of phrases) or None for open vocabulary
+        """
+        with self._condition:
+            self.grammar = grammar
+            self._generation += 1
+            for recognizer in self._idle:
+                self._generations.pop(id(recognizer), None)
+            self._created -= len(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+    @property
+    def size(self) -> int:
+        """Number of recognizers created so far."""
+        return self._created
+
+    @property
+    def in_use(self) -> int:
+        """Number of recognizers currently checked out."""
+        with self._condition:
+            return self._created - len(self._idle)
+
+    def acquire(self, block: bool = True, timeout: Optional[float] = None):
+        """
+        Check out a recognizer.
+
+        Args:
+            block: Wait for a recognizer if all are in use
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            A recognizer, or None if none became available in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+
+                if self._created < self.max_size:
+                    self._created += 1
+                    break
+
+                if not block:
+                    return None
+                if deadline is None:
+                    self._condition.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    self._condition.wait(remaining)
+
+            generation = self._generation
+
+        # Build outside the lock; recognizer creation can be slow
+        try:
+            recognizer = self._factory()
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._generations[id(recognizer)] = generation
+        return recognizer
+
+    def release(self, recognizer):
+        """
+        Return a recognizer to the pool, resetting its decoding state.
+
+        Args:
+            recognizer: Recognizer obtained from acquire()
+        """
+        with self._condition:
+            stale = self._generations.get(id(recognizer)) != self._generation
+
+        if not stale:
+            try:
+                recognizer.Reset()
+            except Exception as e:
+                # Don't hand a broken recognizer to the next session
+                print(f"Warning: Discarding recognizer that failed to reset: {e}")
+                stale = True
+
+        with self._condition:
+            if stale:
+                self._generations.pop(id(recognizer), None)
+                self._created -= 1
+            else:
+                self._idle.append(recognizer)
+            self._condition.notify()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Context manager that checks out a recognizer and returns it afterwards.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Raises:
+            TimeoutError: If no recognizer became available in time
+        """
+        recognizer = self.acquire(timeout=timeout)
+        if recognizer is None:
+            raise TimeoutError("No recognizer available in the pool")
+        try:
+            yield recognizer
+        finally:
+            self.release(recognizer)
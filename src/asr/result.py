@@ -0,0 +1,232 @@
+"""
+Recognition result module.
+Keeps the raw Vosk JSON of an utterance and parses it only when a field is
+read: the text is found with plain string searches, and word timings and
+confidences are decoded into compact array columns instead of one dict per
+word.
+"""
+import json
+import re
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Vosk writes the keys of every word sorted: conf, end, start, word. Words
+# with escaped characters don't match and send the segment to json.loads
+_WORD = re.compile(r'"conf"\s*:\s*([-+.eE0-9]+),\s*"end"\s*:\s*([-+.eE0-9]+),'
+                   r'\s*"start"\s*:\s*([-+.eE0-9]+),\s*"word"\s*:\s*"([^"\\]*)"')
+
+
+def _string_value(raw: str, key: str) -> Optional[str]:
+    """
+    Find the string value of a key with plain string searches.
+
+    Returns None when the layout is unexpected or the value has escapes,
+    so the caller can fall back to the JSON parser.
+    """
+    # Vosk writes "text" after the word list, so the last occurrence is the key
+    pos = raw.rfind(key)
+    if pos < 0:
+        return None
+    colon = raw.find(':', pos + len(key))
+    if colon < 0 or raw[pos + len(key):colon].strip():
+        return None
+    start = raw.find('"', colon) + 1
+    if start == 0:
+        return None
+    end = raw.find('"', start)
+    if end < 0 or '\\' in raw[start:end + 1]:
+        return None
+    return raw[start:end]
+
+
+def segment_text(raw: str) -> str:
+    """
+    Get the best text of a Result()/FinalResult() JSON string.
+
+    Args:
+        raw: Recognizer output
+
+    Returns:
+        Recognized text ('' if none)
+    """
+    if '"alternatives"' in raw:
+        alternatives = json.loads(raw).get('alternatives') or [{}]
+        return alternatives[0].get('text', '').strip()
+    text = _string_value(raw, '"text"')
+    if text is None:
+        return json.loads(raw).get('text', '').strip()
+    return text.strip()
+
+
+def partial_text(raw: str) -> str:
+    """
+    Get the text of a PartialResult() JSON string.
+
+    Args:
+        raw: Recognizer output
+
+    Returns:
+        Partial hypothesis ('' if none)
+    """
+    text = _string_value(raw, '"partial"')
+    if text is None:
+        return json.loads(raw).get('partial', '')
+    return text
+
+
+class RecognitionResult:
+    """
+    Text, word timings and confidences of one utterance.
+
+    Built from the Result()/FinalResult() strings of its segments; nothing
+    is parsed until a property is read, and per-word data is stored as
+    parallel columns (a tuple of words and 'd' arrays of start, end and
+    confidence) rather than a dict per word.
+    """
+
+    __slots__ = ('_raw', '_text', '_words', '_start', '_end', '_conf')
+
+    def __init__(self, raw: Optional[List[str]] = None):
+        """
+        Initialize the result.
+
+        Args:
+            raw: Recognizer output of each segment, in order
+        """
+        self._raw: List[str] = list(raw) if raw else []
+        self._text: Optional[str] = None
+        self._words: Optional[Tuple[str, ...]] = None
+        self._start: Optional[array] = None
+        self._end: Optional[array] = None
+        self._conf: Optional[array] = None
+
+    def add(self, raw: str):
+        """
+        Append a segment.
+
+        Args:
+            raw: Result()/FinalResult() JSON string
+        """
+        self._raw.append(raw)
+        self._text = None
+        self._words = None
+
+    @property
+    def raw(self) -> List[str]:
+        """Recognizer output of each segment."""
+        return self._raw
+
+    @property
+    def text(self) -> str:
+        """Best text of the utterance."""
+        if self._text is None:
+            texts = [segment_text(raw) for raw in self._raw]
+            self._text = ' '.join(text for text in texts if text)
+        return self._text
+
+    @property
+    def words(self) -> Tuple[str, ...]:
+        """Recognized words."""
+        self._parse_words()
+        return self._words
+
+    @property
+    def start(self) -> array:
+        """Start time of each word in seconds."""
+        self._parse_words()
+        return self._start
+
+    @property
+    def end(self) -> array:
+        """End time of each word in seconds."""
+        self._parse_words()
+        return self._end
+
+    @property
+    def conf(self) -> array:
+        """Confidence (0-1) of each word."""
+        self._parse_words()
+        return self._conf
+
+    @property
+    def confidence(self) -> float:
+        """Mean word confidence (1.0 when no word data was returned)."""
+        conf = self.conf
+        if not conf:
+            return 1.0 if self.text else 0.0
+        return sum(conf) / len(conf)
+
+    def low_confidence_words(self, threshold: float = 0.5) -> List[str]:
+        """
+        Get the words recognized with a confidence below a threshold.
+
+        Args:
+            threshold: Minimum confidence of a reliable word
+
+        Returns:
+            Words under the threshold, in order
+        """
+        self._parse_words()
+        return [word for word, conf in zip(self._words, self._conf) if conf < threshold]
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __bool__(self) -> bool:
+        return bool(self.text)
+
+    def __iter__(self) -> Iterator[Tuple[str, float, float, float]]:
+        """Iterate (word, start, end, conf) tuples."""
+        self._parse_words()
+        return zip(self._words, self._start, self._end, self._conf)
+
+    def __repr__(self) -> str:
+        return f"RecognitionResult(text={self.text!r}, words={len(self)})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to plain data (for JSON logs).
+
+        Returns:
+            Dictionary with 'text', 'confidence' and 'words' (list of
+            {'word', 'start', 'end', 'conf'})
+        """
+        return {
+            'text': self.text,
+            'confidence': self.confidence,
+            'words': [{'word': word, 'start': start, 'end': end, 'conf': conf}
+                      for word, start, end, conf in self]
+        }
+
+    def _parse_words(self):
+        """Decode the per-word columns of every segment (once)."""
+        if self._words is not None:
+            return
+        words: List[str] = []
+        start = array('d')
+        end = array('d')
+        conf = array('d')
+        for raw in self._raw:
+            if '"alternatives"' not in raw:
+                found = _WORD.findall(raw)
+                if len(found) == raw.count('"word"'):
+                    for word_conf, word_end, word_start, word in found:
+                        words.append(word)
+                        start.append(float(word_start))
+                        end.append(float(word_end))
+                        conf.append(float(word_conf))
+                    continue
+
+            # Unexpected layout or N-best output: fall back to the JSON parser
+            result = json.loads(raw)
+            if 'alternatives' in result:
+                result = (result['alternatives'] or [{}])[0]
+            for item in result.get('result', ()):
+                words.append(item.get('word', ''))
+                start.append(float(item.get('start', 0.0)))
+                end.append(float(item.get('end', 0.0)))
+                conf.append(float(item.get('conf', 1.0)))
+        self._words = tuple(words)
+        self._start = start
+        self._end = end
+        self._conf = conf
@@ -3,31 +3,71 @@ Vosk ASR (Automatic Speech Recognition) module.
 Provides offline speech-to-text using Vosk.
 """
 import json
-import queue
-import sounddevice as sd
+import time
 from vosk import Model, KaldiRecognizer
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from asr.alternatives import Transcript
+from asr.recognizer_pool import RecognizerPool
+from asr.result import RecognitionResult, partial_text
+from asr.waveform import accept_waveform
+from asr.wake_word import WakeWordDetector, wake_grammar
+from nlu.matcher import get_intent_phrases, get_intents_version
+from utils.audio import VoiceActivityDetector, stream_wav, trim_silence
+from utils.capture import AudioCapture
+from utils.metrics import Metrics
 
 
 class VoskASR:
     """Vosk-based ASR for offline speech recognition."""
     
-    def __init__(self, model_path: str = "models", sample_rate: int = 16000):
+    def __init__(self, model_path: str = "models", sample_rate: int = 16000,
+                 pool_size: int = 4, grammar: bool = False,
+                 metrics: Optional[Metrics] = None, max_alternatives: int = 0,
+                 preroll: float = 0.3, buffer_seconds: float = 30.0,
+                 file_chunk_frames: int = 16000):
         """
         Initialize Vosk ASR.
         
         Args:
             model_path: Path to Vosk model directory
             sample_rate: Audio sample rate (Hz)
+            pool_size: Maximum recognizers for concurrent file/PCM sessions
+            grammar: Restrict decoding to the registered intent phrases
+            metrics: Optional collector for capture/decode latency and RTF
+            max_alternatives: Ask Vosk for this many N-best hypotheses per
+                utterance (0 keeps only the best text)
+            preroll: Seconds of microphone audio before each recognition
+                is triggered that are included in it
+            buffer_seconds: Microphone audio kept in the capture ring
+                buffer (bounds the longest microphone recording)
+            file_chunk_frames: File frames fed to the recognizer per call
+                (larger chunks mean fewer calls; Vosk checks for the end of
+                a segment once per call)
         """
         self.sample_rate = sample_rate
+        self.max_alternatives = max_alternatives
+        self.preroll = preroll
+        self.buffer_seconds = buffer_seconds
+        self.file_chunk_frames = file_chunk_frames
+        self._capture: Optional[AudioCapture] = None
+        self._wake_detector: Optional[WakeWordDetector] = None
+        # Segments of the last microphone recognition (the microphone
+        # methods share self.recognizer), parsed on demand
+        self._last_transcript: Optional[Transcript] = None
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
         self.model_path = model_path
+        self.pool = None
+        self.use_grammar = grammar
+        self._grammar_version = None
         
         # Load Vosk model
         try:
             self.model = Model(model_path)
-            self.recognizer = KaldiRecognizer(self.model, sample_rate)
-            self.recognizer.SetWords(True)
+            self.recognizer = self._configure(KaldiRecognizer(self.model, sample_rate))
+            self.pool = RecognizerPool(self.model, sample_rate, max_size=pool_size,
+                                       max_alternatives=max_alternatives)
+            self._refresh_grammar()
         except Exception as e:
             print(f"Warning: Could not load Vosk model from {model_path}")
             print(f"Error: {e}")
@@ -35,8 +75,136 @@ class VoskASR:
             print("Extract it to the 'models' directory")
             self.model = None
             self.recognizer = None
+    
+    def build_grammar(self) -> str:
+        """
+        Build a Vosk grammar from the registered intent phrases.
+        
+        Returns:
+            JSON list of phrases plus '[unk]' for out-of-grammar speech
+        """
+        return json.dumps(get_intent_phrases() + ['[unk]'], ensure_ascii=False)
+    
+    def set_grammar_mode(self, enabled: bool):
+        """
+        Switch between grammar-constrained and open-vocabulary decoding.
         
-        self.audio_queue = queue.Queue()
+        Args:
+            enabled: True to decode only the intent phrases
+        """
+        self.use_grammar = enabled
+        self._grammar_version = None
+        self._refresh_grammar()
+    
+    @property
+    def capture(self) -> AudioCapture:
+        """
+        Microphone capture, opened on first use and kept running.
+        
+        Keeping the stream open lets each recognition include the audio
+        just before it was triggered, and the ring buffer keeps memory
+        flat however long the assistant listens.
+        """
+        if self._capture is None:
+            self._capture = AudioCapture(sample_rate=self.sample_rate,
+                                         buffer_seconds=self.buffer_seconds,
+                                         preroll=self.preroll)
+        self._capture.start()
+        return self._capture
+    
+    def wake_detector(self, phrases: List[str]) -> Optional[WakeWordDetector]:
+        """
+        Get the wake-phrase detector, rebuilt when the phrases change.
+        
+        Args:
+            phrases: Wake phrases
+            
+        Returns:
+            WakeWordDetector with its own grammar-constrained recognizer, or
+            None if the model is not loaded
+        """
+        if self.model is None:
+            return None
+        detector = self._wake_detector
+        wanted = [f" {phrase.lower().strip()} " for phrase in phrases]
+        if detector is None or detector.phrases != wanted:
+            recognizer = KaldiRecognizer(self.model, self.sample_rate, wake_grammar(phrases))
+            detector = self._wake_detector = WakeWordDetector(
+                recognizer, phrases, sample_rate=self.sample_rate, preroll=self.preroll
+            )
+        return detector
+    
+    def wait_for_wake_word(self, phrases: List[str], timeout: Optional[float] = None,
+                           should_stop: Optional[Callable[[], bool]] = None) -> Optional[int]:
+        """
+        Listen at low CPU until a wake phrase is spoken.
+        
+        Only audio around detected speech is decoded, by a small recognizer
+        constrained to the wake phrases; the full recognizer stays idle.
+        
+        Args:
+            phrases: Wake phrases (e.g. ['oye asistente'])
+            timeout: Maximum seconds to listen (None listens until stopped)
+            should_stop: Polled between blocks; True gives up
+            
+        Returns:
+            Capture position right after the wake phrase (pass it as start
+            to recognize_until_silence), or None
+        """
+        detector = self.wake_detector(phrases)
+        if detector is None:
+            print("Error: Vosk model not loaded. Cannot listen for the wake word.")
+            return None
+        return detector.listen(self.capture, timeout=timeout, should_stop=should_stop)
+    
+    def close(self):
+        """Stop the microphone stream (reopened on the next microphone use)."""
+        if self._capture is not None:
+            self._capture.stop()
+    
+    @property
+    def last_result(self) -> Optional[RecognitionResult]:
+        """Words, timings and confidences of the last microphone recognition."""
+        if self._last_transcript is None:
+            return None
+        return self._last_transcript.result
+    
+    @property
+    def last_alternatives(self) -> List[Dict[str, Any]]:
+        """Ranked {'text', 'confidence'} hypotheses of the last microphone recognition."""
+        if self._last_transcript is None:
+            return []
+        return self._last_transcript.alternatives(self.max_alternatives)
+    
+    def _configure(self, recognizer):
+        """Enable word timings and, if requested, N-best alternatives."""
+        recognizer.SetWords(True)
+        if self.max_alternatives > 0:
+            recognizer.SetMaxAlternatives(self.max_alternatives)
+        return recognizer
+    
+    def _record_decode(self, decode_seconds: float, audio_bytes: int):
+        """Record decode latency and real-time factor for 16-bit mono audio."""
+        self.metrics.record('decode', decode_seconds)
+        self.metrics.record_rtf(decode_seconds, audio_bytes / 2 / self.sample_rate)
+    
+    def _refresh_grammar(self):
+        """Rebuild the recognizers when the grammar mode or the intents changed."""
+        if self.model is None:
+            return
+        
+        version = get_intents_version() if self.use_grammar else -1
+        if version == self._grammar_version:
+            return
+        
+        grammar = self.build_grammar() if self.use_grammar else None
+        if grammar:
+            recognizer = KaldiRecognizer(self.model, self.sample_rate, grammar)
+        else:
+            recognizer = KaldiRecognizer(self.model, self.sample_rate)
+        self.recognizer = self._configure(recognizer)
+        self.pool.set_grammar(grammar)
+        self._grammar_version = version
     
     def recognize_from_mic(self, duration: float = 3.0) -> Optional[str]:
         """
@@ -46,41 +214,52 @@ class VoskASR:
             duration: Recording duration in seconds
             
         Returns:
-            Recognized text or None if recognition failed
+            Recognized text or None if recognition failed (the N-best
+            hypotheses are left in self.last_alternatives and the word data
+            in self.last_result)
         """
         if self.recognizer is None:
             print("Error: Vosk model not loaded. Cannot recognize speech.")
             return None
         
+        self._refresh_grammar()
+        self._last_transcript = None
+        
         try:
+            capture = self.capture
+            if duration + capture.preroll > capture.capacity_seconds:
+                duration = capture.capacity_seconds - capture.preroll
+                print(f"Warning: Recording limited to {duration:.1f} seconds by the capture buffer")
             print(f"\nListening for {duration} seconds...")
             
-            # Record audio
-            audio_data = sd.rec(
-                int(self.sample_rate * duration),
-                samplerate=self.sample_rate,
-                channels=1,
-                dtype='int16'
-            )
-            sd.wait()
+            # Record audio into the ring buffer, starting with the pre-roll
+            with self.metrics.span('capture'):
+                start = capture.mark()
+                end = capture.position + int(self.sample_rate * duration)
+                while capture.position < end and capture.running:
+                    capture.wait(end - 1, timeout=0.1)
             
             print("Recording complete. Processing...")
             
-            # Process audio
-            chunks = []
+            # Don't spend decode time on leading/trailing silence
+            audio_data = trim_silence(capture.view(start, end), self.sample_rate)
+            if len(audio_data) == 0:
+                print("No speech detected")
+                return None
+            
+            # Process audio (slices of the capture buffer, not copies)
+            decode_start = time.perf_counter()
+            transcript = Transcript()
             for i in range(0, len(audio_data), 4000):
-                chunk = audio_data[i:i+4000].tobytes()
-                if self.recognizer.AcceptWaveform(chunk):
-                    result = json.loads(self.recognizer.Result())
-                    if result.get('text'):
-                        chunks.append(result['text'])
+                if accept_waveform(self.recognizer, audio_data[i:i + 4000]):
+                    transcript.add(self.recognizer.Result())
             
             # Get final result
-            final_result = json.loads(self.recognizer.FinalResult())
-            if final_result.get('text'):
-                chunks.append(final_result['text'])
+            transcript.add(self.recognizer.FinalResult())
+            self._record_decode(time.perf_counter() - decode_start, audio_data.nbytes)
             
-            recognized_text = ' '.join(chunks).strip()
+            recognized_text = transcript.text
+            self._last_transcript = transcript
             
             if recognized_text:
                 print(f"Recognized: {recognized_text}")
@@ -93,51 +272,402 @@ class VoskASR:
             print(f"Error during recognition: {e}")
             return None
     
-    def recognize_from_file(self, file_path: str) -> Optional[str]:
+    def recognize_from_file(self, file_path: str,
+                            timeout: Optional[float] = None) -> Optional[str]:
         """
         Recognize speech from audio file.
         
+        Any PCM WAV is accepted: stereo or multichannel audio is mixed down,
+        other sample rates are resampled to self.sample_rate and 8/24/32-bit
+        samples are converted to 16-bit, block by block as the file is read.
+        
+        Safe to call from several threads: each call checks out its own
+        recognizer from the pool.
+        
+        Args:
+            file_path: Path to a PCM WAV file
+            timeout: Maximum seconds to wait for a free recognizer
+            
+        Returns:
+            Recognized text or None if recognition failed
+        """
+        transcript = self._decode_file(file_path, timeout)
+        if transcript is None:
+            return None
+        return transcript.text or None
+    
+    def recognize_file_alternatives(self, file_path: str,
+                                    timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Recognize an audio file and return its N-best hypotheses.
+        
         Args:
             file_path: Path to audio file
+            timeout: Maximum seconds to wait for a free recognizer
+            
+        Returns:
+            List of {'text', 'confidence'} dictionaries, best first (up to
+            max_alternatives; empty if recognition failed)
+        """
+        transcript = self._decode_file(file_path, timeout)
+        if transcript is None:
+            return []
+        return transcript.alternatives(self.max_alternatives)
+    
+    def recognize_file_result(self, file_path: str,
+                              timeout: Optional[float] = None) -> Optional[RecognitionResult]:
+        """
+        Recognize an audio file keeping word timings and confidences.
+        
+        Args:
+            file_path: Path to audio file
+            timeout: Maximum seconds to wait for a free recognizer
+            
+        Returns:
+            RecognitionResult (parsed lazily; empty if nothing was said) or
+            None if recognition failed
+        """
+        transcript = self._decode_file(file_path, timeout)
+        return transcript.result if transcript is not None else None
+    
+    def _decode_file(self, file_path: str,
+                     timeout: Optional[float] = None) -> Optional[Transcript]:
+        """Decode a PCM WAV file in the model's format with a pooled recognizer."""
+        if self.pool is None:
+            print("Error: Vosk model not loaded.")
+            return None
+        
+        self._refresh_grammar()
+        
+        try:
+            with self.pool.session(timeout=timeout) as recognizer:
+                decode_start = time.perf_counter()
+                audio_bytes = 0
+                transcript = Transcript()
+                # Segments are stored unparsed; offline files need no
+                # per-segment text, only the result at the end
+                segments = transcript.result
+                for block in stream_wav(file_path, target_rate=self.sample_rate,
+                                        block_frames=self.file_chunk_frames):
+                    audio_bytes += block.nbytes
+                    if accept_waveform(recognizer, block):
+                        segments.add(recognizer.Result())
+                
+                segments.add(recognizer.FinalResult())
+                self._record_decode(time.perf_counter() - decode_start, audio_bytes)
+            
+            return transcript
+            
+        except Exception as e:
+            print(f"Error processing audio file: {e}")
+            return None
+    
+    def recognize_pcm(self, chunks: Iterable[bytes],
+                      timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Recognize a stream of 16-bit mono PCM chunks.
+        
+        Each call uses its own recognizer from the pool, so several clients
+        or microphones can be served concurrently.
+        
+        Args:
+            chunks: Iterable of raw PCM byte chunks at self.sample_rate
+            timeout: Maximum seconds to wait for a free recognizer
             
         Returns:
             Recognized text or None if recognition failed
         """
-        if self.recognizer is None:
+        transcript = self._decode_pcm(chunks, timeout)
+        if transcript is None:
+            return None
+        return transcript.text or None
+    
+    def recognize_pcm_alternatives(self, chunks: Iterable[bytes],
+                                   timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Recognize a stream of 16-bit mono PCM chunks and return its N-best
+        hypotheses.
+        
+        Args:
+            chunks: Iterable of raw PCM byte chunks at self.sample_rate
+            timeout: Maximum seconds to wait for a free recognizer
+            
+        Returns:
+            List of {'text', 'confidence'} dictionaries, best first (up to
+            max_alternatives; empty if recognition failed)
+        """
+        transcript = self._decode_pcm(chunks, timeout)
+        if transcript is None:
+            return []
+        return transcript.alternatives(self.max_alternatives)
+    
+    def recognize_pcm_result(self, chunks: Iterable[bytes],
+                             timeout: Optional[float] = None) -> Optional[RecognitionResult]:
+        """
+        Recognize 16-bit mono PCM chunks keeping word timings and confidences.
+        
+        Args:
+            chunks: Iterable of raw PCM byte chunks at self.sample_rate
+            timeout: Maximum seconds to wait for a free recognizer
+            
+        Returns:
+            RecognitionResult (parsed lazily; empty if nothing was said) or
+            None if recognition failed
+        """
+        transcript = self._decode_pcm(chunks, timeout)
+        return transcript.result if transcript is not None else None
+    
+    def _decode_pcm(self, chunks: Iterable[bytes],
+                    timeout: Optional[float] = None) -> Optional[Transcript]:
+        """Decode PCM chunks with a pooled recognizer."""
+        if self.pool is None:
             print("Error: Vosk model not loaded.")
             return None
         
+        self._refresh_grammar()
+        
+        try:
+            with self.pool.session(timeout=timeout) as recognizer:
+                decode_seconds = 0.0
+                audio_bytes = 0
+                transcript = Transcript()
+                for data in chunks:
+                    decode_start = time.perf_counter()
+                    if recognizer.AcceptWaveform(data):
+                        transcript.add(recognizer.Result())
+                    decode_seconds += time.perf_counter() - decode_start
+                    audio_bytes += len(data)
+                
+                decode_start = time.perf_counter()
+                transcript.add(recognizer.FinalResult())
+                decode_seconds += time.perf_counter() - decode_start
+                self._record_decode(decode_seconds, audio_bytes)
+            
+            return transcript
+            
+        except Exception as e:
+            print(f"Error processing audio stream: {e}")
+            return None
+    
+    def stream_from_mic(self, max_duration: float = 10.0,
+                        block_size: int = 1600) -> Iterator[Dict[str, Any]]:
+        """
+        Recognize speech while it is being captured from the microphone.
+        
+        Audio is fed to the recognizer from the capture ring buffer as it
+        arrives (starting with the pre-roll), so decoding overlaps capture
+        and the final text is available as soon as Vosk detects the end of
+        the utterance.
+        
+        Args:
+            max_duration: Maximum listening time in seconds
+            block_size: Samples per captured block (1600 = 100 ms at 16 kHz)
+            
+        Yields:
+            Dictionaries with 'type' ('partial' or 'final') and 'text'.
+            The last item is always the final result, which also carries
+            the N-best 'alternatives' and the RecognitionResult ('result').
+            
+        Raises:
+            Exception: Errors of the input stream or recognizer, after
+                closing the microphone stream (reopened on next use)
+        """
+        if self.recognizer is None:
+            print("Error: Vosk model not loaded. Cannot recognize speech.")
+            return
+        
+        try:
+            yield from self._stream_events(max_duration, block_size)
+        except Exception:
+            # Don't leave a failed device open; the next use reopens it
+            self.close()
+            raise
+    
+    def _stream_events(self, max_duration: float, block_size: int) -> Iterator[Dict[str, Any]]:
+        """Decode the microphone stream (see stream_from_mic)."""
+        self._refresh_grammar()
+        self._last_transcript = None
+        
+        capture = self.capture
+        position = capture.mark()
+        last_partial = ''
+        decode_seconds = 0.0
+        audio_bytes = 0
+        capture_start = time.perf_counter()
+        deadline = time.monotonic() + max_duration
+        
+        while capture.running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            
+            if not capture.wait(position, timeout=min(remaining, 0.1)):
+                continue
+            
+            for data in capture.chunks(position, chunk_samples=block_size):
+                position += len(data) // 2
+                decode_start = time.perf_counter()
+                audio_bytes += len(data)
+                if accept_waveform(self.recognizer, data):
+                    # Vosk detected the end of the utterance
+                    transcript = Transcript()
+                    text = transcript.add(self.recognizer.Result())
+                    decode_seconds += time.perf_counter() - decode_start
+                    if text:
+                        self.metrics.record('capture', time.perf_counter() - capture_start)
+                        self._record_decode(decode_seconds, audio_bytes)
+                        self._last_transcript = transcript
+                        yield {'type': 'final', 'text': text,
+                               'alternatives': self.last_alternatives,
+                               'result': transcript.result}
+                        return
+                else:
+                    # Most blocks leave the hypothesis unchanged: compare
+                    # the raw JSON and only parse when it differs
+                    raw_partial = self.recognizer.PartialResult()
+                    decode_seconds += time.perf_counter() - decode_start
+                    if raw_partial != last_partial:
+                        last_partial = raw_partial
+                        partial = partial_text(raw_partial)
+                        if partial:
+                            yield {'type': 'partial', 'text': partial}
+        
+        self.metrics.record('capture', time.perf_counter() - capture_start)
+        decode_start = time.perf_counter()
+        transcript = Transcript()
+        text = transcript.add(self.recognizer.FinalResult())
+        self._record_decode(decode_seconds + time.perf_counter() - decode_start, audio_bytes)
+        self._last_transcript = transcript
+        yield {'type': 'final', 'text': text, 'alternatives': self.last_alternatives,
+               'result': transcript.result}
+    
+    def recognize_streaming(self, max_duration: float = 10.0,
+                            on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Listen to the microphone and return the text once speech ends.
+        
+        Args:
+            max_duration: Maximum listening time in seconds
+            on_partial: Optional callback receiving partial hypotheses
+            
+        Returns:
+            Recognized text or None if recognition failed
+        """
+        if self.recognizer is None:
+            print("Error: Vosk model not loaded. Cannot recognize speech.")
+            return None
+        
         try:
-            import wave
-            import sys
+            print(f"\nListening (up to {max_duration} seconds)...")
             
-            wf = wave.open(file_path, "rb")
+            recognized_text = ''
+            for event in self.stream_from_mic(max_duration=max_duration):
+                if event['type'] == 'partial':
+                    if on_partial is not None:
+                        on_partial(event['text'])
+                else:
+                    recognized_text = event['text'].strip()
             
-            if wf.getnchannels() != 1 or wf.getcomptype() != "NONE":
-                print("Audio file must be WAV format mono PCM.")
+            if recognized_text:
+                print(f"Recognized: {recognized_text}")
+                return recognized_text
+            else:
+                print("No speech detected")
                 return None
+                
+        except Exception as e:
+            print(f"Error during recognition: {e}")
+            return None
+    
+    def recognize_until_silence(self, max_duration: float = 10.0,
+                                hangover: float = 0.6,
+                                block_size: int = 1600,
+                                start: Optional[int] = None) -> Optional[str]:
+        """
+        Record until the speaker stops talking and recognize the speech.
+        
+        A voice activity detector decides when speech starts and ends: audio
+        before the speech is never fed to the recognizer, and capture stops
+        after `hangover` seconds of silence instead of a fixed duration.
+        
+        Args:
+            max_duration: Maximum recording duration in seconds
+            hangover: Seconds of silence that end the utterance
+            block_size: Samples per captured block
+            start: Capture position to listen from (e.g. the end of the wake
+                phrase); None starts the pre-roll before now
             
-            chunks = []
-            while True:
-                data = wf.readframes(4000)
-                if len(data) == 0:
-                    break
+        Returns:
+            Recognized text or None if recognition failed (the N-best
+            hypotheses are left in self.last_alternatives and the word data
+            in self.last_result)
+        """
+        if self.recognizer is None:
+            print("Error: Vosk model not loaded. Cannot recognize speech.")
+            return None
+        
+        self._refresh_grammar()
+        self._last_transcript = None
+        
+        try:
+            print(f"\nListening (up to {max_duration} seconds)...")
+            
+            capture = self.capture
+            vad = VoiceActivityDetector(sample_rate=self.sample_rate, hangover=hangover)
+            preroll_samples = int(self.sample_rate * capture.preroll)
+            if start is None:
+                start = capture.mark()
+            listen_start = position = max(start, capture.ring.oldest)
+            fed = None
+            transcript = Transcript()
+            decode_seconds = 0.0
+            audio_bytes = 0
+            capture_start = time.perf_counter()
+            deadline = time.monotonic() + max_duration
+            
+            while time.monotonic() < deadline and capture.running:
+                if not capture.wait(position, timeout=0.1):
+                    continue
+                
+                block_start = position
+                position = capture.position
+                ended = vad.process(capture.view(block_start, position))
+                if not vad.speech_started:
+                    continue
+                
+                if fed is None:
+                    # Start the pre-roll before the block where speech was
+                    # detected so the first phoneme isn't clipped
+                    fed = max(listen_start, block_start - preroll_samples)
                 
-                if self.recognizer.AcceptWaveform(data):
-                    result = json.loads(self.recognizer.Result())
-                    if result.get('text'):
-                        chunks.append(result['text'])
+                decode_start = time.perf_counter()
+                for data in capture.chunks(fed, position, chunk_samples=block_size):
+                    if accept_waveform(self.recognizer, data):
+                        transcript.add(self.recognizer.Result())
+                    audio_bytes += len(data)
+                decode_seconds += time.perf_counter() - decode_start
+                fed = position
+                
+                if ended:
+                    break
             
-            final_result = json.loads(self.recognizer.FinalResult())
-            if final_result.get('text'):
-                chunks.append(final_result['text'])
+            self.metrics.record('capture', time.perf_counter() - capture_start)
+            print("Recording complete. Processing...")
             
-            recognized_text = ' '.join(chunks).strip()
-            wf.close()
+            decode_start = time.perf_counter()
+            transcript.add(self.recognizer.FinalResult())
+            self._record_decode(decode_seconds + time.perf_counter() - decode_start, audio_bytes)
             
-            return recognized_text if recognized_text else None
+            recognized_text = transcript.text
+            self._last_transcript = transcript
             
+            if recognized_text:
+                print(f"Recognized: {recognized_text}")
+                return recognized_text
+            else:
+                print("No speech detected")
+                return None
+                
         except Exception as e:
-            print(f"Error processing audio file: {e}")
+            print(f"Error during recognition: {e}")
             return None
-
@@ -0,0 +1,182 @@
+"""
+Wake word module.
+Two-stage wake phrase spotting for continuous listening: a voice activity
+gate drops silence and background noise, and only the blocks around speech
+reach a small recognizer constrained to a grammar of the wake phrases. The
+full open-vocabulary recognizer runs only after a wake phrase is heard.
+"""
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from asr.result import partial_text, segment_text
+from asr.waveform import accept_waveform
+from utils.audio import detect_voice_activity
+from utils.capture import AudioCapture
+
+
+def wake_grammar(phrases: Iterable[str]) -> str:
+    """
+    Build the Vosk grammar of the wake-phrase recognizer.
+
+    Args:
+        phrases: Wake phrases
+
+    Returns:
+        JSON list of the phrases plus '[unk]', so other speech is decoded
+        as unknown instead of being forced onto a phrase
+    """
+    return json.dumps([phrase.lower() for phrase in phrases] + ['[unk]'], ensure_ascii=False)
+
+
+class WakeWordDetector:
+    """Voice activity gate in front of a grammar-constrained recognizer."""
+
+    def __init__(self, recognizer, phrases: Iterable[str], sample_rate: int = 16000,
+                 hangover: float = 0.5, preroll: float = 0.3, frame_ms: float = 30.0,
+                 energy_threshold_db: float = -40.0, zcr_threshold: float = 0.25):
+        """
+        Initialize the detector.
+
+        Args:
+            recognizer: KaldiRecognizer built with wake_grammar(phrases)
+            phrases: Wake phrases
+            sample_rate: Sample rate in Hz
+            hangover: Seconds the gate stays open after the last speech frame
+            preroll: Seconds before the first speech frame fed to the recognizer
+            frame_ms: VAD frame length in milliseconds
+            energy_threshold_db: VAD energy threshold in dBFS
+            zcr_threshold: VAD zero-crossing rate threshold
+        """
+        self.recognizer = recognizer
+        self.phrases = [f" {phrase.lower().strip()} " for phrase in phrases]
+        self.sample_rate = sample_rate
+        self.hangover_samples = int(sample_rate * hangover)
+        self.preroll_samples = int(sample_rate * preroll)
+        self.frame_length = max(1, int(sample_rate * frame_ms / 1000))
+        self.vad_options = {'frame_ms': frame_ms, 'energy_threshold_db': energy_threshold_db,
+                            'zcr_threshold': zcr_threshold}
+
+        # Samples seen by the gate and fed to the recognizer (CPU share)
+        self.samples_seen = 0
+        self.samples_decoded = 0
+        self.detections = 0
+        # End of the audio the VAD has examined; always a whole number of
+        # frames past where listening started, so no samples are skipped
+        self._examined: Optional[int] = None
+        self.reset()
+
+    def reset(self):
+        """Close the gate and drop the recognizer's hypothesis."""
+        self._fed: Optional[int] = None
+        self._last_speech = 0
+        self.recognizer.Reset()
+
+    @property
+    def decoded_fraction(self) -> float:
+        """Share of the audio seen that reached the recognizer."""
+        if not self.samples_seen:
+            return 0.0
+        return self.samples_decoded / self.samples_seen
+
+    def process(self, capture: AudioCapture, start: int, end: int) -> Optional[int]:
+        """
+        Examine a span of captured audio.
+
+        Args:
+            capture: Capture holding the audio
+            start: First position of the span
+            end: Position after the span
+
+        Returns:
+            Capture position right after the audio in which the wake phrase
+            was recognized, or None
+        """
+        self.samples_seen += end - start
+        # Continue from the partial frame left over by the previous span
+        begin = start
+        examined = self._examined
+        if examined is not None and start - self.frame_length < examined <= start:
+            begin = examined
+        begin = max(begin, capture.ring.oldest)
+        frames_end = begin + (end - begin) // self.frame_length * self.frame_length
+        self._examined = frames_end
+
+        speech = detect_voice_activity(capture.view(begin, frames_end), self.sample_rate,
+                                       **self.vad_options)
+        if speech.any():
+            last_frame = len(speech) - int(speech[::-1].argmax())
+            self._last_speech = begin + last_frame * self.frame_length
+            if self._fed is None:
+                self._fed = max(capture.ring.oldest, begin - self.preroll_samples)
+        elif self._fed is not None and end - self._last_speech > self.hangover_samples:
+            # The speech ended without a wake phrase
+            self.reset()
+            return None
+
+        if self._fed is None:
+            return None
+
+        for data in capture.chunks(self._fed, end):
+            self._fed += len(data) // 2
+            self.samples_decoded += len(data) // 2
+            if accept_waveform(self.recognizer, data):
+                text = segment_text(self.recognizer.Result())
+            else:
+                text = partial_text(self.recognizer.PartialResult())
+            if text and self._heard(text):
+                self.detections += 1
+                position = self._fed
+                self.reset()
+                return position
+        return None
+
+    def listen(self, capture: AudioCapture, timeout: Optional[float] = None,
+               should_stop: Optional[Callable[[], bool]] = None) -> Optional[int]:
+        """
+        Block until a wake phrase is heard.
+
+        Args:
+            capture: Running capture
+            timeout: Maximum seconds to listen (None listens until stopped)
+            should_stop: Polled between blocks; True gives up
+
+        Returns:
+            Capture position right after the wake phrase, or None on
+            timeout, stop or when the capture is closed
+        """
+        self.reset()
+        position = capture.position
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while capture.running:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if should_stop is not None and should_stop():
+                break
+            if not capture.wait(position, timeout=0.1):
+                continue
+            end = capture.position
+            detected = self.process(capture, max(position, capture.ring.oldest), end)
+            position = end
+            if detected is not None:
+                return detected
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarize the gate's work.
+
+        Returns:
+            Dictionary with seconds seen and decoded, the decoded fraction
+            and the number of detections
+        """
+        return {
+            'seconds_seen': self.samples_seen / self.sample_rate,
+            'seconds_decoded': self.samples_decoded / self.sample_rate,
+            'decoded_fraction': self.decoded_fraction,
+            'detections': self.detections
+        }
+
+    def _heard(self, text: str) -> bool:
+        padded = f" {text.lower()} "
+        return any(phrase in padded for phrase in self.phrases)
@@ -0,0 +1,49 @@
+"""
+Waveform hand-off module.
+Feeds PCM held in memoryviews or arrays (e.g. ring-buffer chunks) to Vosk
+recognizers without first copying it into a bytes object.
+"""
+from typing import Any, Optional, Tuple
+
+# (ffi, lib) of the vosk package, looked up on first use
+_handles: Optional[Tuple[Any, Any]] = None
+
+
+def _cffi_handles() -> Tuple[Any, Any]:
+    """cffi objects vosk uses to call libvosk, or (None, None)."""
+    global _handles
+    if _handles is None:
+        try:
+            import vosk
+            _handles = (getattr(vosk, '_ffi', None), getattr(vosk, '_c', None))
+        except Exception:
+            _handles = (None, None)
+    return _handles
+
+
+def accept_waveform(recognizer, data) -> bool:
+    """
+    Feed PCM to a recognizer without copying it.
+    
+    KaldiRecognizer.AcceptWaveform only takes bytes; memoryviews and arrays
+    are passed to libvosk through ffi.from_buffer instead of being copied
+    into a bytes object. Other recognizers get bytes.
+    
+    Args:
+        recognizer: KaldiRecognizer (or anything with AcceptWaveform(bytes))
+        data: 16-bit PCM as bytes, a memoryview or a contiguous array
+        
+    Returns:
+        True if an utterance segment ended (Result() is ready)
+    """
+    if isinstance(data, bytes):
+        return recognizer.AcceptWaveform(data)
+    view = memoryview(data).cast('B')
+    handle = getattr(recognizer, '_handle', None)
+    ffi, lib = _cffi_handles() if handle is not None else (None, None)
+    if ffi is None or lib is None:
+        return recognizer.AcceptWaveform(bytes(view))
+    result = lib.vosk_recognizer_accept_waveform(handle, ffi.from_buffer(view), len(view))
+    if result < 0:
+        raise Exception("Failed to process waveform")
+    return bool(result)
@@ -1,48 +1,117 @@
 """
 Actions module for executing intents.
-Simulates actions like turning lights on/off, getting time, etc.
+Simulates actions like turning lights on/off, getting time, etc. Actions
+are looked up in an ActionRegistry, so plugins can add or replace them
+with register_action.
 """
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
 
+from executor.registry import ActionRegistry
+from nlu.matcher import get_intent_names
+
+
+def _greet(intent_data: Dict[str, Any]) -> str:
+    return "¡Hola! ¿En qué puedo ayudarte?"
+
+
+def _tell_time(intent_data: Dict[str, Any]) -> str:
+    now = datetime.now()
+    hour = now.hour
+    minute = now.minute
+    return f"Son las {hour} con {minute} minutos"
+
+
+def _light_on(intent_data: Dict[str, Any]) -> str:
+    # Simulate turning on light
+    room = (intent_data.get('entities') or {}).get('room')
+    if room:
+        print(f"Light turned ON ({room})")
+        return f"Luz {_of_room(room)} encendida"
+    print("Light turned ON")
+    return "Luz encendida"
+
+
+def _light_off(intent_data: Dict[str, Any]) -> str:
+    # Simulate turning off light
+    room = (intent_data.get('entities') or {}).get('room')
+    if room:
+        print(f"Light turned OFF ({room})")
+        return f"Luz {_of_room(room)} apagada"
+    print("Light turned OFF")
+    return "Luz apagada"
+
+
+def _not_understood(intent_data: Dict[str, Any]) -> str:
+    raw_text = intent_data.get('raw_text', '')
+    return f"No entiendo el comando: '{raw_text}'. Por favor, intenta de nuevo."
+
+
+# Built-in actions return immediately, so they run inline without a timeout
+_registry = ActionRegistry()
+_registry.register('saludo', _greet)
+_registry.register('hora', _tell_time)
+_registry.register('encender_luz', _light_on)
+_registry.register('apagar_luz', _light_off)
+_registry.register('unknown', _not_understood)
+
+
+def get_action_registry() -> ActionRegistry:
+    """
+    Get the action registry used by execute.
+    
+    Returns:
+        The shared ActionRegistry
+    """
+    return _registry
+
+
+def register_action(intent: str, handler: Callable[[Dict[str, Any]], Any],
+                    timeout: Optional[float] = 2.0, fallback: Optional[str] = None):
+    """
+    Add or replace the action of an intent.
+    
+    Args:
+        intent: Intent name
+        handler: Function or coroutine function receiving the intent data
+            and returning the response text
+        timeout: Maximum seconds the action may take before the fallback is
+            spoken (it runs on the action worker pool); None runs plain
+            functions inline, for actions that never block
+        fallback: Response when the timeout expires
+    """
+    _registry.register(intent, handler, timeout, fallback)
+
+
+def unregister_action(intent: str):
+    """
+    Remove the action of an intent.
+    
+    Args:
+        intent: Intent name
+    """
+    _registry.unregister(intent)
+
 
 def execute(intent_data: Dict[str, Any]) -> str:
     """
     Execute action based on intent.
     
     Args:
-        intent_data: Dictionary with 'intent' and 'raw_text'
+        intent_data: Dictionary with 'intent', 'raw_text' and optionally
+            'entities' (e.g. the 'room' of a light command)
         
     Returns:
         Response text to be spoken
     """
-    intent = intent_data.get('intent', 'unknown')
-    
-    if intent == 'saludo':
-        return "¡Hola! ¿En qué puedo ayudarte?"
-    
-    elif intent == 'hora':
-        now = datetime.now()
-        hour = now.hour
-        minute = now.minute
-        return f"Son las {hour} con {minute} minutos"
-    
-    elif intent == 'encender_luz':
-        # Simulate turning on light
-        print("Light turned ON")
-        return "Luz encendida"
-    
-    elif intent == 'apagar_luz':
-        # Simulate turning off light
-        print("Light turned OFF")
-        return "Luz apagada"
-    
-    elif intent == 'unknown':
-        raw_text = intent_data.get('raw_text', '')
-        return f"No entiendo el comando: '{raw_text}'. Por favor, intenta de nuevo."
-    
-    else:
-        return "Lo siento, no pude procesar tu solicitud."
+    return _registry.execute(intent_data)
+
+
+def _of_room(room: str) -> str:
+    """Room with its preposition and article ("de la cocina", "del salón")."""
+    if room in ('cocina', 'oficina', 'terraza', 'entrada'):
+        return f"de la {room}"
+    return f"del {room}"
 
 
 def get_system_status() -> str:
@@ -55,11 +124,15 @@ def get_system_status() -> str:
     return "Sistema funcionando correctamente"
 
 
-def list_available_intents() -> list:
+def list_available_intents() -> List[str]:
     """
-    List all available intents.
+    List all available intents: those declared in the intent registry, in
+    priority order, then the other intents of the action registry (such
+    as 'unknown' or actions added by plugins).
     
     Returns:
         List of intent names
     """
-    return ['saludo', 'hora', 'encender_luz', 'apagar_luz', 'unknown']
+    names = get_intent_names()
+    declared = set(names)
+    return names + [name for name in _registry.names() if name not in declared]
@@ -0,0 +1,181 @@
+"""
+Action registry module.
+Maps intent names to action handlers for constant-time dispatch. Handlers
+may be plain functions or coroutines; actions registered with a timeout run
+on a shared worker pool (coroutines on a background event loop) and answer
+with a fallback response when they take too long.
+"""
+import asyncio
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_ERROR_RESPONSE = "Lo siento, no pude procesar tu solicitud."
+DEFAULT_TIMEOUT_RESPONSE = "Lo siento, la acción está tardando demasiado."
+
+
+class _Action:
+    """A registered handler and how to run it."""
+
+    __slots__ = ('handler', 'timeout', 'fallback', 'is_async')
+
+    def __init__(self, handler: Callable, timeout: Optional[float], fallback: Optional[str]):
+        self.handler = handler
+        self.timeout = timeout
+        self.fallback = fallback
+        self.is_async = inspect.iscoroutinefunction(handler)
+
+
+class ActionRegistry:
+    """Intent name -> action handler table."""
+
+    def __init__(self, max_workers: int = 4, default_response: str = DEFAULT_ERROR_RESPONSE,
+                 timeout_response: str = DEFAULT_TIMEOUT_RESPONSE):
+        """
+        Initialize the registry.
+
+        Args:
+            max_workers: Threads running actions that have a timeout
+            default_response: Response for intents without an action and
+                for actions that raise
+            timeout_response: Response for actions that time out without a
+                fallback of their own
+        """
+        self.max_workers = max_workers
+        self.default_response = default_response
+        self.timeout_response = timeout_response
+
+        # Replaced as a whole on changes, so dispatch reads it without locking
+        self._actions: Dict[str, _Action] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+
+    def register(self, intent: str, handler: Callable[[Dict[str, Any]], Any],
+                 timeout: Optional[float] = None, fallback: Optional[str] = None):
+        """
+        Add or replace the action of an intent.
+
+        Args:
+            intent: Intent name
+            handler: Function or coroutine function receiving the intent
+                data (see execute) and returning the response text
+            timeout: Maximum seconds the action may take; it then runs on
+                the worker pool and the fallback is returned when it
+                expires. None runs plain functions inline (for actions that
+                cannot block) and waits for coroutines without a limit.
+            fallback: Response when the timeout expires (defaults to
+                timeout_response)
+        """
+        if not callable(handler):
+            raise TypeError(f"Action handler for '{intent}' is not callable")
+        action = _Action(handler, timeout, fallback)
+        with self._lock:
+            actions = dict(self._actions)
+            actions[intent] = action
+            self._actions = actions
+
+    def unregister(self, intent: str):
+        """
+        Remove the action of an intent.
+
+        Args:
+            intent: Intent name
+        """
+        with self._lock:
+            if intent in self._actions:
+                actions = dict(self._actions)
+                del actions[intent]
+                self._actions = actions
+
+    def names(self) -> List[str]:
+        """
+        Get the intents that have an action, in registration order.
+
+        Returns:
+            List of intent names
+        """
+        return list(self._actions)
+
+    def __contains__(self, intent: str) -> bool:
+        return intent in self._actions
+
+    def execute(self, intent_data: Dict[str, Any]) -> str:
+        """
+        Run the action of an intent.
+
+        Args:
+            intent_data: Dictionary with 'intent', 'raw_text' and optionally
+                'entities'
+
+        Returns:
+            Response text (the fallback if the action timed out, the
+            default response if there is no action or it failed)
+        """
+        intent = intent_data.get('intent', 'unknown')
+        action = self._actions.get(intent)
+        if action is None:
+            return self.default_response
+
+        try:
+            if action.timeout is None and not action.is_async:
+                return action.handler(intent_data)
+            future = self._submit(action, intent_data)
+        except Exception as e:
+            print(f"Error running action '{intent}': {e}")
+            return self.default_response
+
+        try:
+            return future.result(action.timeout)
+        except FutureTimeout:
+            # Coroutines are cancelled; a blocked thread finishes on its own
+            future.cancel()
+            print(f"Warning: Action '{intent}' timed out after {action.timeout}s")
+            return action.fallback if action.fallback is not None else self.timeout_response
+        except Exception as e:
+            print(f"Error running action '{intent}': {e}")
+            return self.default_response
+
+    def shutdown(self):
+        """Stop the worker pool and the event loop (they restart on demand)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            loop, self._loop = self._loop, None
+            thread, self._loop_thread = self._loop_thread, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def _submit(self, action: _Action, intent_data: Dict[str, Any]):
+        """Start an action on the pool or the event loop; returns its future."""
+        if action.is_async:
+            return asyncio.run_coroutine_threadsafe(action.handler(intent_data),
+                                                    self._event_loop())
+        return self._worker_pool().submit(action.handler, intent_data)
+
+    def _worker_pool(self) -> ThreadPoolExecutor:
+        pool = self._pool
+        if pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="action")
+                pool = self._pool
+        return pool
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        loop = self._loop
+        if loop is None:
+            with self._lock:
+                if self._loop is None:
+                    self._loop = asyncio.new_event_loop()
+                    self._loop_thread = threading.Thread(target=self._loop.run_forever,
+                                                         name="action-loop", daemon=True)
+                    self._loop_thread.start()
+                loop = self._loop
+        return loop
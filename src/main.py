@@ -4,74 +4,240 @@ Connects all modules: audio → text → intent → action → speech
 """
 import sys
 import os
+import time
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from asr.vosk_asr import VoskASR
-from nlu.matcher import match_intent
+# Only the lightweight NLU/executor modules are imported up front; ASR
+# (vosk, sounddevice, numpy) and TTS (pyttsx3) load on first use.
+from nlu.matcher import get_registry, match_alternatives, match_intent
 from executor.actions import execute
-from tts.tts_engine import TTSEngine
-from utils.audio import check_microphone
+from utils.metrics import Metrics
 
 
 class VoiceRecognizer:
     """Main voice recognition system."""
     
-    def __init__(self, model_path: str = "../models"):
+    def __init__(self, model_path: str = "../models", max_duration: float = 10.0,
+                 silence_hangover: float = 0.6, grammar: bool = False,
+                 text_only: bool = False, pool_size: int = 4,
+                 tts_cache_dir: str = None, async_tts: bool = False,
+                 metrics: bool = True, fuzzy: bool = False, max_alternatives: int = 0):
         """
         Initialize voice recognizer system.
         
+        The ASR model, TTS driver and microphone are initialized on first
+        use, so text processing starts without loading them.
+        
         Args:
             model_path: Path to Vosk model
+            max_duration: Maximum capture length per command in seconds
+            silence_hangover: Seconds of silence that end a command
+            grammar: Restrict ASR to the phrases of the registered intents
+            text_only: Never load audio components (process_text only)
+            pool_size: Recognizers available for concurrent file/PCM requests
+            tts_cache_dir: Directory caching rendered responses (None disables it)
+            async_tts: Speak responses on a background worker so the next
+                command can be captured while the previous one is spoken
+            metrics: Collect per-stage latency and ASR real-time factor
+            fuzzy: Accept intent phrases with small recognition errors
+                (e.g. "enciende la lus") instead of answering unknown
+            max_alternatives: Ask the ASR for this many N-best hypotheses
+                and take the intent of the first one that matches
+                confidently (0 uses only the best hypothesis)
         """
         print("Initializing Voice Recognizer...")
         
-        # Initialize components
-        self.asr = VoskASR(model_path=model_path)
-        self.tts = TTSEngine(language='spanish')
+        self.model_path = model_path
+        self.max_duration = max_duration
+        self.silence_hangover = silence_hangover
+        self.grammar = grammar
+        self.text_only = text_only
+        self.pool_size = pool_size
+        self.tts_cache_dir = tts_cache_dir
+        self.async_tts = async_tts
+        self.metrics = Metrics(enabled=metrics)
+        self.fuzzy = fuzzy
+        self.max_alternatives = max_alternatives
         
-        # Check microphone
-        if not check_microphone():
-            print("Warning: Microphone not detected")
+        self._asr = None
+        self._tts = None
+        self._speech = None
+        self.last_speech = None
+        self._logs = {}
         
         print("Voice Recognizer ready!")
     
-    def process_command(self, duration: float = 3.0, log_file: str = None) -> bool:
+    @property
+    def asr(self):
+        """Vosk ASR, loaded and checked against the microphone on first use."""
+        if self._asr is None:
+            from asr.vosk_asr import VoskASR
+            from utils.audio import check_microphone
+            
+            self._asr = VoskASR(model_path=self.model_path, grammar=self.grammar,
+                                pool_size=self.pool_size, metrics=self.metrics,
+                                max_alternatives=self.max_alternatives)
+            
+            # Check microphone
+            if not check_microphone():
+                print("Warning: Microphone not detected")
+        return self._asr
+    
+    @property
+    def tts(self):
+        """TTS engine, initialized on first use."""
+        if self._tts is None:
+            from tts.tts_engine import TTSEngine
+            self._tts = TTSEngine(language='spanish', cache_dir=self.tts_cache_dir)
+        return self._tts
+    
+    @property
+    def speech(self):
+        """Background TTS worker, started on first use."""
+        if self._speech is None:
+            from tts.worker import TTSWorker
+            from tts.tts_engine import TTSEngine
+            self._speech = TTSWorker(
+                lambda: TTSEngine(language='spanish', cache_dir=self.tts_cache_dir)
+            )
+        return self._speech
+    
+    def preload(self):
+        """Initialize ASR and TTS now instead of on the first command."""
+        if self.text_only:
+            return
+        self.asr
+        if self.async_tts:
+            self.speech
+        else:
+            self.tts
+    
+    def close(self):
+        """Stop background workers and the microphone, and flush the transcription logs."""
+        if self._speech is not None:
+            self._speech.shutdown(cancel_pending=True)
+            self._speech = None
+        for log in self._logs.values():
+            log.close()
+        self._logs.clear()
+        if self._asr is not None:
+            self._asr.close()
+    
+    def process_command(self, duration: float = None, log_file: str = None,
+                        streaming: bool = False, vad: bool = True,
+                        start: Optional[int] = None) -> bool:
         """
         Process a voice command.
         
         Args:
-            duration: Recording duration in seconds
+            duration: Recording duration in seconds; with VAD or streaming this
+                is the maximum duration (defaults to self.max_duration)
             log_file: Optional log file path
+            streaming: Decode while capturing and stop at the end of speech
+            vad: End capture on silence instead of after a fixed duration
+            start: Capture position the command starts at (the end of the
+                wake phrase); used with VAD capture
             
         Returns:
             True if successful, False otherwise
         """
+        if self.text_only:
+            print("Error: Voice commands are disabled in text-only mode.")
+            return False
+        
+        if duration is None:
+            duration = self.max_duration
+        
+        # Barge-in: a new command silences whatever is still being said
+        if self._speech is not None:
+            self._speech.cancel_all()
+        
+        asr = self.asr
+        command_start = time.perf_counter()
+        
         # 1. Recognize speech
-        text = self.asr.recognize_from_mic(duration=duration)
+        with self.metrics.span('asr') as asr_span:
+            if streaming:
+                text = asr.recognize_streaming(
+                    max_duration=duration,
+                    on_partial=lambda partial: print(f"  ... {partial}")
+                )
+            elif vad:
+                text = asr.recognize_until_silence(
+                    max_duration=duration,
+                    hangover=self.silence_hangover,
+                    start=start
+                )
+            else:
+                text = asr.recognize_from_mic(duration=duration)
         
         if not text:
             return False
         
-        # Log transcription
-        if log_file:
-            self._log_transcription(text, log_file)
-        
         # 2. Match intent
-        intent_data = match_intent(text)
+        with self.metrics.span('nlu') as nlu_span:
+            alternatives = asr.last_alternatives if self.max_alternatives > 1 else None
+            intent_data = self._match(text, alternatives)
         print(f"Intent: {intent_data['intent']} (confidence: {intent_data['confidence']})")
         
         # 3. Execute action
-        response = execute(intent_data)
+        with self.metrics.span('action') as action_span:
+            response = execute(intent_data)
         print(f"Response: {response}")
         
+        # Log transcription (queued; written on the log's own thread)
+        if log_file:
+            self._log_transcription(text, log_file, intent_data, {
+                'asr': asr_span.elapsed, 'nlu': nlu_span.elapsed, 'action': action_span.elapsed
+            })
+        
         # 4. Speak response
-        self.tts.speak(response)
+        if self.async_tts:
+            self.last_speech = self.speech.submit(response, interrupt=True)
+            self._time_speech(self.last_speech)
+        else:
+            with self.metrics.span('tts'):
+                self.tts.speak(response)
         
+        self.metrics.record('command', time.perf_counter() - command_start)
         return True
     
+    def _match(self, text: str,
+               alternatives: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Match the intent of a recognized command.
+        
+        Args:
+            text: Best hypothesis
+            alternatives: Ranked N-best hypotheses of the same utterance
+            
+        Returns:
+            Intent data for execute()
+        """
+        if alternatives and len(alternatives) > 1:
+            intent_data = match_alternatives([alternative['text'] for alternative in alternatives],
+                                             fuzzy=self.fuzzy, cache=True)
+            if intent_data['alternative']:
+                print(f"Using alternative {intent_data['alternative']}: {intent_data['raw_text']}")
+            return intent_data
+        return match_intent(text, fuzzy=self.fuzzy, cache=True)
+    
+    def _time_speech(self, handle):
+        """Record the TTS latency of an asynchronous utterance once it finishes."""
+        if not self.metrics.enabled:
+            return
+        submitted = time.perf_counter()
+        
+        def done(future):
+            if not future.cancelled():
+                self.metrics.record('tts', time.perf_counter() - submitted)
+        
+        handle.future.add_done_callback(done)
+    
     def process_text(self, text: str) -> str:
         """
         Process text input directly (for testing).
@@ -85,37 +251,168 @@ class VoiceRecognizer:
         print(f"Processing text: {text}")
         
         # Match intent
-        intent_data = match_intent(text)
+        with self.metrics.span('nlu'):
+            intent_data = match_intent(text, fuzzy=self.fuzzy, cache=True)
         print(f"Intent: {intent_data['intent']}")
         
         # Execute action
-        response = execute(intent_data)
+        with self.metrics.span('action'):
+            response = execute(intent_data)
         print(f"Response: {response}")
         
         return response
     
-    def _log_transcription(self, text: str, log_file: str):
+    def _log_transcription(self, text: str, log_file: str,
+                           intent_data: Optional[Dict[str, Any]] = None,
+                           latencies: Optional[Dict[str, float]] = None):
         """
-        Log transcription to file.
+        Queue a transcription record for the JSONL log.
         
         Args:
             text: Transcription text
             log_file: Log file path
+            intent_data: Matched intent
+            latencies: Stage latencies in seconds
+        """
+        log = self._logs.get(log_file)
+        if log is None:
+            from utils.transcription_log import TranscriptionLog
+            log = self._logs[log_file] = TranscriptionLog(log_file)
+        intent_data = intent_data or {}
+        log.log(text, intent=intent_data.get('intent'),
+                confidence=intent_data.get('confidence'),
+                latencies=latencies if self.metrics.enabled else None)
+    
+    def run_pipeline(self, log_file: str = None, queue_size: int = 2,
+                     max_commands: int = None, metrics_file: str = None):
         """
+        Listen continuously with capture, decode, NLU/action and speech
+        overlapping across consecutive commands.
+        
+        Args:
+            log_file: Optional log file path
+            queue_size: Capacity of the queues between stages
+            max_commands: Stop after this many commands (None runs until Ctrl+C)
+            metrics_file: Optional JSON file receiving a metrics snapshot on exit
+        """
+        import asyncio
+        from pipeline import VoicePipeline
+        from utils.audio import record_until_silence
+        
+        if self.text_only:
+            print("Error: Voice commands are disabled in text-only mode.")
+            return
+        
+        asr = self.asr
+        
+        def capture():
+            with self.metrics.span('capture'):
+                audio = record_until_silence(
+                    max_duration=self.max_duration,
+                    sample_rate=asr.sample_rate,
+                    hangover=self.silence_hangover,
+                    capture=asr.capture
+                )
+            return audio.tobytes() if len(audio) else None
+        
+        def decode(pcm):
+            chunk = 8000
+            chunks = (pcm[i:i + chunk] for i in range(0, len(pcm), chunk))
+            if self.max_alternatives > 1:
+                return asr.recognize_pcm_alternatives(chunks) or None
+            return asr.recognize_pcm(chunks)
+        
+        def handle(decoded):
+            # Text, or the N-best hypotheses when alternatives are enabled
+            alternatives = decoded if isinstance(decoded, list) else None
+            text = alternatives[0]['text'] if alternatives else decoded
+            with self.metrics.span('nlu') as nlu_span:
+                intent_data = self._match(text, alternatives)
+            print(f"Intent: {intent_data['intent']} (confidence: {intent_data['confidence']})")
+            with self.metrics.span('action') as action_span:
+                response = execute(intent_data)
+            print(f"Response: {response}")
+            if log_file:
+                self._log_transcription(text, log_file, intent_data, {
+                    'nlu': nlu_span.elapsed, 'action': action_span.elapsed
+                })
+            return {'text': text, 'intent': intent_data, 'response': response}
+        
+        def speak(result):
+            # Runs on the pipeline's speech thread, which owns the TTS engine
+            with self.metrics.span('tts'):
+                self.tts.speak(result['response'])
+        
+        pipeline = VoicePipeline(capture, decode, handle, speak, queue_size=queue_size)
+        
+        print("\nVoice Recognizer - Pipeline Mode (Ctrl+C to quit)")
         try:
-            with open(log_file, 'a', encoding='utf-8') as f:
-                from datetime import datetime
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f"{timestamp} | {text}\n")
-        except Exception as e:
-            print(f"Warning: Could not write to log file: {e}")
+            asyncio.run(pipeline.run(max_utterances=max_commands))
+        except KeyboardInterrupt:
+            print("\n\nGoodbye!")
+        except RuntimeError as e:
+            print(f"Error: {e}")
+        finally:
+            self.close()
+        
+        if metrics_file:
+            self.metrics.write_snapshot(metrics_file)
+        
+        stats = pipeline.stats
+        print(f"Commands: {stats['captured']} captured, {stats['decoded']} recognized, "
+              f"{stats['spoken']} answered")
     
-    def run_interactive(self, log_file: str = None):
+    def run_wake_word(self, wake_phrases: List[str], log_file: str = None,
+                      max_commands: int = None, metrics_file: str = None):
+        """
+        Listen continuously and process a command after each wake phrase.
+        
+        While waiting, only a voice activity gate and a small recognizer
+        restricted to the wake phrases run; the full recognizer decodes
+        just the command that follows ("oye asistente, enciende la luz").
+        
+        Args:
+            wake_phrases: Phrases that activate the assistant
+            log_file: Optional log file path
+            max_commands: Stop after this many commands (None runs until Ctrl+C)
+            metrics_file: Optional JSON file refreshed after every command
+        """
+        if self.text_only:
+            print("Error: Voice commands are disabled in text-only mode.")
+            return
+        
+        self.preload()
+        asr = self.asr
+        print(f"\nVoice Recognizer - Wake Word Mode: say '{wake_phrases[0]}' (Ctrl+C to quit)")
+        
+        commands = 0
+        try:
+            while max_commands is None or commands < max_commands:
+                position = asr.wait_for_wake_word(wake_phrases)
+                if position is None:
+                    # Model missing or microphone closed
+                    break
+                print("Wake word detected")
+                if not self.process_command(log_file=log_file, start=position):
+                    print("No command heard.")
+                commands += 1
+                if metrics_file:
+                    self.metrics.write_snapshot(metrics_file)
+        except KeyboardInterrupt:
+            print("\n\nGoodbye!")
+        finally:
+            self.close()
+    
+    def run_interactive(self, log_file: str = None, streaming: bool = False,
+                        metrics_file: str = None):
         """
         Run in interactive mode (process commands until user exits).
         
         Args:
             log_file: Optional log file path
+            streaming: Use streaming recognition for each command
+            metrics_file: Optional JSON file refreshed with a metrics
+                snapshot after every command
         """
         print("\nVoice Recognizer - Interactive Mode")
         print("=" * 50)
@@ -127,39 +424,99 @@ class VoiceRecognizer:
         print("  - Type 'exit' or press Ctrl+C to quit")
         print("=" * 50)
         
+        # Load the model before the first prompt rather than after it
+        self.preload()
+        
         try:
             while True:
-                user_input = input("\nPress Enter to start recording (or 'exit' to quit): ")
+                if self.text_only:
+                    user_input = input("\nType a command (or 'exit' to quit): ")
+                else:
+                    user_input = input("\nPress Enter to start recording (or 'exit' to quit): ")
                 
                 if user_input.lower() in ['exit', 'quit', 'q']:
                     print("Goodbye!")
                     break
                 
-                success = self.process_command(duration=3.0, log_file=log_file)
+                if self.text_only:
+                    if user_input.strip():
+                        self.process_text(user_input)
+                else:
+                    success = self.process_command(log_file=log_file, streaming=streaming)
+                    
+                    if not success:
+                        print("No speech detected. Try again.")
                 
-                if not success:
-                    print("No speech detected. Try again.")
+                if metrics_file:
+                    self.metrics.write_snapshot(metrics_file)
         
         except KeyboardInterrupt:
             print("\n\nGoodbye!")
         except Exception as e:
             print(f"\nError: {e}")
+        finally:
+            self.close()
 
 
 def main():
     """Main entry point."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Voice Recognizer Local")
+    parser.add_argument("--text", action="store_true",
+                        help="Text-only mode: type commands, no audio components")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Decode while recording and stop at the end of speech")
+    parser.add_argument("--grammar", action="store_true",
+                        help="Restrict recognition to the known intent phrases")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Listen continuously, overlapping consecutive commands")
+    parser.add_argument("--model", default=None, help="Path to Vosk model directory")
+    parser.add_argument("--metrics-file", default=None,
+                        help="JSON file with per-stage latency metrics, updated after each command")
+    parser.add_argument("--no-metrics", action="store_true",
+                        help="Disable latency instrumentation")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="Accept intent phrases with small recognition errors")
+    parser.add_argument("--alternatives", type=int, default=0,
+                        help="N-best ASR hypotheses tried by the intent matcher (0 disables)")
+    parser.add_argument("--nlu-backend", choices=['regex', 'index'], default=None,
+                        help="Intent matching backend ('index' scales to thousands of intents)")
+    parser.add_argument("--wake-word", action="append", default=None, metavar="PHRASE",
+                        help="Listen continuously and take a command after this phrase "
+                             "(repeat for several phrases)")
+    args = parser.parse_args()
+    
+    # The intent registry is shared by the whole process
+    if args.nlu_backend is not None:
+        get_registry().set_backend(args.nlu_backend)
+    
     print("Voice Recognizer Local - Offline Speech Recognition")
     print("=" * 60)
     
     # Create logs directory if it doesn't exist
     os.makedirs("logs", exist_ok=True)
-    log_file = "logs/transcriptions.log"
+    log_file = "logs/transcriptions.jsonl"
     
     # Initialize and run - models path points to specific model folder
-    project_root = os.path.dirname(os.path.dirname(__file__))
-    models_path = os.path.join(project_root, "models", "vosk-model-small-es-0.42")
-    recognizer = VoiceRecognizer(model_path=models_path)
-    recognizer.run_interactive(log_file=log_file)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    models_path = args.model
+    if models_path is None:
+        models_path = os.path.join(project_root, "models", "vosk-model-small-es-0.42")
+    recognizer = VoiceRecognizer(model_path=models_path, grammar=args.grammar,
+                                 text_only=args.text,
+                                 tts_cache_dir=os.path.join(project_root, "cache", "tts"),
+                                 async_tts=True, metrics=not args.no_metrics,
+                                 fuzzy=args.fuzzy,
+                                 max_alternatives=args.alternatives)
+    if args.wake_word and not args.text:
+        recognizer.run_wake_word(args.wake_word, log_file=log_file,
+                                 metrics_file=args.metrics_file)
+    elif args.pipeline and not args.text:
+        recognizer.run_pipeline(log_file=log_file, metrics_file=args.metrics_file)
+    else:
+        recognizer.run_interactive(log_file=log_file, streaming=args.streaming,
+                                   metrics_file=args.metrics_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,481 @@
+"""
+Entity extraction module.
+Pulls numbers, times, durations, rooms and devices out of Spanish and
+English utterances ("enciende la luz de la cocina", "pon un temporizador de
+veinte minutos", "a las siete y media") in a single left-to-right pass over
+the tokens, using lookup tables built once at import time.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from nlu.fuzzy import fold
+
+# Clock times ("7:30") are kept as one token
+_TOKEN = re.compile(r'\d{1,2}:\d\d|\w+')
+
+# Folded forms of the accented words seen so far
+_FOLDED: Dict[str, str] = {}
+
+_UNITS = {
+    'cero': 0, 'uno': 1, 'dos': 2, 'tres': 3, 'cuatro': 4, 'cinco': 5,
+    'seis': 6, 'siete': 7, 'ocho': 8, 'nueve': 9, 'diez': 10, 'once': 11,
+    'doce': 12, 'trece': 13, 'catorce': 14, 'quince': 15, 'dieciseis': 16,
+    'diecisiete': 17, 'dieciocho': 18, 'diecinueve': 19, 'veintiuno': 21,
+    'veintiun': 21, 'veintiuna': 21, 'veintidos': 22, 'veintitres': 23,
+    'veinticuatro': 24, 'veinticinco': 25, 'veintiseis': 26,
+    'veintisiete': 27, 'veintiocho': 28, 'veintinueve': 29,
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11,
+    'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15,
+    'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19,
+}
+_TENS = {
+    'veinte': 20, 'treinta': 30, 'cuarenta': 40, 'cincuenta': 50,
+    'sesenta': 60, 'setenta': 70, 'ochenta': 80, 'noventa': 90,
+    'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50, 'sixty': 60,
+    'seventy': 70, 'eighty': 80, 'ninety': 90,
+}
+_HUNDREDS = {
+    'cien': 100, 'ciento': 100, 'doscientos': 200, 'doscientas': 200,
+    'trescientos': 300, 'trescientas': 300, 'cuatrocientos': 400,
+    'cuatrocientas': 400, 'quinientos': 500, 'quinientas': 500,
+    'seiscientos': 600, 'seiscientas': 600, 'setecientos': 700,
+    'setecientas': 700, 'ochocientos': 800, 'ochocientas': 800,
+    'novecientos': 900, 'novecientas': 900,
+}
+# Articles that only count as "one" right before a unit or multiplier
+# ("una hora", "a minute", "un temporizador" is not a number)
+_ARTICLES = {'un': 1, 'una': 1, 'a': 1, 'an': 1}
+# "media hora", "half an hour"
+_HALVES = {'media', 'medio', 'half'}
+
+# Every token that can start or continue a number, for the hot-path check
+_NUMBER_WORDS = set(_UNITS) | set(_TENS) | set(_HUNDREDS) | {'mil', 'thousand', 'hundred'}
+
+# Duration units as token sequences -> seconds
+_DURATION_UNITS = {
+    ('segundo',): 1, ('segundos',): 1, ('seg',): 1, ('second',): 1,
+    ('seconds',): 1, ('sec',): 1, ('secs',): 1,
+    ('minuto',): 60, ('minutos',): 60, ('min',): 60, ('mins',): 60,
+    ('minute',): 60, ('minutes',): 60,
+    ('hora',): 3600, ('horas',): 3600, ('h',): 3600, ('hour',): 3600,
+    ('hours',): 3600, ('hr',): 3600, ('hrs',): 3600,
+    ('dia',): 86400, ('dias',): 86400, ('day',): 86400, ('days',): 86400,
+    ('cuarto', 'de', 'hora'): 900, ('cuartos', 'de', 'hora'): 900,
+    ('quarter', 'of', 'an', 'hour'): 900, ('quarter', 'hour'): 900,
+    ('quarters', 'of', 'an', 'hour'): 900,
+}
+
+# Rooms and devices as token sequences -> canonical (Spanish) name
+_ROOMS = {
+    ('cocina',): 'cocina', ('kitchen',): 'cocina',
+    ('salon',): 'salón', ('sala',): 'salón', ('living',): 'salón',
+    ('living', 'room'): 'salón', ('lounge',): 'salón',
+    ('dormitorio',): 'dormitorio', ('habitacion',): 'dormitorio',
+    ('cuarto',): 'dormitorio', ('recamara',): 'dormitorio',
+    ('bedroom',): 'dormitorio',
+    ('bano',): 'baño', ('aseo',): 'baño', ('cuarto', 'de', 'bano'): 'baño',
+    ('bathroom',): 'baño',
+    ('comedor',): 'comedor', ('dining', 'room'): 'comedor',
+    ('garaje',): 'garaje', ('garage',): 'garaje',
+    ('jardin',): 'jardín', ('garden',): 'jardín',
+    ('pasillo',): 'pasillo', ('hallway',): 'pasillo', ('hall',): 'pasillo',
+    ('oficina',): 'oficina', ('despacho',): 'oficina', ('estudio',): 'oficina',
+    ('office',): 'oficina', ('study',): 'oficina',
+    ('terraza',): 'terraza', ('balcon',): 'terraza', ('terrace',): 'terraza',
+    ('balcony',): 'terraza',
+    ('entrada',): 'entrada', ('entrance',): 'entrada',
+}
+_DEVICES = {
+    ('luz',): 'luz', ('luces',): 'luz', ('light',): 'luz', ('lights',): 'luz',
+    ('lampara',): 'lámpara', ('lamparas',): 'lámpara', ('lamp',): 'lámpara',
+    ('ventilador',): 'ventilador', ('fan',): 'ventilador',
+    ('television',): 'televisión', ('tele',): 'televisión',
+    ('tv',): 'televisión', ('tv', 'set'): 'televisión',
+    ('calefaccion',): 'calefacción', ('heating',): 'calefacción',
+    ('heater',): 'calefacción',
+    ('aire', 'acondicionado'): 'aire acondicionado', ('aire',): 'aire acondicionado',
+    ('air', 'conditioning'): 'aire acondicionado',
+    ('air', 'conditioner'): 'aire acondicionado',
+    ('persiana',): 'persiana', ('persianas',): 'persiana',
+    ('blinds',): 'persiana', ('shutters',): 'persiana',
+    ('radio',): 'radio', ('musica',): 'música', ('music',): 'música',
+    ('puerta',): 'puerta', ('door',): 'puerta',
+    ('enchufe',): 'enchufe', ('plug',): 'enchufe',
+}
+
+# Words introducing a clock time ("a las siete", "a la una", "at seven")
+_TIME_TRIGGERS = {'las', 'at'}
+_NAMED_TIMES = {
+    'mediodia': (12, 0), 'noon': (12, 0), 'midday': (12, 0),
+    'medianoche': (0, 0), 'midnight': (0, 0),
+}
+_MINUTE_WORDS = {'media': 30, 'cuarto': 15, 'half': 30, 'quarter': 15}
+# Suffixes after the hour, with the offset applied to 1-11 o'clock
+_MERIDIEMS = {
+    ('pm',): 12, ('p', 'm'): 12, ('de', 'la', 'tarde'): 12,
+    ('de', 'la', 'noche'): 12, ('in', 'the', 'afternoon'): 12,
+    ('in', 'the', 'evening'): 12, ('at', 'night'): 12,
+    ('am',): 0, ('a', 'm'): 0, ('de', 'la', 'manana'): 0,
+    ('de', 'la', 'madrugada'): 0, ('in', 'the', 'morning'): 0,
+}
+_OCLOCK = {('en', 'punto'): True, ('o', 'clock'): True, ('oclock',): True}
+
+
+def _by_first(table: Dict[Tuple[str, ...], Any]) -> Dict[str, List[Tuple[Tuple[str, ...], Any]]]:
+    """Group a phrase table by first token, longest phrases first."""
+    grouped: Dict[str, List[Tuple[Tuple[str, ...], Any]]] = {}
+    for tokens, value in table.items():
+        grouped.setdefault(tokens[0], []).append((tokens, value))
+    for entries in grouped.values():
+        entries.sort(key=lambda entry: -len(entry[0]))
+    return grouped
+
+
+_DURATION_INDEX = _by_first(_DURATION_UNITS)
+_MERIDIEM_INDEX = _by_first(_MERIDIEMS)
+_OCLOCK_INDEX = _by_first(_OCLOCK)
+# Rooms and devices share one table: token sequence -> (kind, name)
+_PLACE_INDEX = _by_first({**{tokens: ('device', name) for tokens, name in _DEVICES.items()},
+                          **{tokens: ('room', name) for tokens, name in _ROOMS.items()}})
+
+# Token -> bit set of the rules that can start at it; tokens missing from
+# the table (most words) are skipped after a single lookup
+_CLOCK, _NAMED_TIME, _TRIGGER, _RELATIVE, _HALF, _ARTICLE, _NUMBER, _PLACE = (
+    1 << bit for bit in range(8))
+_KINDS: Dict[str, int] = {}
+for _words, _kind in ((_NAMED_TIMES, _NAMED_TIME), (_TIME_TRIGGERS | {'la'}, _TRIGGER),
+                      (('half', 'quarter'), _RELATIVE), (_HALVES, _HALF),
+                      (_ARTICLES, _ARTICLE), (_NUMBER_WORDS, _NUMBER),
+                      (_PLACE_INDEX, _PLACE)):
+    for _word in _words:
+        _KINDS[_word] = _KINDS.get(_word, 0) | _kind
+del _words, _kind, _word
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase, accent-free tokens ("7:30" stays one token).
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of tokens
+    """
+    tokens = _TOKEN.findall(text.lower())
+    for i, token in enumerate(tokens):
+        if not token.isascii():
+            folded = _FOLDED.get(token)
+            if folded is None:
+                if len(_FOLDED) > 10000:
+                    _FOLDED.clear()
+                folded = _FOLDED[token] = fold(token)
+            tokens[i] = folded
+    return tokens
+
+
+def _lookup(index: Dict[str, list], tokens: List[str], i: int) -> Optional[Tuple[Any, int]]:
+    """Longest phrase of an index starting at tokens[i], as (value, end)."""
+    entries = index.get(tokens[i]) if i < len(tokens) else None
+    if not entries:
+        return None
+    for phrase, value in entries:
+        end = i + len(phrase)
+        if tuple(tokens[i:end]) == phrase:
+            return value, end
+    return None
+
+
+def read_number(tokens: List[str], i: int) -> Optional[Tuple[int, int]]:
+    """
+    Read a number written with digits or Spanish/English words.
+
+    Handles "veinte", "treinta y cinco", "twenty five", "ciento veinte",
+    "one hundred and five", "dos mil" and plain digits.
+
+    Args:
+        tokens: Tokens from tokenize
+        i: Position of the first token
+
+    Returns:
+        (value, position after the number), or None if no number starts at i
+    """
+    count = len(tokens)
+    if i >= count:
+        return None
+    token = tokens[i]
+    if token.isdecimal():
+        value, i = int(token), i + 1
+        if i < count and tokens[i] in ('mil', 'thousand'):
+            value, i = value * 1000, i + 1
+        return value, i
+    if token not in _NUMBER_WORDS:
+        return None
+
+    total = 0
+    current = 0
+    last = None
+    start = i
+    while i < count:
+        token = tokens[i]
+        if token in _UNITS:
+            value = _UNITS[token]
+            if current % 100 and not (last == 'tens' and value < 10):
+                break
+            current += value
+            last = 'unit'
+        elif token in _TENS:
+            if current % 100:
+                break
+            current += _TENS[token]
+            last = 'tens'
+        elif token in _HUNDREDS:
+            if current % 1000:
+                break
+            current += _HUNDREDS[token]
+            last = 'hundreds'
+        elif token == 'hundred':
+            if last != 'unit' or current >= 10:
+                break
+            current *= 100
+            last = 'hundreds'
+        elif token in ('mil', 'thousand'):
+            if total:
+                break
+            total = (current or 1) * 1000
+            current = 0
+            last = 'thousands'
+        elif token in ('y', 'and') and i + 1 < count:
+            # "treinta y cinco", "one hundred and five"
+            following = tokens[i + 1]
+            if last == 'tens' and following in _UNITS and _UNITS[following] < 10:
+                pass
+            elif last == 'hundreds' and token == 'and' and following in _NUMBER_WORDS:
+                pass
+            else:
+                break
+        else:
+            break
+        i += 1
+    if i == start:
+        return None
+    return total + current, i
+
+
+class EntityExtractor:
+    """Single-pass extractor of numbers, times, durations, rooms and devices."""
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """
+        Extract entities from an utterance.
+
+        Args:
+            text: User input text
+
+        Returns:
+            Dictionary with the entities found (keys are omitted when absent):
+            'numbers' (list of free numbers), 'time' ({'hour', 'minute'}),
+            'duration' (seconds, summed over every mention), 'room' and
+            'device' (canonical names of the first mention)
+        """
+        tokens = tokenize(text)
+        entities: Dict[str, Any] = {}
+        numbers: List[int] = []
+        duration = 0
+        count = len(tokens)
+        i = 0
+        while i < count:
+            token = tokens[i]
+            kind = _KINDS.get(token, 0)
+            if not kind:
+                if not token[0].isdecimal():
+                    # Most words: one table lookup and move on
+                    i += 1
+                    continue
+                kind = _CLOCK if ':' in token else _NUMBER
+
+            if kind & _CLOCK:
+                hour, minute = token.split(':')
+                end = self._time_at(int(hour), int(minute), tokens, i + 1, entities)
+                if end is not None:
+                    i = end
+                    continue
+
+            if kind & _NAMED_TIME:
+                entities.setdefault('time', dict(zip(('hour', 'minute'), _NAMED_TIMES[token])))
+                i += 1
+                continue
+
+            if kind & _TRIGGER and (token != 'la' or tokens[i + 1:i + 2] == ['una']):
+                end = self._clock_after_trigger(tokens, i + 1, entities)
+                if end is not None:
+                    i = end
+                    continue
+
+            if kind & _RELATIVE and i + 1 < count and tokens[i + 1] in ('past', 'to'):
+                # "half past seven", "quarter to eight"
+                found = read_number(tokens, i + 2)
+                if found is not None:
+                    minute = _MINUTE_WORDS[token]
+                    end = self._relative_time(found[0], minute, tokens[i + 1], tokens,
+                                              found[1], entities)
+                    if end is not None:
+                        i = end
+                        continue
+
+            if kind & _HALF:
+                # "media hora", "half an hour"
+                unit_at = i + 1
+                if token == 'half' and tokens[i + 1:i + 2] in (['a'], ['an']):
+                    unit_at += 1
+                unit = _lookup(_DURATION_INDEX, tokens, unit_at)
+                if unit is not None:
+                    duration += unit[0] // 2
+                    i = unit[1]
+                    continue
+
+            if kind & _ARTICLE:
+                unit = _lookup(_DURATION_INDEX, tokens, i + 1)
+                if unit is not None:
+                    seconds, i = self._duration_tail(unit[0], tokens, unit[1])
+                    duration += seconds
+                    continue
+
+            if kind & _NUMBER:
+                found = read_number(tokens, i)
+                if found is not None:
+                    value, end = found
+                    unit = _lookup(_DURATION_INDEX, tokens, end)
+                    if unit is not None:
+                        seconds, i = self._duration_tail(value * unit[0], tokens, unit[1],
+                                                         unit[0])
+                        duration += seconds
+                        continue
+                    if end < count and tokens[end] in ('past', 'to'):
+                        # "ten past seven"
+                        hour = read_number(tokens, end + 1)
+                        if hour is not None:
+                            relative = self._relative_time(hour[0], value, tokens[end],
+                                                           tokens, hour[1], entities)
+                            if relative is not None:
+                                i = relative
+                                continue
+                    numbers.append(value)
+                    i = end
+                    continue
+
+            if kind & _PLACE:
+                place = _lookup(_PLACE_INDEX, tokens, i)
+                if place is not None:
+                    (entity, name), i = place
+                    entities.setdefault(entity, name)
+                    continue
+
+            i += 1
+
+        if numbers:
+            entities['numbers'] = numbers
+        if duration:
+            entities['duration'] = duration
+        return entities
+
+    def _duration_tail(self, seconds: int, tokens: List[str], i: int,
+                       unit: Optional[int] = None) -> Tuple[int, int]:
+        """Add a trailing "y media" / "and a half" to a duration."""
+        unit = seconds if unit is None else unit
+        if tuple(tokens[i:i + 2]) == ('y', 'media'):
+            return seconds + unit // 2, i + 2
+        if tuple(tokens[i:i + 3]) == ('and', 'a', 'half'):
+            return seconds + unit // 2, i + 3
+        return seconds, i
+
+    def _clock_after_trigger(self, tokens: List[str], i: int,
+                             entities: Dict[str, Any]) -> Optional[int]:
+        """Read "siete y media", "seven thirty pm"... after a time trigger."""
+        # "a la una"
+        found = (1, i + 1) if tokens[i:i + 1] == ['una'] else read_number(tokens, i)
+        if found is None:
+            return None
+        hour, i = found
+        if hour > 24:
+            return None
+        minute = 0
+        count = len(tokens)
+        start = i
+        if i + 1 < count and tokens[i] in ('y', 'and'):
+            following = tokens[i + 1]
+            if following in _MINUTE_WORDS:
+                minute, i = _MINUTE_WORDS[following], i + 2
+            else:
+                found = read_number(tokens, i + 1)
+                if found is not None and found[0] < 60:
+                    minute, i = found
+                    if i < count and tokens[i] in ('minutos', 'minutes'):
+                        i += 1
+        elif i + 1 < count and tokens[i] == 'menos':
+            # "las ocho menos cuarto" is 7:45
+            following = tokens[i + 1]
+            if following in _MINUTE_WORDS:
+                before, end = _MINUTE_WORDS[following], i + 2
+            else:
+                found = read_number(tokens, i + 1)
+                before, end = found if found is not None and found[0] < 60 else (None, i)
+            if before is not None:
+                hour = hour - 1 if hour > 1 else 12
+                minute, i = 60 - before, end
+        elif i < count and tokens[i] not in _HUNDREDS:
+            # "seven thirty"
+            found = read_number(tokens, i)
+            if found is not None and found[0] < 60 and _lookup(_DURATION_INDEX, tokens,
+                                                               found[1]) is None:
+                minute, i = found
+        if i == start and _lookup(_PLACE_INDEX, tokens, i) is not None:
+            # "apaga las dos luces" counts lights, not hours
+            return None
+        return self._time_at(hour, minute, tokens, i, entities)
+
+    def _relative_time(self, hour: int, minute: int, relation: str, tokens: List[str],
+                       i: int, entities: Dict[str, Any]) -> Optional[int]:
+        """Store "<minute> past/to <hour>" as a clock time."""
+        if minute >= 60:
+            return None
+        if relation == 'to':
+            hour = hour - 1 if hour > 1 else 12
+            minute = (60 - minute) % 60
+        return self._time_at(hour, minute, tokens, i, entities)
+
+    def _time_at(self, hour: int, minute: int, tokens: List[str], i: int,
+                 entities: Dict[str, Any]) -> Optional[int]:
+        """Apply "en punto", "pm", "de la tarde"... and store the time."""
+        if hour > 24 or minute > 59:
+            return None
+        found = _lookup(_OCLOCK_INDEX, tokens, i)
+        if found is not None:
+            i = found[1]
+        found = _lookup(_MERIDIEM_INDEX, tokens, i)
+        if found is not None:
+            offset, i = found
+            if offset and hour < 12:
+                hour += offset
+            elif not offset and hour == 12:
+                hour = 0
+        entities.setdefault('time', {'hour': hour % 24, 'minute': minute})
+        return i
+
+
+# Shared extractor (stateless; the lookup tables are module constants)
+_extractor = EntityExtractor()
+
+
+def extract_entities(text: str) -> Dict[str, Any]:
+    """
+    Extract entities from an utterance with the shared extractor.
+
+    Args:
+        text: User input text
+
+    Returns:
+        Dictionary with the entities found (see EntityExtractor.extract)
+    """
+    return _extractor.extract(text)
@@ -0,0 +1,246 @@
+"""
+Fuzzy intent matching module.
+Tolerates ASR near-misses ("enciendé la lus") by looking up each word's
+close vocabulary words in a BK-tree and aligning them against the intent
+phrases, with a confidence that drops with the number of edits.
+"""
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from nlu.phrase_index import tokenize
+
+
+def fold(word: str) -> str:
+    """
+    Lowercase a word and strip its accents ("Enciendé" -> "enciende").
+
+    Args:
+        word: Input word
+
+    Returns:
+        Folded word
+    """
+    decomposed = unicodedata.normalize('NFD', word.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Levenshtein distance between two words.
+
+    Args:
+        a: First word
+        b: Second word
+
+    Returns:
+        Number of single-character insertions, deletions and substitutions
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def max_edits(word: str) -> int:
+    """
+    Edits tolerated for a word: none for very short words, two for long ones.
+
+    Args:
+        word: Folded word
+
+    Returns:
+        Maximum edit distance
+    """
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 5:
+        return 1
+    return 2
+
+
+class BKTree:
+    """Burkhard-Keller tree over words for bounded edit-distance lookups."""
+
+    def __init__(self, words: Iterable[str] = ()):
+        # Node: (word, {distance: child node})
+        self._root = None
+        self._size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, word: str):
+        """
+        Insert a word (duplicates are ignored).
+
+        Args:
+            word: Word to insert
+        """
+        if self._root is None:
+            self._root = (word, {})
+            self._size = 1
+            return
+
+        node = self._root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                self._size += 1
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[str, int]]:
+        """
+        Find the words within a distance of a word.
+
+        Only subtrees whose edge distance lies within max_distance of the
+        node's distance can hold matches (triangle inequality), so most of
+        the vocabulary is never compared.
+
+        Args:
+            word: Query word
+            max_distance: Maximum edit distance
+
+        Returns:
+            List of (word, distance)
+        """
+        if self._root is None:
+            return []
+
+        found = []
+        stack = [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = edit_distance(word, node_word)
+            if distance <= max_distance:
+                found.append((node_word, distance))
+            low, high = distance - max_distance, distance + max_distance
+            for edge, child in children.items():
+                if low <= edge <= high:
+                    stack.append(child)
+        return found
+
+
+class FuzzyMatcher:
+    """Aligns utterances against intent phrases allowing small word edits."""
+
+    def __init__(self, phrases: Iterable[Tuple[str, Tuple[str, ...]]],
+                 min_confidence: float = 0.65, max_confidence: float = 0.85):
+        """
+        Initialize the matcher.
+
+        Args:
+            phrases: (intent, phrase tokens) pairs; on equal confidence the
+                intent listed first wins
+            min_confidence: Matches scoring below this are discarded
+            max_confidence: Confidence when the words match once accents are
+                ignored (below the 0.9 of a pattern match); every edited
+                character lowers it in proportion to the phrase length
+        """
+        self.min_confidence = min_confidence
+        self.max_confidence = max_confidence
+
+        self.intents: List[str] = []
+        positions: Dict[str, int] = {}
+        # First folded word -> [(intent position, folded phrase tokens)]
+        self._by_first: Dict[str, List[Tuple[int, Tuple[str, ...]]]] = {}
+        vocabulary = set()
+        for intent, tokens in phrases:
+            position = positions.get(intent)
+            if position is None:
+                position = positions[intent] = len(self.intents)
+                self.intents.append(intent)
+            folded = tuple(fold(token) for token in tokens)
+            if not folded:
+                continue
+            entry = (position, folded)
+            bucket = self._by_first.setdefault(folded[0], [])
+            if entry not in bucket:
+                bucket.append(entry)
+            vocabulary.update(folded)
+
+        self.vocabulary = vocabulary
+        self.tree = BKTree(sorted(vocabulary))
+        self._neighbours: Dict[str, Dict[str, int]] = {}
+
+    def neighbours(self, word: str) -> Dict[str, int]:
+        """
+        Vocabulary words close to a folded word.
+
+        Args:
+            word: Folded word
+
+        Returns:
+            Mapping of vocabulary word -> edit distance
+        """
+        cached = self._neighbours.get(word)
+        if cached is None:
+            limit = max_edits(word)
+            if limit == 0:
+                cached = {word: 0} if word in self.vocabulary else {}
+            else:
+                cached = dict(self.tree.search(word, limit))
+            if len(self._neighbours) > 10000:
+                self._neighbours.clear()
+            self._neighbours[word] = cached
+        return cached
+
+    def match(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the best fuzzy phrase match in an utterance.
+
+        Args:
+            text: Utterance
+
+        Returns:
+            (intent, confidence), or None if no phrase matched with at
+            least min_confidence
+        """
+        words = [fold(token) for token in tokenize(text)]
+        candidates = [self.neighbours(word) for word in words]
+
+        best = None
+        for start, first in enumerate(candidates):
+            for vocab_word, first_edits in first.items():
+                for position, phrase in self._by_first.get(vocab_word, ()):
+                    if start + len(phrase) > len(words):
+                        continue
+                    edits = first_edits
+                    for offset in range(1, len(phrase)):
+                        distance = candidates[start + offset].get(phrase[offset])
+                        if distance is None:
+                            break
+                        edits += distance
+                    else:
+                        confidence = self._confidence(phrase, edits)
+                        if confidence < self.min_confidence:
+                            continue
+                        key = (confidence, -position)
+                        if best is None or key > best:
+                            best = key
+        if best is None:
+            return None
+        return self.intents[-best[1]], best[0]
+
+    def _confidence(self, phrase: Tuple[str, ...], edits: int) -> float:
+        """Confidence falling with the share of edited characters."""
+        if edits == 0:
+            return self.max_confidence
+        length = sum(len(word) for word in phrase)
+        return self.max_confidence * (1.0 - edits / length)
@@ -2,109 +2,411 @@
 NLU (Natural Language Understanding) module.
 Implements intent matching using rule-based approach.
 """
-from typing import Dict, Any
-import re
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 
+from nlu.entities import extract_entities as _extract_entities
+from nlu.registry import DEFAULT_INTENTS_FILE, IntentRegistry
 
-def match_intent(text: str) -> Dict[str, Any]:
+
+# Intent definitions live in nlu/intents.json, compiled once into a single
+# matcher and reloaded when the file changes
+_registry = IntentRegistry(DEFAULT_INTENTS_FILE)
+
+# Live views of the registry, in priority order (first matching intent wins)
+INTENT_PATTERNS: Dict[str, List[str]] = _registry.patterns
+INTENT_PHRASES: Dict[str, List[str]] = _registry.phrases
+
+UNKNOWN_DESCRIPTION = 'Unknown/Desconocido'
+
+
+def get_registry() -> IntentRegistry:
+    """
+    Get the intent registry used by match_intent.
+    
+    Returns:
+        The shared IntentRegistry
+    """
+    return _registry
+
+
+def load_intents(path: str):
+    """
+    Replace the file intent definitions (hot reload follows this file).
+    
+    Args:
+        path: JSON definition file
+    """
+    _registry.load(path)
+
+
+def register_intent(intent: str, patterns: List[str],
+                    phrases: Optional[List[str]] = None,
+                    description: Optional[str] = None):
+    """
+    Add or replace an intent.
+    
+    Args:
+        intent: Intent name
+        patterns: Regex patterns that trigger the intent
+        phrases: Literal phrases for grammar-constrained ASR
+        description: Human readable description
+    """
+    _registry.register(intent, patterns, phrases, description)
+
+
+def unregister_intent(intent: str):
+    """
+    Remove an intent added with register_intent.
+    
+    Args:
+        intent: Intent name
+    """
+    _registry.unregister(intent)
+
+
+def get_intents_version() -> int:
+    """
+    Get a counter that changes whenever intents are registered or reloaded.
+    
+    Returns:
+        Version number
+    """
+    _registry.maybe_reload()
+    return _registry.version
+
+
+def get_intent_names() -> List[str]:
+    """
+    Get the registered intent names in priority order.
+    
+    Returns:
+        List of intent names
+    """
+    _registry.maybe_reload()
+    return _registry.names()
+
+
+def get_intent_phrases() -> List[str]:
+    """
+    Get every literal phrase of the registered intents.
+    
+    Returns:
+        Sorted list of unique lowercase phrases
+    """
+    return sorted({
+        phrase.lower()
+        for phrases in INTENT_PHRASES.values()
+        for phrase in phrases
+    })
+
+
+def _classify(text_lower: str, fuzzy: bool) -> Tuple[str, float]:
+    """Intent and confidence for normalized text."""
+    # One scan over the combined patterns of every intent
+    intent = _registry.match(text_lower)
+    if intent is not None:
+        return intent, 0.9
+    
+    # Near-miss words, graded by how many characters had to change
+    if fuzzy:
+        found = _registry.fuzzy_match(text_lower)
+        if found is not None:
+            return found
+    
+    # No match found
+    return 'unknown', 0.0
+
+
+# (intent, confidence, entities) of a normalized text
+_Match = Tuple[str, float, Dict[str, Any]]
+
+
+class _MatchCache:
+    """Bounded LRU cache of match results keyed on normalized text."""
+    
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+    
+    def get(self, key: Tuple[str, bool], version: int) -> Optional[_Match]:
+        """Cached result, or None; entries from older intent versions are dropped."""
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            found = self._entries.get(key)
+            if found is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return found
+    
+    def put(self, key: Tuple[str, bool], version: int, value: _Match):
+        """Store a result computed for the given intent version."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def info(self) -> Dict[str, int]:
+        """Hit/miss counters and size."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+# Results for recently seen normalized texts, shared by every caller
+_cache = _MatchCache()
+
+
+def set_cache_size(maxsize: int):
+    """
+    Resize (and empty) the match cache.
+    
+    Args:
+        maxsize: Maximum cached texts (0 disables caching)
+    """
+    global _cache
+    _cache = _MatchCache(maxsize)
+
+
+def get_cache_info() -> Dict[str, int]:
+    """
+    Get statistics of the match cache.
+    
+    Returns:
+        Dictionary with 'hits', 'misses', 'size' and 'maxsize'
+    """
+    return _cache.info()
+
+
+def _cached_match(text_lower: str, fuzzy: bool) -> _Match:
+    """Intent, confidence and entities, answered from the cache when possible."""
+    version = _registry.version
+    found = _cache.get((text_lower, fuzzy), version)
+    if found is None:
+        found = _classify(text_lower, fuzzy) + (_extract_entities(text_lower),)
+        _cache.put((text_lower, fuzzy), version, found)
+    return found
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text the way intents are matched (lowercase, trimmed).
+    
+    Args:
+        text: User input text
+        
+    Returns:
+        Normalized text
+    """
+    return text.lower().strip()
+
+
+def match_intent(text: str, fuzzy: bool = False, cache: bool = False) -> Dict[str, Any]:
     """
     Match intent from user text using rule-based NLU.
     
     Args:
         text: User input text
+        fuzzy: If no pattern matches, accept intent phrases with small
+            misspellings (typical ASR near-misses) at a lower confidence
+        cache: Answer repeated texts from the bounded LRU cache
         
     Returns:
-        Dictionary with 'intent', 'confidence', and 'raw_text'
+        Dictionary with 'intent', 'confidence', 'raw_text' and 'entities'
+        (see extract_entities)
     """
     if not text:
         return {
             'intent': 'unknown',
             'confidence': 0.0,
-            'raw_text': text
+            'raw_text': text,
+            'entities': {}
         }
     
-    text_lower = text.lower().strip()
-    
-    # Intent patterns
-    saludo_patterns = [
-        r'\b(hola|saludos|buenos días|buenas tardes|buenas noches|hi|hello|hey)\b',
-        r'\b(cómo estás|qué tal|qué pasa)\b'
-    ]
-    
-    hora_patterns = [
-        r'\b(qué hora es|dime la hora|hora actual|time)\b',
-        r'\b(dime la fecha|qué día es|fecha actual)\b'
-    ]
-    
-    encender_luz_patterns = [
-        r'\b(enciende|activa|prende|on)\s*(la\s*)?luz',
-        r'\bturn\s*(on|up)\s*the\s*light',
-        r'\bprender\s*(la\s*)?luz'
-    ]
-    
-    apagar_luz_patterns = [
-        r'\b(apaga|desactiva|apaga|off)\s*(la\s*)?luz',
-        r'\bturn\s*off\s*the\s*light',
-        r'\bapagar\s*(la\s*)?luz'
-    ]
-    
-    # Check for matches
-    for pattern in saludo_patterns:
-        if re.search(pattern, text_lower):
-            return {
-                'intent': 'saludo',
-                'confidence': 0.9,
-                'raw_text': text
-            }
-    
-    for pattern in hora_patterns:
-        if re.search(pattern, text_lower):
-            return {
-                'intent': 'hora',
-                'confidence': 0.9,
-                'raw_text': text
-            }
-    
-    for pattern in encender_luz_patterns:
-        if re.search(pattern, text_lower):
-            return {
-                'intent': 'encender_luz',
-                'confidence': 0.9,
-                'raw_text': text
-            }
-    
-    for pattern in apagar_luz_patterns:
-        if re.search(pattern, text_lower):
-            return {
-                'intent': 'apagar_luz',
-                'confidence': 0.9,
-                'raw_text': text
-            }
-    
-    # No match found
+    _registry.maybe_reload()
+    normalized = normalize_text(text)
+    if cache:
+        intent, confidence, entities = _cached_match(normalized, fuzzy)
+        entities = _copy_entities(entities)
+    else:
+        intent, confidence = _classify(normalized, fuzzy)
+        entities = _extract_entities(normalized)
     return {
-        'intent': 'unknown',
-        'confidence': 0.0,
-        'raw_text': text
+        'intent': intent,
+        'confidence': confidence,
+        'raw_text': text,
+        'entities': entities
     }
 
 
-def extract_entities(text: str) -> Dict[str, Any]:
+def match_alternatives(texts: Iterable[str], fuzzy: bool = False, cache: bool = False,
+                       min_confidence: float = 0.9) -> Dict[str, Any]:
     """
-    Extract entities from text (optional, for future enhancement).
+    Match the intent of an utterance given its ranked ASR hypotheses.
+    
+    Hypotheses are tried best first and matching stops at the first one
+    whose intent reaches min_confidence, so a command misheard in the top
+    hypothesis is recovered from a lower-ranked one without decoding again.
+    If none is confident, the most confident result wins (the higher-ranked
+    hypothesis on ties).
     
     Args:
-        text: User input text
+        texts: Hypotheses, best first (e.g. the N-best list of the ASR)
+        fuzzy: Enable the fuzzy tier (see match_intent)
+        cache: Answer repeated texts from the bounded LRU cache
+        min_confidence: Confidence that ends the search (0.9 is an exact
+            pattern match; fuzzy matches score lower)
         
     Returns:
-        Dictionary with extracted entities
+        match_intent result of the chosen hypothesis, with its position in
+        'alternative'
+    """
+    best = None
+    for rank, text in enumerate(texts):
+        result = match_intent(text, fuzzy=fuzzy, cache=cache)
+        result['alternative'] = rank
+        if result['confidence'] >= min_confidence:
+            return result
+        if best is None or result['confidence'] > best['confidence']:
+            best = result
+    
+    if best is None:
+        best = match_intent('')
+        best['alternative'] = 0
+    return best
+
+
+def match_intents(texts: Iterable[str], fuzzy: bool = False, workers: Optional[int] = None,
+                  batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
     """
-    entities = {}
+    Match intents for many texts, yielding results in input order.
     
-    # Could extract numbers, dates, locations, etc.
-    # For now, just return empty dict
+    Each text is normalized once and repeated texts are answered from the
+    match cache. With workers > 1 the distinct uncached texts of each batch
+    are matched in a process pool (worth it for millions of texts; each
+    worker loads the same intent definitions).
     
-    return entities
+    Args:
+        texts: Iterable of user texts (consumed lazily, batch by batch)
+        fuzzy: Enable the fuzzy tier (see match_intent)
+        workers: Worker processes (None or 1 matches in this process)
+        batch_size: Texts read per batch
+        
+    Yields:
+        Dictionaries with 'intent', 'confidence', 'raw_text' and 'entities'
+    """
+    pool = None
+    if workers and workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(_registry.path, _registry.code_intents(),
+                                             _registry.backend))
+    try:
+        for batch in _batches(texts, batch_size):
+            _registry.maybe_reload()
+            version = _registry.version
+            normalized = [normalize_text(text) if text else '' for text in batch]
+            
+            # Each distinct text is looked up once per batch; misses are
+            # matched here or, with a pool, split across the workers
+            known = {'': ('unknown', 0.0, {})}
+            missing = []
+            for key in normalized:
+                if key in known:
+                    continue
+                found = _cache.get((key, fuzzy), version)
+                if found is None:
+                    missing.append(key)
+                known[key] = found
+            
+            if pool is None:
+                results = [_classify(key, fuzzy) for key in missing]
+            else:
+                chunk = max(1, -(-len(missing) // workers))
+                chunks = [missing[i:i + chunk] for i in range(0, len(missing), chunk)]
+                results = [result
+                           for chunk_results in pool.map(_match_chunk, chunks,
+                                                         [fuzzy] * len(chunks))
+                           for result in chunk_results]
+            for key, result in zip(missing, results):
+                result += (_extract_entities(key),)
+                known[key] = result
+                _cache.put((key, fuzzy), version, result)
+            
+            for text, key in zip(batch, normalized):
+                intent, confidence, entities = known[key]
+                yield {
+                    'intent': intent,
+                    'confidence': confidence,
+                    'raw_text': text,
+                    'entities': _copy_entities(entities)
+                }
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _copy_entities(entities: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy cached entities (and their list/dict values) for one result."""
+    return {name: value.copy() if isinstance(value, (list, dict)) else value
+            for name, value in entities.items()}
+
+
+def _batches(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Split an iterable into lists of at most size items."""
+    iterator = iter(texts)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _init_worker(path: Optional[str], code_intents: List[Dict[str, Any]], backend: str):
+    """Load the parent's intent definitions in a pool worker."""
+    if path is not None and path != _registry.path:
+        _registry.load(path)
+    for definition in code_intents:
+        _registry.register(definition['name'], definition['patterns'],
+                           definition['phrases'], definition['description'])
+    if backend != _registry.backend:
+        _registry.set_backend(backend)
+
+
+def _match_chunk(texts: List[str], fuzzy: bool) -> List[Tuple[str, float]]:
+    """Match normalized texts in a pool worker."""
+    _registry.maybe_reload()
+    return [_classify(text, fuzzy) for text in texts]
+
+
+def extract_entities(text: str) -> Dict[str, Any]:
+    """
+    Extract entities from text in one pass over its tokens.
+    
+    Args:
+        text: User input text
+        
+    Returns:
+        Dictionary with the entities found: 'numbers', 'time'
+        ({'hour', 'minute'}), 'duration' (seconds), 'room' and 'device'
+        (keys are omitted when absent)
+    """
+    return _extract_entities(text)
 
 
 def get_intent_description(intent: str) -> str:
@@ -117,13 +419,8 @@ def get_intent_description(intent: str) -> str:
     Returns:
         Description string
     """
-    descriptions = {
-        'saludo': 'Greeting/Hola',
-        'hora': 'Time query/Qué hora es',
-        'encender_luz': 'Turn on light/Encender luz',
-        'apagar_luz': 'Turn off light/Apagar luz',
-        'unknown': 'Unknown/Desconocido'
-    }
+    if intent == 'unknown':
+        return UNKNOWN_DESCRIPTION
     
-    return descriptions.get(intent, 'Unknown')
-
+    _registry.maybe_reload()
+    return _registry.descriptions.get(intent, 'Unknown')
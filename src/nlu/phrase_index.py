@@ -0,0 +1,228 @@
+"""
+Phrase index module.
+Indexes literal trigger phrases in a token-level Aho-Corasick automaton, so
+finding the highest-priority phrase in an utterance costs one pass over its
+words no matter how many phrases are indexed.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+_TOKEN = re.compile(r'\w+')
+
+# Characters with a special meaning in the regex subset understood by
+# expand_pattern; any other non-word character makes a pattern regex-only
+_SPECIAL = set('()|?\\ ')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into word tokens (punctuation and spacing are ignored).
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of tokens
+    """
+    return _TOKEN.findall(text)
+
+
+def expand_pattern(pattern: str, limit: int = 64) -> Optional[List[Tuple[str, ...]]]:
+    """
+    Expand a literal regex into the token sequences it matches.
+
+    Understands literal words, spaces, \\s, \\s+ and \\s* (word separators),
+    \\b, groups with '|' alternatives and optional groups '(...)?'. Anything
+    else (character classes, wildcards, repetition, escapes) needs the
+    regex engine.
+
+    Args:
+        pattern: Regex pattern
+        limit: Maximum number of expansions
+
+    Returns:
+        List of token tuples, or None if the pattern is not a plain phrase
+        list (or expands to more than limit phrases)
+    """
+    parser = _Expander(pattern, limit)
+    try:
+        strings = parser.parse_alternatives()
+        if parser.pos != len(pattern):
+            return None
+    except _NotLiteral:
+        return None
+
+    sequences = []
+    for string in strings:
+        tokens = tuple(tokenize(string))
+        if not tokens or ' '.join(tokens) != ' '.join(string.split()):
+            return None
+        if tokens not in sequences:
+            sequences.append(tokens)
+    return sequences
+
+
+class _NotLiteral(Exception):
+    """Raised by _Expander when a pattern needs the regex engine."""
+
+
+class _Expander:
+    """Recursive-descent expansion of the literal regex subset."""
+
+    def __init__(self, pattern: str, limit: int):
+        self.pattern = pattern
+        self.limit = limit
+        self.pos = 0
+
+    def parse_alternatives(self) -> List[str]:
+        strings = self.parse_sequence()
+        while self._peek() == '|':
+            self.pos += 1
+            strings = strings + self.parse_sequence()
+            self._check(strings)
+        return strings
+
+    def parse_sequence(self) -> List[str]:
+        strings = ['']
+        while self.pos < len(self.pattern) and self._peek() not in '|)':
+            parts = self.parse_item()
+            if self._peek() == '?':
+                self.pos += 1
+                parts = parts + ['']
+            strings = [left + right for left in strings for right in parts]
+            self._check(strings)
+        return strings
+
+    def parse_item(self) -> List[str]:
+        char = self._peek()
+        if char == '(':
+            self.pos += 1
+            if self.pattern.startswith('?:', self.pos):
+                self.pos += 2
+            elif self._peek() == '?':
+                raise _NotLiteral()
+            parts = self.parse_alternatives()
+            if self._peek() != ')':
+                raise _NotLiteral()
+            self.pos += 1
+            return parts
+
+        if char == '\\':
+            escape = self.pattern[self.pos + 1:self.pos + 2]
+            self.pos += 2
+            if escape == 'b':
+                return ['']
+            if escape == 's':
+                if self._peek() in ('+', '*'):
+                    self.pos += 1
+                return [' ']
+            raise _NotLiteral()
+
+        if char == ' ':
+            self.pos += 1
+            return [' ']
+
+        if char in _SPECIAL or not (char.isalnum() or char == '_'):
+            raise _NotLiteral()
+        self.pos += 1
+        if self._peek() in ('*', '+', '{'):
+            raise _NotLiteral()
+        return [char]
+
+    def _peek(self) -> str:
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else ''
+
+    def _check(self, strings: List[str]):
+        if len(strings) > self.limit:
+            raise _NotLiteral()
+
+
+class PhraseIndex:
+    """Token-level Aho-Corasick automaton mapping phrases to priorities."""
+
+    def __init__(self):
+        # Node 0 is the root; per node: token -> child, failure link and the
+        # best (lowest) priority of any phrase ending there or on its
+        # failure chain
+        self._children: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[int]] = [None]
+        self._built = True
+
+    def __len__(self) -> int:
+        return len(self._children) - 1
+
+    def add(self, tokens: Tuple[str, ...], priority: int):
+        """
+        Index a phrase.
+
+        Args:
+            tokens: Phrase as a token sequence
+            priority: Priority (lower wins) reported when the phrase occurs
+        """
+        node = 0
+        for token in tokens:
+            child = self._children[node].get(token)
+            if child is None:
+                child = len(self._children)
+                self._children[node][token] = child
+                self._children.append({})
+                self._fail.append(0)
+                self._best.append(None)
+            node = child
+        if self._best[node] is None or priority < self._best[node]:
+            self._best[node] = priority
+        self._built = False
+
+    def build(self):
+        """Compute failure links (breadth-first); called lazily by search."""
+        queue = list(self._children[0].values())
+        for child in queue:
+            self._fail[child] = 0
+
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for token, child in self._children[node].items():
+                fail = self._fail[node]
+                while fail and token not in self._children[fail]:
+                    fail = self._fail[fail]
+                target = self._children[fail].get(token, 0)
+                self._fail[child] = target if target != child else 0
+
+                inherited = self._best[self._fail[child]]
+                if inherited is not None and (self._best[child] is None
+                                              or inherited < self._best[child]):
+                    self._best[child] = inherited
+                queue.append(child)
+        self._built = True
+
+    def search(self, tokens: List[str]) -> Optional[int]:
+        """
+        Find the best priority among the phrases occurring in a token list.
+
+        Args:
+            tokens: Utterance tokens
+
+        Returns:
+            Lowest priority found, or None if no phrase occurs
+        """
+        if not self._built:
+            self.build()
+
+        children = self._children
+        fail = self._fail
+        best_at = self._best
+        best = None
+        node = 0
+        for token in tokens:
+            while node and token not in children[node]:
+                node = fail[node]
+            node = children[node].get(token, 0)
+            found = best_at[node]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+        return best
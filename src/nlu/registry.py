@@ -0,0 +1,508 @@
+"""
+Intent registry module.
+Holds the intent definitions (patterns, grammar phrases, descriptions),
+loaded from a JSON file and/or registered from code, and compiles them
+into combined regexes so an utterance is usually matched in a single scan.
+"""
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from nlu.fuzzy import FuzzyMatcher
+from nlu.phrase_index import PhraseIndex, expand_pattern, tokenize
+
+DEFAULT_INTENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents.json")
+
+_NUMBERED_BACKREF = re.compile(r'(?<!\\)(?:\\\\)*\\(?:[1-9]|g<\d+>)')
+
+
+def _leading_boundary(pattern: str) -> bool:
+    """True if the pattern starts with \\b and has no top-level alternation."""
+    if not pattern.startswith(r'\b'):
+        return False
+
+    depth = 0
+    in_class = False
+    index = 2
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            index += 1
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+            # A ']' right after '[' or '[^' is a literal
+            if pattern[index + 1:index + 2] == '^':
+                index += 1
+            if pattern[index + 1:index + 2] == ']':
+                index += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return False
+        index += 1
+    return True
+
+
+def _literal_prefix(pattern: str) -> Optional[str]:
+    """
+    Literal word that must start a word of any text the pattern matches.
+
+    Returns:
+        The literal (at least two characters) after a leading \\b, or None
+    """
+    if not _leading_boundary(pattern):
+        return None
+
+    end = 2
+    while end < len(pattern) and (pattern[end].isalnum() or pattern[end] == '_'):
+        end += 1
+    # A quantifier applies to the last letter, which is then not required
+    if end < len(pattern) and pattern[end] in '?*{':
+        end -= 1
+
+    literal = pattern[2:end]
+    return literal if len(literal) >= 2 else None
+
+
+class IntentRegistry:
+    """Ordered intent definitions compiled into one combined matcher."""
+
+    BACKENDS = ('regex', 'index')
+
+    def __init__(self, path: Optional[str] = None, reload_interval: float = 1.0,
+                 backend: str = 'regex'):
+        """
+        Initialize the registry.
+
+        Args:
+            path: JSON definition file ({"intents": [{"name", "patterns",
+                "phrases", "description"}, ...]}, in priority order), or
+                None to start empty
+            reload_interval: Minimum seconds between checks of the file's
+                modification time (hot reload); 0 checks on every match,
+                None disables reloading
+            backend: 'regex' matches every pattern with combined regexes;
+                'index' puts literal patterns (words, spaces and '|'/'?'
+                groups) in a phrase index whose cost does not grow with the
+                number of intents, and uses regexes only for the rest.
+                Indexed patterns match whole words.
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown NLU backend: {backend}")
+
+        self.path = path
+        self.backend = backend
+        self.reload_interval = reload_interval
+        self.version = 0
+
+        # Live views of the merged definitions, updated in place
+        self.patterns: Dict[str, List[str]] = {}
+        self.phrases: Dict[str, List[str]] = {}
+        self.descriptions: Dict[str, str] = {}
+
+        self._file_intents: List[Dict[str, Any]] = []
+        self._code_intents: Dict[str, Dict[str, Any]] = {}
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+        # Replaced as a whole so matching never sees a half-built state
+        self._matcher = _CombinedMatcher({})
+        self._merged: Dict[str, Dict[str, Any]] = {}
+        # Built on the first fuzzy lookup after each change
+        self._fuzzy = None
+
+        if path is not None:
+            self.load(path)
+
+    def load(self, path: str):
+        """
+        Load (or reload) definitions from a JSON file.
+
+        Intents registered from code are kept and still override file
+        definitions with the same name.
+
+        Args:
+            path: JSON definition file
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file or one of its patterns is invalid
+        """
+        mtime = os.path.getmtime(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        intents = []
+        for entry in data.get('intents', []):
+            if 'name' not in entry:
+                raise ValueError(f"Intent without a name in {path}")
+            intents.append(self._definition(entry['name'], entry.get('patterns', []),
+                                            entry.get('phrases'), entry.get('description')))
+
+        with self._lock:
+            self.path = path
+            self._file_intents = intents
+            self._mtime = mtime
+            self._rebuild()
+
+    def maybe_reload(self):
+        """
+        Reload the definition file if it changed on disk.
+
+        The modification time is checked at most once per reload_interval.
+        A file that fails to load is reported and the current definitions
+        are kept.
+        """
+        if self.path is None or self.reload_interval is None:
+            return
+
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_interval
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            self.load(self.path)
+        except (OSError, ValueError) as e:
+            # Don't retry a broken file until it changes again
+            self._mtime = mtime
+            print(f"Warning: Could not reload intents from {self.path}: {e}")
+
+    def register(self, intent: str, patterns: List[str],
+                 phrases: Optional[List[str]] = None,
+                 description: Optional[str] = None):
+        """
+        Add or replace an intent from code.
+
+        Args:
+            intent: Intent name
+            patterns: Regex patterns that trigger the intent
+            phrases: Literal phrases for grammar-constrained ASR
+            description: Human readable description
+
+        Raises:
+            ValueError: If a pattern is not a valid regex
+        """
+        definition = self._definition(intent, patterns, phrases, description)
+        with self._lock:
+            self._code_intents[intent] = definition
+            self._rebuild()
+
+    def set_backend(self, backend: str):
+        """
+        Switch the matching backend.
+
+        Args:
+            backend: 'regex' or 'index' (see __init__)
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown NLU backend: {backend}")
+        with self._lock:
+            self.backend = backend
+            self._rebuild()
+
+    def unregister(self, intent: str):
+        """
+        Remove an intent registered from code.
+
+        Args:
+            intent: Intent name
+        """
+        with self._lock:
+            if self._code_intents.pop(intent, None) is not None:
+                self._rebuild()
+
+    def code_intents(self) -> List[Dict[str, Any]]:
+        """
+        Get the intents registered from code (e.g. to replay them elsewhere).
+
+        Returns:
+            List of dicts with 'name', 'patterns', 'phrases' and 'description'
+        """
+        with self._lock:
+            return [{key: definition[key]
+                     for key in ('name', 'patterns', 'phrases', 'description')}
+                    for definition in self._code_intents.values()]
+
+    def names(self) -> List[str]:
+        """
+        Get the intent names in priority order.
+
+        Returns:
+            List of intent names
+        """
+        return list(self.patterns)
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        Find the highest-priority intent whose patterns match.
+
+        Args:
+            text: Lowercase utterance
+
+        Returns:
+            Intent name, or None if nothing matched
+        """
+        return self._matcher.match(text)
+
+    def fuzzy_match(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the intent whose phrases are closest to the text, tolerating
+        small misspellings and missing accents.
+
+        The phrases are the intent's 'phrases' plus its literal patterns
+        expanded into phrases.
+
+        Args:
+            text: Utterance
+
+        Returns:
+            (intent name, confidence below 0.9), or None
+        """
+        fuzzy = self._fuzzy
+        if fuzzy is None:
+            with self._lock:
+                if self._fuzzy is None:
+                    self._fuzzy = self._build_fuzzy()
+                fuzzy = self._fuzzy
+
+        return fuzzy.match(text)
+
+    def _build_fuzzy(self) -> FuzzyMatcher:
+        """Index the phrases of every intent for fuzzy matching (lock held)."""
+        phrases = []
+        for name, definition in self._merged.items():
+            for phrase in definition['phrases']:
+                phrases.append((name, tuple(tokenize(phrase.lower()))))
+            for pattern in definition['patterns']:
+                for tokens in expand_pattern(pattern) or ():
+                    phrases.append((name, tokens))
+        return FuzzyMatcher(phrases)
+
+    @staticmethod
+    def _definition(intent: str, patterns: List[str], phrases: Optional[List[str]],
+                    description: Optional[str]) -> Dict[str, Any]:
+        """Validate an intent and compile its patterns."""
+        compiled = []
+        for pattern in patterns:
+            try:
+                compiled.append(re.compile(pattern))
+            except re.error as e:
+                raise ValueError(f"Invalid pattern for intent '{intent}': {pattern!r} ({e})")
+        return {
+            'name': intent,
+            'patterns': list(patterns),
+            'compiled': compiled,
+            'phrases': list(phrases or []),
+            'description': description
+        }
+
+    def _rebuild(self):
+        """Merge file and code definitions and recompile (lock held)."""
+        merged = {definition['name']: definition for definition in self._file_intents}
+        merged.update(self._code_intents)
+
+        self.patterns.clear()
+        self.phrases.clear()
+        self.descriptions.clear()
+        for name, definition in merged.items():
+            self.patterns[name] = definition['patterns']
+            self.phrases[name] = definition['phrases']
+            if definition['description']:
+                self.descriptions[name] = definition['description']
+
+        if self.backend == 'index':
+            self._matcher = _IndexedMatcher(merged)
+        else:
+            self._matcher = _CombinedMatcher(merged)
+        self._merged = merged
+        self._fuzzy = None
+        self.version += 1
+
+
+class _CombinedMatcher:
+    """
+    Intent patterns compiled into combined regexes.
+
+    Intents are split into blocks of BLOCK_SIZE; within a block each
+    intent's patterns become one named group of an alternation, so a single
+    search finds the leftmost match among the block's intents. Priority is
+    then resolved by searching only the intents of the block declared
+    before the one found (again as one combined regex) until no
+    higher-priority intent matches. Blocks are tried in order, so the
+    result is exactly the first intent in declaration order with a pattern
+    matching anywhere in the text, and the number of compiled regexes stays
+    proportional to the number of intents.
+    """
+
+    BLOCK_SIZE = 64
+
+    __slots__ = ('names', 'entries', 'fallback', 'combinable', '_regexes')
+
+    def __init__(self, merged: Dict[str, Dict[str, Any]]):
+        self.names = list(merged)
+        # (intent position, patterns) of the intents that have patterns
+        self.entries = [(position, definition['patterns'])
+                        for position, definition in enumerate(merged.values())
+                        if definition['patterns']]
+        self.fallback = [(position, compiled)
+                         for position, definition in enumerate(merged.values())
+                         for compiled in definition['compiled']]
+        # Numbered backreferences change meaning once patterns are combined
+        self.combinable = not any(_NUMBERED_BACKREF.search(pattern)
+                                  for _, patterns in self.entries for pattern in patterns)
+        # Combined regex over entries[start:end], compiled on demand
+        self._regexes: Dict[tuple, Any] = {}
+
+        if self.combinable:
+            try:
+                for start in range(0, len(self.entries), self.BLOCK_SIZE):
+                    self._regex(start, min(start + self.BLOCK_SIZE, len(self.entries)))
+            except re.error:
+                # e.g. the same group name used by two patterns
+                self.combinable = False
+
+    def _regex(self, start: int, end: int):
+        """Combined regex over entries[start:end]."""
+        key = (start, end)
+        regex = self._regexes.get(key)
+        if regex is None:
+            entries = self.entries[start:end]
+            # A word boundary shared by every pattern is checked once per
+            # position instead of once per alternative
+            hoist = all(_leading_boundary(pattern)
+                        for _, patterns in entries for pattern in patterns)
+            groups = []
+            for offset, (_, patterns) in enumerate(entries):
+                body = "|".join(f"(?:{pattern[2:] if hoist else pattern})"
+                                for pattern in patterns)
+                groups.append(f"(?P<e{start + offset}>{body})")
+            regex = re.compile((r"\b" if hoist else "") + "(?:" + "|".join(groups) + ")")
+            self._regexes[key] = regex
+        return regex
+
+    def match(self, text: str) -> Optional[str]:
+        """Name of the first declared intent matching the text, or None."""
+        index = self.first_index(text)
+        return self.names[index] if index is not None else None
+
+    def first_index(self, text: str, limit: Optional[int] = None) -> Optional[int]:
+        """
+        Position of the first declared intent matching the text.
+
+        Args:
+            text: Lowercase utterance
+            limit: Only consider intents declared before this position
+
+        Returns:
+            Intent position, or None if nothing matched
+        """
+        if limit is None:
+            limit = len(self.names)
+
+        if not self.combinable:
+            for index, compiled in self.fallback:
+                if index >= limit:
+                    break
+                if compiled.search(text):
+                    return index
+            return None
+
+        entries = self.entries
+        for start in range(0, len(entries), self.BLOCK_SIZE):
+            end = min(start + self.BLOCK_SIZE, len(entries))
+            while end > start and entries[end - 1][0] >= limit:
+                end -= 1
+            if end == start:
+                break
+
+            found = self._regex(start, end).search(text)
+            if found is None:
+                continue
+            entry = int(found.lastgroup[1:])
+            while entry > start:
+                found = self._regex(start, entry).search(text)
+                if found is None:
+                    break
+                entry = int(found.lastgroup[1:])
+            return entries[entry][0]
+        return None
+
+
+class _IndexedMatcher:
+    """
+    Phrase index for literal patterns plus regexes for the rest.
+
+    Literal patterns are expanded into token sequences and indexed in a
+    token-level Aho-Corasick automaton (one pass over the utterance's words
+    whatever the number of phrases). Regex patterns that start with a word
+    boundary and a literal (e.g. \\bluz\\d+) are keyed by the first two
+    letters of that literal and only run when some word of the utterance
+    starts with it; any other regex goes to combined regexes. Only intents
+    declared before the best hit so far are checked at each step.
+    """
+
+    __slots__ = ('names', 'index', 'keyed', 'regex')
+
+    def __init__(self, merged: Dict[str, Dict[str, Any]]):
+        self.names = list(merged)
+        self.index = PhraseIndex()
+        # First two letters of the literal -> [(position, literal, compiled)]
+        self.keyed: Dict[str, List[tuple]] = {}
+
+        remaining = {}
+        for position, (name, definition) in enumerate(merged.items()):
+            patterns, compiled = [], []
+            for pattern, regex in zip(definition['patterns'], definition['compiled']):
+                phrases = expand_pattern(pattern)
+                if phrases is not None:
+                    for tokens in phrases:
+                        self.index.add(tokens, position)
+                    continue
+
+                literal = _literal_prefix(pattern)
+                if literal is not None:
+                    self.keyed.setdefault(literal[:2], []).append((position, literal, regex))
+                else:
+                    patterns.append(pattern)
+                    compiled.append(regex)
+            remaining[name] = {'patterns': patterns, 'compiled': compiled}
+
+        self.index.build()
+        self.regex = _CombinedMatcher(remaining)
+
+    def match(self, text: str) -> Optional[str]:
+        """Name of the first declared intent matching the text, or None."""
+        tokens = tokenize(text)
+        best = self.index.search(tokens)
+
+        if self.keyed:
+            candidates = set()
+            for token in tokens:
+                for entry in self.keyed.get(token[:2], ()):
+                    if (best is None or entry[0] < best) and token.startswith(entry[1]):
+                        candidates.add(entry)
+            for position, _, regex in sorted(candidates, key=lambda entry: entry[0]):
+                if regex.search(text):
+                    best = position
+                    break
+
+        found = self.regex.first_index(text, limit=best)
+        if found is not None:
+            best = found
+        return self.names[best] if best is not None else None
@@ -0,0 +1,177 @@
+"""
+Pipelined execution of the voice chain.
+Runs capture → decode → intent/action → speech as asyncio stages joined by
+bounded queues, so consecutive utterances overlap: the next command can be
+captured while the previous one is decoded, handled and spoken.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Marks the end of the stream as it flows through the queues
+_DONE = object()
+
+
+class VoicePipeline:
+    """Asyncio pipeline with one worker thread per blocking stage."""
+
+    def __init__(self, capture: Callable[[], Any], decode: Callable[[Any], Optional[str]],
+                 handle: Callable[[str], Optional[Dict[str, Any]]],
+                 speak: Callable[[Dict[str, Any]], Any],
+                 queue_size: int = 2,
+                 on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 max_capture_errors: int = 5, capture_retry_delay: float = 0.5):
+        """
+        Initialize the pipeline.
+
+        Each stage is a blocking callable run on its own thread; returning
+        None from capture, decode or handle drops the utterance.
+
+        Args:
+            capture: Records one utterance and returns its audio
+            decode: Turns audio into text
+            handle: Turns text into a result dict with a 'response' key
+            speak: Speaks a result
+            queue_size: Capacity of each inter-stage queue (backpressure:
+                capture pauses when downstream stages fall behind)
+            on_result: Optional callback receiving each handled result
+            max_capture_errors: Consecutive capture failures (e.g. no
+                microphone) after which the pipeline stops and run() raises
+            capture_retry_delay: Seconds to wait after the first capture
+                failure, doubled on each further consecutive failure
+        """
+        self.capture = capture
+        self.decode = decode
+        self.handle = handle
+        self.speak = speak
+        self.queue_size = queue_size
+        self.on_result = on_result
+        self.max_capture_errors = max_capture_errors
+        self.capture_retry_delay = capture_retry_delay
+
+        self.stats = {'captured': 0, 'decoded': 0, 'handled': 0, 'spoken': 0}
+        self._loop = None
+        self._stop_requested = None
+        self._capture_error = None
+
+    def stop(self):
+        """
+        Ask the pipeline to finish: capture stops and queued utterances drain.
+
+        Safe to call from any thread.
+        """
+        if self._loop is not None and self._stop_requested is not None:
+            self._loop.call_soon_threadsafe(self._stop_requested.set)
+
+    async def run(self, max_utterances: Optional[int] = None):
+        """
+        Run until stop(), max_utterances captures, or cancellation.
+
+        On cancellation every stage is cancelled and the worker threads are
+        released without waiting for blocked calls.
+
+        Args:
+            max_utterances: Stop capturing after this many utterances
+
+        Raises:
+            RuntimeError: If capture failed max_capture_errors times in a
+                row (raised once the utterances in flight are drained)
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stop_requested = asyncio.Event()
+        self._capture_error = None
+
+        audio_queue = asyncio.Queue(maxsize=self.queue_size)
+        text_queue = asyncio.Queue(maxsize=self.queue_size)
+        result_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        executors = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"pipeline-{name}")
+                     for name in ('capture', 'decode', 'handle', 'speak')]
+
+        tasks = [
+            asyncio.ensure_future(self._capture_stage(audio_queue, executors[0], max_utterances)),
+            asyncio.ensure_future(self._stage('decode', self.decode, audio_queue,
+                                              text_queue, executors[1])),
+            asyncio.ensure_future(self._stage('handle', self._handle, text_queue,
+                                              result_queue, executors[2])),
+            asyncio.ensure_future(self._stage('speak', self.speak, result_queue,
+                                              None, executors[3])),
+        ]
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for executor in executors:
+                executor.shutdown(wait=False)
+            self._loop = None
+
+        if self._capture_error is not None:
+            raise RuntimeError(f"Capture failed {self.max_capture_errors} times in a row: "
+                               f"{self._capture_error}") from self._capture_error
+
+    def _handle(self, text: str) -> Optional[Dict[str, Any]]:
+        result = self.handle(text)
+        if result is not None and self.on_result is not None:
+            self.on_result(result)
+        return result
+
+    async def _capture_stage(self, outbox: asyncio.Queue, executor: ThreadPoolExecutor,
+                             max_utterances: Optional[int]):
+        loop = asyncio.get_running_loop()
+        failures = 0
+
+        while not self._stop_requested.is_set():
+            if max_utterances is not None and self.stats['captured'] >= max_utterances:
+                break
+
+            try:
+                audio = await loop.run_in_executor(executor, self.capture)
+            except Exception as e:
+                print(f"Error in capture stage: {e}")
+                failures += 1
+                if failures >= self.max_capture_errors:
+                    self._capture_error = e
+                    break
+                # Back off instead of spinning on a missing or unplugged device
+                delay = self.capture_retry_delay * 2 ** (failures - 1)
+                try:
+                    await asyncio.wait_for(self._stop_requested.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            failures = 0
+            if audio is None:
+                continue
+            self.stats['captured'] += 1
+            # Waits while downstream stages are behind (backpressure)
+            await outbox.put(audio)
+
+        await outbox.put(_DONE)
+
+    async def _stage(self, name: str, func: Callable, inbox: asyncio.Queue,
+                     outbox: Optional[asyncio.Queue], executor: ThreadPoolExecutor):
+        loop = asyncio.get_running_loop()
+        counter = {'decode': 'decoded', 'handle': 'handled', 'speak': 'spoken'}[name]
+
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                if outbox is not None:
+                    await outbox.put(_DONE)
+                return
+
+            try:
+                result = await loop.run_in_executor(executor, func, item)
+            except Exception as e:
+                print(f"Error in {name} stage: {e}")
+                continue
+
+            if outbox is None:
+                self.stats[counter] += 1
+            elif result is not None:
+                self.stats[counter] += 1
+                await outbox.put(result)
@@ -0,0 +1 @@
+"""Server module for the long-lived recognizer daemon"""
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Client for the recognizer daemon.
+Sends requests over the daemon's Unix socket so short-lived scripts get
+warm-model latency.
+
+Usage:
+    python src/server/client.py ping
+    python src/server/client.py metrics
+    python src/server/client.py text "enciende la luz"
+    python src/server/client.py file examples/sample.wav
+    python src/server/client.py stream examples/sample.wav
+    python src/server/client.py speak "Hola"
+"""
+import json
+import os
+import socket
+import struct
+import sys
+import wave
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from server.daemon import DEFAULT_SOCKET_PATH, MAX_FRAME_BYTES, check_socket_directory
+
+_FRAME_HEADER = struct.Struct('>I')
+
+
+class DaemonClient:
+    """Connection to a running recognizer daemon."""
+    
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = 60.0):
+        """
+        Initialize the client. The connection is opened on the first request.
+        
+        Args:
+            socket_path: Filesystem path of the daemon's Unix socket
+            timeout: Socket timeout in seconds
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._sock = None
+        self._rfile = None
+    
+    def _connect(self):
+        if self._sock is None:
+            # Don't send requests to a socket another user planted
+            check_socket_directory(self.socket_path)
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(self.timeout)
+            self._sock.connect(self.socket_path)
+            self._rfile = self._sock.makefile('rb')
+    
+    def _send(self, payload: Dict[str, Any]):
+        self._connect()
+        self._sock.sendall((json.dumps(payload, ensure_ascii=False) + "\n").encode('utf-8'))
+    
+    def _receive(self) -> Dict[str, Any]:
+        line = self._rfile.readline()
+        if not line:
+            self.close()
+            raise ConnectionError("Daemon closed the connection")
+        return json.loads(line)
+    
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a request and wait for its response.
+        
+        Args:
+            payload: JSON request with a 'command' field
+            
+        Returns:
+            Decoded response
+        """
+        self._send(payload)
+        return self._receive()
+    
+    def ping(self) -> bool:
+        """Check that the daemon is alive."""
+        return self.request({'command': 'ping'}).get('ok', False)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Get the daemon's latency metrics snapshot."""
+        return self.request({'command': 'metrics'}).get('metrics', {})
+    
+    def process_text(self, text: str) -> Dict[str, Any]:
+        """Match intent and execute the action for a text command."""
+        return self.request({'command': 'process_text', 'text': text})
+    
+    def transcribe_file(self, path: str) -> Dict[str, Any]:
+        """Transcribe a WAV file readable by the daemon process."""
+        return self.request({'command': 'transcribe_file', 'path': os.path.abspath(path)})
+    
+    def speak(self, text: str) -> Dict[str, Any]:
+        """Speak text through the daemon's warm TTS engine."""
+        return self.request({'command': 'speak', 'text': text})
+    
+    def stream_pcm(self, chunks: Iterable[bytes], sample_rate: int = 16000) -> Dict[str, Any]:
+        """
+        Stream 16-bit mono PCM to the daemon and get the transcription.
+        
+        Args:
+            chunks: Iterable of raw PCM byte chunks
+            sample_rate: Sample rate of the audio (must match the daemon's)
+            
+        Returns:
+            Decoded response with 'text'
+        """
+        self._send({'command': 'stream', 'sample_rate': sample_rate})
+        for chunk in chunks:
+            # Larger chunks are split into frames the daemon accepts
+            for start in range(0, len(chunk), MAX_FRAME_BYTES):
+                frame = chunk[start:start + MAX_FRAME_BYTES]
+                self._sock.sendall(_FRAME_HEADER.pack(len(frame)) + frame)
+        self._sock.sendall(_FRAME_HEADER.pack(0))
+        return self._receive()
+    
+    def close(self):
+        """Close the connection."""
+        if self._rfile is not None:
+            self._rfile.close()
+            self._rfile = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _wav_chunks(path: str, frames: int = 4000) -> Iterable[bytes]:
+    """Read raw PCM chunks from a WAV file."""
+    with wave.open(path, "rb") as wf:
+        while True:
+            data = wf.readframes(frames)
+            if not data:
+                break
+            yield data
+
+
+def main():
+    """Command line entry point."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Voice recognizer daemon client")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path")
+    parser.add_argument("command", choices=['ping', 'metrics', 'text', 'file', 'stream', 'speak'])
+    parser.add_argument("argument", nargs='?', default='',
+                        help="Text for 'text'/'speak', WAV path for 'file'/'stream'")
+    args = parser.parse_args()
+    
+    try:
+        with DaemonClient(args.socket) as client:
+            if args.command == 'ping':
+                response = {'ok': client.ping()}
+            elif args.command == 'metrics':
+                response = {'ok': True, 'metrics': client.metrics()}
+            elif args.command == 'text':
+                response = client.process_text(args.argument)
+            elif args.command == 'file':
+                response = client.transcribe_file(args.argument)
+            elif args.command == 'stream':
+                with wave.open(args.argument, "rb") as wf:
+                    sample_rate = wf.getframerate()
+                response = client.stream_pcm(_wav_chunks(args.argument), sample_rate)
+            else:
+                response = client.speak(args.argument)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    print(json.dumps(response, ensure_ascii=False))
+    sys.exit(0 if response.get('ok') else 1)
+
+
+if __name__ == "__main__":
+    main()
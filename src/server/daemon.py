@@ -0,0 +1,374 @@
+"""
+Recognizer daemon module.
+Keeps the Vosk model, recognizer pool and TTS engine warm in a long-lived
+process and serves requests over a Unix domain socket.
+
+Protocol (one connection can carry several requests):
+    Each request is a JSON object on one line and gets a one-line JSON
+    response with 'ok' plus command-specific fields.
+
+    {"command": "ping"}
+    {"command": "metrics"}
+    {"command": "process_text", "text": "enciende la luz"}
+    {"command": "transcribe_file", "path": "/abs/path/audio.wav"}
+    {"command": "speak", "text": "Luz encendida"}
+    {"command": "stream", "sample_rate": 16000}
+        followed by binary frames: 4-byte big-endian length + 16-bit mono
+        PCM payload, terminated by a zero-length frame. Frames longer than
+        MAX_FRAME_BYTES get an error response and the connection is closed.
+
+Usage:
+    python src/server/daemon.py --model models/vosk-model-small-es-0.42
+"""
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from nlu.matcher import match_intent
+from executor.actions import execute
+
+SOCKET_NAME = "voice-recognizer.sock"
+
+
+def _user_temp_dir() -> str:
+    """Per-user socket directory under the shared temp directory."""
+    if hasattr(os, 'getuid'):
+        user = str(os.getuid())
+    else:
+        import getpass
+        user = getpass.getuser()
+    return os.path.join(tempfile.gettempdir(), f"voice-recognizer-{user}")
+
+
+def default_socket_path() -> str:
+    """
+    Get the per-user default socket path.
+    
+    Returns:
+        The socket in $XDG_RUNTIME_DIR if set, else in a private
+        voice-recognizer-<uid> directory under the temp directory
+    """
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    return os.path.join(_user_temp_dir(), SOCKET_NAME)
+
+
+def check_socket_directory(socket_path: str, create: bool = False):
+    """
+    Make sure no other user controls the per-user temp socket directory.
+    
+    The directory name is predictable, so another local user could create
+    it first and serve a socket of their own. Other directories (e.g.
+    $XDG_RUNTIME_DIR or an explicit --socket) are left to the caller.
+    
+    Args:
+        socket_path: Socket the daemon binds or the client connects to
+        create: Create the directory (mode 0700) if it does not exist
+        
+    Raises:
+        RuntimeError: If the directory is not a private directory of the
+            current user
+    """
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    if directory != _user_temp_dir():
+        return
+    if create:
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+    info = os.lstat(directory)
+    owner_ok = not hasattr(os, 'getuid') or info.st_uid == os.getuid()
+    if not stat.S_ISDIR(info.st_mode) or not owner_ok or info.st_mode & 0o077:
+        raise RuntimeError(f"Refusing to use {directory}: it must be a directory "
+                           f"owned by the current user with mode 0700")
+
+
+DEFAULT_SOCKET_PATH = default_socket_path()
+
+_FRAME_HEADER = struct.Struct('>I')
+
+# Five seconds of 16 kHz 16-bit PCM; the length comes from the client
+MAX_FRAME_BYTES = 5 * 16000 * 2
+
+
+class ProtocolError(Exception):
+    """A client broke the framing; the connection can't be resynchronized."""
+
+
+def read_frames(rfile: BinaryIO, max_bytes: int = MAX_FRAME_BYTES) -> Iterator[bytes]:
+    """
+    Read length-prefixed PCM frames until a zero-length frame.
+    
+    Args:
+        rfile: Binary stream of the connection
+        max_bytes: Largest accepted frame payload
+        
+    Yields:
+        Frame payloads
+        
+    Raises:
+        ProtocolError: If a frame header announces more than max_bytes
+    """
+    while True:
+        header = rfile.read(_FRAME_HEADER.size)
+        if len(header) < _FRAME_HEADER.size:
+            return
+        (length,) = _FRAME_HEADER.unpack(header)
+        if length == 0:
+            return
+        if length > max_bytes:
+            raise ProtocolError(f"Frame of {length} bytes exceeds the "
+                                f"{max_bytes}-byte limit")
+        yield rfile.read(length)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads JSON-line requests from one client connection."""
+    
+    def handle(self):
+        daemon = self.server.recognizer_daemon
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {'ok': False, 'error': 'Invalid JSON request'}
+            else:
+                try:
+                    response = daemon.handle_request(request, self.rfile)
+                except ProtocolError as e:
+                    # The rest of the stream can't be parsed: answer and hang up
+                    self._respond({'ok': False, 'error': str(e)})
+                    break
+            
+            self._respond(response)
+    
+    def _respond(self, response: Dict[str, Any]):
+        self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode('utf-8'))
+        self.wfile.flush()
+
+
+class _FrameStream:
+    """
+    Frame iterator that keeps a ProtocolError for the daemon to act on,
+    since the recognizer swallows errors raised by its input.
+    """
+    
+    def __init__(self, frames: Iterator[bytes]):
+        self._frames = frames
+        self.error = None
+    
+    def __iter__(self):
+        try:
+            yield from self._frames
+        except ProtocolError as e:
+            self.error = e
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class RecognizerDaemon:
+    """Serves a warm VoiceRecognizer over a Unix domain socket."""
+    
+    def __init__(self, recognizer, socket_path: str = DEFAULT_SOCKET_PATH):
+        """
+        Initialize the daemon.
+        
+        Args:
+            recognizer: VoiceRecognizer whose ASR/TTS are kept loaded
+            socket_path: Filesystem path of the Unix socket
+        """
+        self.recognizer = recognizer
+        self.socket_path = socket_path
+        self._server = None
+        self._thread = None
+        self._tts_lock = threading.Lock()
+    
+    def handle_request(self, request: Dict[str, Any], rfile: BinaryIO) -> Dict[str, Any]:
+        """
+        Execute one request.
+        
+        Args:
+            request: Decoded JSON request
+            rfile: Connection stream (used by 'stream' to read PCM frames)
+            
+        Returns:
+            JSON-serializable response
+            
+        Raises:
+            ProtocolError: If the PCM frames of a 'stream' request are
+                malformed (the connection must then be closed)
+        """
+        command = request.get('command')
+        
+        try:
+            if command == 'ping':
+                return {'ok': True}
+            
+            elif command == 'metrics':
+                return {'ok': True, 'metrics': self.recognizer.metrics.snapshot()}
+            
+            elif command == 'process_text':
+                metrics = self.recognizer.metrics
+                with metrics.span('nlu'):
+                    intent_data = match_intent(request.get('text', ''),
+                                               fuzzy=self.recognizer.fuzzy, cache=True)
+                with metrics.span('action'):
+                    response = execute(intent_data)
+                return {
+                    'ok': True,
+                    'intent': intent_data['intent'],
+                    'confidence': intent_data['confidence'],
+                    'response': response
+                }
+            
+            elif command == 'transcribe_file':
+                text = self.recognizer.asr.recognize_from_file(request['path'])
+                return {'ok': text is not None, 'text': text}
+            
+            elif command == 'stream':
+                frames = _FrameStream(read_frames(rfile))
+                sample_rate = request.get('sample_rate', self.recognizer.asr.sample_rate)
+                if sample_rate != self.recognizer.asr.sample_rate:
+                    text = None
+                    error = f"Sample rate must be {self.recognizer.asr.sample_rate} Hz"
+                else:
+                    text = self.recognizer.asr.recognize_pcm(frames)
+                    error = None
+                # Consume whatever the recognizer didn't, to stay in sync
+                for _ in frames:
+                    pass
+                if frames.error is not None:
+                    raise frames.error
+                if error:
+                    return {'ok': False, 'error': error}
+                return {'ok': text is not None, 'text': text}
+            
+            elif command == 'speak':
+                # pyttsx3 drivers are not thread-safe
+                with self._tts_lock:
+                    spoken = self.recognizer.tts.speak(request.get('text', ''))
+                return {'ok': spoken}
+            
+            else:
+                return {'ok': False, 'error': f"Unknown command: {command}"}
+        
+        except ProtocolError:
+            raise
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+    
+    def _remove_stale_socket(self):
+        """Delete a socket file left behind by a daemon that is no longer running."""
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+        else:
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+    
+    def _bind(self):
+        check_socket_directory(self.socket_path, create=True)
+        self._remove_stale_socket()
+        self._server = _Server(self.socket_path, _RequestHandler)
+        self._server.recognizer_daemon = self
+        # Only the daemon's user may send requests
+        os.chmod(self.socket_path, 0o600)
+    
+    def serve_forever(self):
+        """Serve requests on the current thread until shutdown() or Ctrl+C."""
+        self._bind()
+        print(f"Daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nStopping daemon...")
+        finally:
+            self._close()
+    
+    def start(self):
+        """Serve requests on a background thread."""
+        self._bind()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+    
+    def shutdown(self):
+        """Stop serving and remove the socket file."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._close()
+    
+    def _close(self):
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def main():
+    """Command line entry point."""
+    import argparse
+    from main import VoiceRecognizer
+    from nlu.matcher import get_registry
+    
+    parser = argparse.ArgumentParser(description="Voice recognizer daemon")
+    parser.add_argument("--model", default=None, help="Path to Vosk model directory")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path")
+    parser.add_argument("--pool-size", type=int, default=4,
+                        help="Recognizers available for concurrent requests")
+    parser.add_argument("--grammar", action="store_true",
+                        help="Restrict recognition to the known intent phrases")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="Accept intent phrases with small recognition errors")
+    parser.add_argument("--nlu-backend", choices=['regex', 'index'], default=None,
+                        help="Intent matching backend ('index' scales to thousands of intents)")
+    args = parser.parse_args()
+    
+    # The intent registry is shared by the whole process
+    if args.nlu_backend is not None:
+        get_registry().set_backend(args.nlu_backend)
+    
+    model_path = args.model
+    if model_path is None:
+        project_root = Path(__file__).parent.parent.parent
+        model_path = str(project_root / "models" / "vosk-model-small-es-0.42")
+    
+    recognizer = VoiceRecognizer(model_path=model_path, grammar=args.grammar,
+                                 pool_size=args.pool_size, fuzzy=args.fuzzy)
+    recognizer.preload()
+    
+    RecognizerDaemon(recognizer, socket_path=args.socket).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
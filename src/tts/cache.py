@@ -0,0 +1,183 @@
+"""
+On-disk cache of synthesized TTS audio.
+Rendered WAV files are stored under a content hash of the text and voice
+settings, with a total size bound enforced by LRU eviction.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Temp files older than this were left by a crash; younger ones may still be
+# written by another process sharing the directory
+STALE_TEMP_SECONDS = 600
+
+
+class TTSCache:
+    """Content-addressed LRU cache of rendered speech files."""
+    
+    def __init__(self, cache_dir: str = "cache/tts", max_bytes: int = 50 * 1024 * 1024):
+        """
+        Initialize the cache, indexing files left by previous runs.
+        
+        Args:
+            cache_dir: Directory holding the cached WAV files
+            max_bytes: Maximum total size of the cached files
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        
+        # key -> file size, least recently used first
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        
+        # File modification times carry the LRU order across restarts
+        files = []
+        stale = time.time() - STALE_TEMP_SECONDS
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            if name.endswith('.tmp.wav'):
+                # Partial rendering (see temp_path_for), removed once stale
+                try:
+                    if os.stat(path).st_mtime < stale:
+                        os.remove(path)
+                except OSError:
+                    pass
+            elif name.endswith('.wav'):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+        
+        with self._lock:
+            self._evict()
+    
+    @staticmethod
+    def make_key(text: str, voice: Optional[str], rate: int, volume: float) -> str:
+        """
+        Build the cache key for a rendering.
+        
+        Args:
+            text: Text to speak
+            voice: Voice id
+            rate: Speech rate (words/min)
+            volume: Volume (0.0-1.0)
+            
+        Returns:
+            Hex digest identifying the rendered audio
+        """
+        payload = json.dumps([text, voice, rate, volume], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def path_for(self, key: str) -> str:
+        """
+        Get the file path for a key (whether or not it is cached).
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            WAV file path
+        """
+        return os.path.join(self.cache_dir, f"{key}.wav")
+    
+    def temp_path_for(self, key: str) -> str:
+        """
+        Get a scratch path to render into before calling put().
+        
+        The name is unique per process and thread, since several processes
+        (e.g. the CLI and the daemon) may share the cache directory.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Temporary WAV file path inside the cache directory
+        """
+        return os.path.join(self.cache_dir,
+                            f"{key}.{os.getpid()}-{threading.get_ident()}.tmp.wav")
+    
+    @property
+    def total_bytes(self) -> int:
+        """Total size of the cached files."""
+        return self._total_bytes
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a rendering and mark it as recently used.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            WAV file path or None on a miss
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            path = self.path_for(key)
+            try:
+                os.utime(path)
+            except OSError:
+                # Deleted behind our back
+                self._total_bytes -= self._entries.pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return path
+    
+    def put(self, key: str, source_path: str) -> Optional[str]:
+        """
+        Move a rendered file into the cache.
+        
+        Args:
+            key: Cache key
+            source_path: Rendered WAV file (moved, not copied)
+            
+        Returns:
+            Cached file path, or None if the file was too large to cache
+        """
+        size = os.path.getsize(source_path)
+        if size > self.max_bytes:
+            os.remove(source_path)
+            return None
+        
+        path = self.path_for(key)
+        with self._lock:
+            os.replace(source_path, path)
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+        return path
+    
+    def clear(self):
+        """Remove every cached file."""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+    
+    def _remove(self, key: str):
+        self._total_bytes -= self._entries.pop(key)
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
+    
+    def _evict(self):
+        """Drop least recently used files until under the size bound."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
@@ -1,22 +1,36 @@
 """
 Text-to-Speech module using pyttsx3 for offline TTS.
 """
+import os
+import shutil
 import pyttsx3
-from typing import Optional
+from typing import Optional, Tuple
+
+from tts.cache import TTSCache
 
 
 class TTSEngine:
     """Offline TTS engine using pyttsx3."""
     
-    def __init__(self, language: str = 'spanish'):
+    def __init__(self, language: str = 'spanish', cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = 50 * 1024 * 1024):
         """
         Initialize TTS engine.
         
         Args:
             language: Language code ('spanish' or 'english')
+            cache_dir: Directory for cached renderings (None disables the cache)
+            cache_max_bytes: Maximum size of the rendering cache
         """
         self.language = language
         self.engine = None
+        self.voice_id = None
+        self.rate = 150
+        self.volume = 0.9
+        self.cache = TTSCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self._playing_cached = False
+        # Set by stop(); a cut-short rendering is neither cached nor played
+        self._interrupted = False
         
         try:
             self.engine = pyttsx3.init()
@@ -37,8 +51,9 @@ class TTSEngine:
                     self.engine.setProperty('voice', voices[0].id)
             
             # Set properties
-            self.engine.setProperty('rate', 150)  # Speed
-            self.engine.setProperty('volume', 0.9)  # Volume
+            self.engine.setProperty('rate', self.rate)  # Speed
+            self.engine.setProperty('volume', self.volume)  # Volume
+            self.voice_id = self.engine.getProperty('voice')
             
         except Exception as e:
             print(f"Warning: Could not initialize TTS engine: {e}")
@@ -60,6 +75,21 @@ class TTSEngine:
         
         try:
             print(f"🔊 Speaking: {text}")
+            
+            self._interrupted = False
+            # Cache hits play the stored rendering without synthesis
+            if self.cache is not None:
+                path, temporary = self._render_cached(text)
+                if self._interrupted:
+                    return False
+                if path is not None:
+                    try:
+                        if self._play_file(path):
+                            return True
+                    finally:
+                        if temporary:
+                            os.remove(path)
+            
             self.engine.say(text)
             self.engine.runAndWait()
             return True
@@ -67,6 +97,87 @@ class TTSEngine:
             print(f"Error during TTS: {e}")
             return False
     
+    def _render_cached(self, text: str) -> Tuple[Optional[str], bool]:
+        """
+        Get the cached rendering of text, synthesizing it on a miss.
+        
+        Args:
+            text: Text to speak
+            
+        Returns:
+            (WAV file path, True if it is a temporary file the caller must
+            delete), or (None, False) if there is no usable rendering
+        """
+        key = TTSCache.make_key(text, self.voice_id, self.rate, self.volume)
+        path = self.cache.get(key)
+        if path is not None:
+            return path, False
+        
+        temp_path = self.cache.temp_path_for(key)
+        self.engine.save_to_file(text, temp_path)
+        self.engine.runAndWait()
+        if not os.path.exists(temp_path):
+            return None, False
+        if self._interrupted:
+            # Truncated by stop(): caching it would replay the cut from now on
+            os.remove(temp_path)
+            return None, False
+        
+        try:
+            from utils.audio import read_wav
+            read_wav(temp_path)
+        except Exception:
+            # Some drivers (e.g. macOS) render AIFF, which we can't play back
+            print("Warning: TTS driver does not render 16-bit WAV; disabling cache")
+            os.remove(temp_path)
+            self.cache = None
+            return None, False
+        
+        if os.path.getsize(temp_path) > self.cache.max_bytes:
+            # Too large to cache, but already rendered: use it once
+            return temp_path, True
+        return self.cache.put(key, temp_path), False
+    
+    def _play_file(self, path: str) -> bool:
+        """
+        Play a cached rendering.
+        
+        Args:
+            path: WAV file path
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            from utils.audio import read_wav, play_audio
+            audio, sample_rate = read_wav(path)
+            self._playing_cached = True
+            play_audio(audio, sample_rate)
+            return True
+        except Exception as e:
+            print(f"Warning: Could not play cached audio: {e}")
+            return False
+        finally:
+            self._playing_cached = False
+    
+    def stop(self):
+        """
+        Interrupt speech in progress (called from another thread).
+        
+        Cached playback stops immediately; live synthesis stops as soon as
+        the pyttsx3 driver honors the request. A rendering cut short is
+        discarded instead of being cached.
+        """
+        self._interrupted = True
+        try:
+            if self._playing_cached:
+                import sounddevice as sd
+                sd.stop()
+            elif self.engine is not None:
+                self.engine.stop()
+        except Exception as e:
+            print(f"Warning: Could not stop speech: {e}")
+    
     def save_to_file(self, text: str, filename: str) -> bool:
         """
         Save speech to audio file.
@@ -82,8 +193,19 @@ class TTSEngine:
             return False
         
         try:
-            self.engine.save_to_file(text, filename)
-            self.engine.runAndWait()
+            self._interrupted = False
+            path, temporary = (self._render_cached(text) if self.cache is not None
+                               else (None, False))
+            if self._interrupted:
+                return False
+            if path is not None:
+                if temporary:
+                    shutil.move(path, filename)
+                else:
+                    shutil.copyfile(path, filename)
+            else:
+                self.engine.save_to_file(text, filename)
+                self.engine.runAndWait()
             print(f"Audio saved to {filename}")
             return True
         except Exception as e:
@@ -0,0 +1,233 @@
+"""
+Asynchronous TTS worker.
+Speaks queued utterances on a background thread so the caller can go back
+to listening while a response is being synthesized and played.
+"""
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+
+class SpeechHandle:
+    """Handle to a queued utterance."""
+    
+    def __init__(self, text: str, priority: int):
+        self.text = text
+        self.priority = priority
+        self.future = Future()
+        self.interrupted = False
+        self._worker = None
+    
+    def done(self) -> bool:
+        """True once the utterance was spoken, interrupted or cancelled."""
+        return self.future.done()
+    
+    def cancelled(self) -> bool:
+        """True if the utterance was dropped before being spoken."""
+        return self.future.cancelled()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the utterance to finish.
+        
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+            
+        Returns:
+            True if it was spoken to the end, False otherwise
+        """
+        try:
+            return bool(self.future.result(timeout))
+        except Exception:
+            return False
+    
+    def cancel(self) -> bool:
+        """
+        Drop the utterance, interrupting it if it is being spoken.
+        
+        Returns:
+            True if it was cancelled or interrupted
+        """
+        if self._worker is None:
+            return self.future.cancel()
+        return self._worker._cancel_handle(self)
+
+
+class TTSWorker:
+    """Background thread speaking a bounded priority queue of utterances."""
+    
+    def __init__(self, engine_factory: Callable, max_queue: int = 8):
+        """
+        Start the worker.
+        
+        The engine is created on the worker thread, since TTS drivers
+        generally must be used from the thread that initialized them.
+        
+        Args:
+            engine_factory: Callable returning a TTSEngine (or anything with
+                speak(text) -> bool and stop())
+            max_queue: Maximum number of pending utterances
+        """
+        self.max_queue = max_queue
+        self._engine_factory = engine_factory
+        self._engine = None
+        
+        self._heap: List = []
+        self._counter = itertools.count()
+        self._current: Optional[SpeechHandle] = None
+        self._closed = False
+        self._condition = threading.Condition()
+        
+        self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self._thread.start()
+    
+    @property
+    def pending(self) -> int:
+        """Number of utterances waiting to be spoken."""
+        with self._condition:
+            return len(self._heap)
+    
+    @property
+    def busy(self) -> bool:
+        """True while speaking or with utterances pending."""
+        with self._condition:
+            return self._current is not None or bool(self._heap)
+    
+    def submit(self, text: str, priority: int = 0, interrupt: bool = False) -> SpeechHandle:
+        """
+        Queue an utterance.
+        
+        Higher priorities are spoken first; equal priorities in submission
+        order. When the queue is full the oldest lowest-priority utterance
+        is dropped, or the new one if it has the lowest priority.
+        
+        Args:
+            text: Text to speak
+            priority: Utterance priority
+            interrupt: Barge-in: cancel pending speech and interrupt the
+                current utterance before queueing this one
+            
+        Returns:
+            Handle to wait on or cancel the utterance
+        """
+        handle = SpeechHandle(text, priority)
+        
+        with self._condition:
+            if self._closed:
+                handle.future.cancel()
+                return handle
+            
+            if interrupt:
+                self._cancel_all_locked()
+            
+            if len(self._heap) >= self.max_queue:
+                # Lowest priority, oldest first
+                victim = max(self._heap, key=lambda entry: (entry[0], -entry[1]))
+                if victim[0] < -priority:
+                    # Everything queued outranks the new utterance
+                    handle.future.cancel()
+                    return handle
+                self._heap.remove(victim)
+                heapq.heapify(self._heap)
+                victim[2].future.cancel()
+            
+            handle._worker = self
+            heapq.heappush(self._heap, (-priority, next(self._counter), handle))
+            self._condition.notify_all()
+        
+        return handle
+    
+    def cancel_all(self):
+        """Drop pending utterances and interrupt the current one."""
+        with self._condition:
+            self._cancel_all_locked()
+    
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until nothing is being spoken or pending.
+        
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+            
+        Returns:
+            True if the worker became idle
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._current is None and not self._heap, timeout
+            )
+    
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """
+        Stop the worker.
+        
+        Args:
+            wait: Block until the worker thread exits
+            cancel_pending: Drop queued utterances instead of speaking them
+        """
+        with self._condition:
+            self._closed = True
+            if cancel_pending:
+                self._cancel_all_locked()
+            self._condition.notify_all()
+        if wait:
+            self._thread.join()
+    
+    def _cancel_all_locked(self):
+        for _, _, handle in self._heap:
+            handle.future.cancel()
+        self._heap.clear()
+        if self._current is not None:
+            self._interrupt_locked(self._current)
+    
+    def _cancel_handle(self, handle: SpeechHandle) -> bool:
+        with self._condition:
+            if handle is self._current:
+                self._interrupt_locked(handle)
+                return True
+            for index, entry in enumerate(self._heap):
+                if entry[2] is handle:
+                    self._heap.pop(index)
+                    heapq.heapify(self._heap)
+                    return handle.future.cancel()
+            return False
+    
+    def _interrupt_locked(self, handle: SpeechHandle):
+        handle.interrupted = True
+        if self._engine is not None:
+            self._engine.stop()
+    
+    def _run(self):
+        try:
+            self._engine = self._engine_factory()
+        except Exception as e:
+            print(f"Warning: Could not start TTS worker: {e}")
+            with self._condition:
+                self._closed = True
+                self._cancel_all_locked()
+                self._condition.notify_all()
+            return
+        
+        while True:
+            with self._condition:
+                while not self._heap and not self._closed:
+                    self._condition.wait()
+                if not self._heap:
+                    break
+                _, _, handle = heapq.heappop(self._heap)
+                if not handle.future.set_running_or_notify_cancel():
+                    continue
+                self._current = handle
+            
+            try:
+                spoken = self._engine.speak(handle.text)
+            except Exception as e:
+                handle.future.set_exception(e)
+            else:
+                handle.future.set_result(bool(spoken) and not handle.interrupted)
+            finally:
+                with self._condition:
+                    self._current = None
+                    self._condition.notify_all()
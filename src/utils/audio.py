@@ -1,9 +1,13 @@
 """
 Audio utilities for recording and processing.
+
+sounddevice is imported inside the functions that touch audio devices, so
+the signal-processing helpers can be used without PortAudio.
 """
-import sounddevice as sd
 import numpy as np
-from typing import Optional
+import os
+import time
+from typing import Dict, Iterator, Optional, Tuple
 
 
 def list_audio_devices() -> list:
@@ -13,6 +17,8 @@ def list_audio_devices() -> list:
     Returns:
         List of available audio devices
     """
+    import sounddevice as sd
+    
     devices = sd.query_devices()
     print("Available audio devices:")
     for i, device in enumerate(devices):
@@ -27,35 +33,588 @@ def get_default_device() -> Optional[int]:
     Returns:
         Device index or None
     """
+    import sounddevice as sd
+    
     default = sd.default.device
     print(f"Default input device: {default[0]}")
     print(f"Default output device: {default[1]}")
     return default[0]
 
 
-def record_audio(duration: float, sample_rate: int = 16000) -> np.ndarray:
+def record_audio(duration: float, sample_rate: int = 16000, dtype: str = 'float32',
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
     """
     Record audio from microphone.
     
     Args:
         duration: Recording duration in seconds
         sample_rate: Sample rate in Hz
+        dtype: Sample format ('int16' is what the recognizer takes, so it
+            needs no conversion)
+        out: Preallocated (frames, 1) array to record into, reused across
+            recordings instead of allocating one each time (its dtype wins
+            and its length must cover the duration)
         
     Returns:
-        Audio data as numpy array
+        Audio data as numpy array (a view of out when given)
     """
+    import sounddevice as sd
+    
+    frames = int(sample_rate * duration)
     print(f"Recording {duration} seconds...")
-    audio_data = sd.rec(
-        int(sample_rate * duration),
-        samplerate=sample_rate,
-        channels=1,
-        dtype='float32'
-    )
+    if out is not None:
+        audio_data = sd.rec(out=out[:frames], samplerate=sample_rate)
+    else:
+        audio_data = sd.rec(frames, samplerate=sample_rate, channels=1, dtype=dtype)
     sd.wait()
     print("Recording complete")
     return audio_data
 
 
+def _to_float(audio: np.ndarray) -> np.ndarray:
+    """
+    Convert audio samples to mono float32 in [-1, 1].
+    
+    Args:
+        audio: int16 or float audio, shape (n,) or (n, 1)
+        
+    Returns:
+        Flat float32 array
+    """
+    audio = np.asarray(audio).reshape(-1)
+    if audio.dtype == np.int16:
+        return audio.astype(np.float32) / 32768.0
+    return audio.astype(np.float32, copy=False)
+
+
+def frame_features(audio: np.ndarray, sample_rate: int = 16000,
+                   frame_ms: float = 30.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute per-frame energy and zero-crossing rate.
+    
+    Samples that don't fill a whole frame at the end are ignored.
+    
+    Args:
+        audio: Audio data (int16 or float)
+        sample_rate: Sample rate in Hz
+        frame_ms: Frame length in milliseconds
+        
+    Returns:
+        Tuple of (energy in dBFS, zero-crossing rate per sample) arrays
+    """
+    samples = _to_float(audio)
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(samples) // frame_length
+    frames = samples[:n_frames * frame_length].reshape(n_frames, frame_length)
+    
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_length
+    
+    return energy_db, zcr
+
+
+def detect_voice_activity(audio: np.ndarray, sample_rate: int = 16000,
+                          frame_ms: float = 30.0,
+                          energy_threshold_db: float = -40.0,
+                          zcr_threshold: float = 0.25) -> np.ndarray:
+    """
+    Classify each frame as speech or silence.
+    
+    A frame is speech when its energy is above the threshold, or when it is
+    at most 10 dB below it and has a high zero-crossing rate (unvoiced
+    sounds such as "s" or "f").
+    
+    Args:
+        audio: Audio data (int16 or float)
+        sample_rate: Sample rate in Hz
+        frame_ms: Frame length in milliseconds
+        energy_threshold_db: Energy threshold in dBFS
+        zcr_threshold: Zero-crossing rate threshold for unvoiced speech
+        
+    Returns:
+        Boolean array with one value per frame
+    """
+    energy_db, zcr = frame_features(audio, sample_rate, frame_ms)
+    voiced = energy_db > energy_threshold_db
+    unvoiced = (energy_db > energy_threshold_db - 10.0) & (zcr > zcr_threshold)
+    return voiced | unvoiced
+
+
+def trim_silence(audio: np.ndarray, sample_rate: int = 16000,
+                 frame_ms: float = 30.0, padding_ms: float = 150.0,
+                 **vad_options) -> np.ndarray:
+    """
+    Remove leading and trailing silence.
+    
+    Args:
+        audio: Audio data (int16 or float)
+        sample_rate: Sample rate in Hz
+        frame_ms: Frame length in milliseconds
+        padding_ms: Silence kept around the detected speech
+        **vad_options: Extra options for detect_voice_activity
+        
+    Returns:
+        View of the input covering the speech, empty if there is none
+    """
+    speech = detect_voice_activity(audio, sample_rate, frame_ms, **vad_options)
+    active = np.flatnonzero(speech)
+    if len(active) == 0:
+        return audio[:0]
+    
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    padding = int(sample_rate * padding_ms / 1000)
+    start = max(0, active[0] * frame_length - padding)
+    end = min(len(audio), (active[-1] + 1) * frame_length + padding)
+    return audio[start:end]
+
+
+class VoiceActivityDetector:
+    """Streaming VAD with endpointing for live capture."""
+    
+    def __init__(self, sample_rate: int = 16000, frame_ms: float = 30.0,
+                 hangover: float = 0.6, min_speech: float = 0.09,
+                 energy_threshold_db: float = -40.0, zcr_threshold: float = 0.25):
+        """
+        Initialize the detector.
+        
+        Args:
+            sample_rate: Sample rate in Hz
+            frame_ms: Frame length in milliseconds
+            hangover: Seconds of silence after speech that end the utterance
+            min_speech: Seconds of speech needed before an utterance starts
+            energy_threshold_db: Energy threshold in dBFS
+            zcr_threshold: Zero-crossing rate threshold for unvoiced speech
+        """
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_length = max(1, int(sample_rate * frame_ms / 1000))
+        self.hangover_frames = max(1, int(hangover * 1000 / frame_ms))
+        self.min_speech_frames = max(1, int(min_speech * 1000 / frame_ms))
+        self.energy_threshold_db = energy_threshold_db
+        self.zcr_threshold = zcr_threshold
+        self.reset()
+    
+    def reset(self):
+        """Forget the current utterance."""
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._speech_run = 0
+        self._silence_run = 0
+        self.speech_started = False
+        self.ended = False
+    
+    def process(self, block: np.ndarray) -> bool:
+        """
+        Feed a block of audio.
+        
+        Args:
+            block: Audio data (int16 or float)
+            
+        Returns:
+            True once speech was heard and followed by the hangover silence
+        """
+        if self.ended:
+            return True
+        
+        samples = _to_float(block)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        usable = len(samples) - len(samples) % self.frame_length
+        self._pending = samples[usable:].copy()
+        if usable == 0:
+            return False
+        
+        speech = detect_voice_activity(
+            samples[:usable],
+            sample_rate=self.sample_rate,
+            frame_ms=self.frame_ms,
+            energy_threshold_db=self.energy_threshold_db,
+            zcr_threshold=self.zcr_threshold
+        )
+        
+        for is_speech in speech:
+            if is_speech:
+                self._speech_run += 1
+                self._silence_run = 0
+                if self._speech_run >= self.min_speech_frames:
+                    self.speech_started = True
+            else:
+                self._speech_run = 0
+                if self.speech_started:
+                    self._silence_run += 1
+                    if self._silence_run >= self.hangover_frames:
+                        self.ended = True
+                        break
+        
+        return self.ended
+
+
+def record_until_silence(max_duration: float = 10.0, sample_rate: int = 16000,
+                         hangover: float = 0.6, block_size: int = 1600,
+                         dtype: str = 'int16', capture=None) -> np.ndarray:
+    """
+    Record audio until the speaker stops talking.
+    
+    Capture stops after `hangover` seconds of silence following speech, or
+    after `max_duration`. Leading and trailing silence are trimmed.
+    
+    Args:
+        max_duration: Maximum recording duration in seconds
+        sample_rate: Sample rate in Hz
+        hangover: Seconds of silence that end the recording
+        block_size: Samples per captured block
+        dtype: Sample format ('int16' or 'float32')
+        capture: Running utils.capture.AudioCapture to record from (keeps
+            the stream open between utterances and adds its pre-roll);
+            None opens a stream for this recording only
+        
+    Returns:
+        Audio data as numpy array (empty if no speech was detected)
+    """
+    from utils.capture import AudioCapture
+    
+    own_capture = capture is None
+    if own_capture:
+        capture = AudioCapture(sample_rate=sample_rate, block_size=block_size,
+                               buffer_seconds=max_duration + 1.0, preroll=0.0)
+        capture.start()
+    
+    vad = VoiceActivityDetector(sample_rate=sample_rate, hangover=hangover)
+    print(f"Recording (up to {max_duration} seconds)...")
+    start = position = capture.mark()
+    deadline = time.monotonic() + max_duration
+    try:
+        while time.monotonic() < deadline and capture.running:
+            if not capture.wait(position, timeout=0.1):
+                continue
+            block_start = position
+            position = capture.position
+            if vad.process(capture.view(block_start, position)):
+                break
+    finally:
+        if own_capture:
+            capture.stop()
+    print("Recording complete")
+    
+    audio = trim_silence(capture.view(start, position), sample_rate)
+    # A shared ring buffer is overwritten later, so the caller gets a copy
+    if not own_capture:
+        audio = audio.copy()
+    if dtype == 'float32':
+        return _to_float(audio)
+    return audio
+
+
+def read_wav(file_path: str) -> Tuple[np.ndarray, int]:
+    """
+    Read a 16-bit PCM WAV file.
+    
+    Args:
+        file_path: Path to WAV file
+        
+    Returns:
+        Tuple of (int16 samples shaped (frames, channels), sample rate)
+    """
+    import wave
+    
+    with wave.open(file_path, "rb") as wf:
+        if wf.getsampwidth() != 2 or wf.getcomptype() != "NONE":
+            raise ValueError("WAV file must be 16-bit PCM")
+        channels = wf.getnchannels()
+        sample_rate = wf.getframerate()
+        data = wf.readframes(wf.getnframes())
+    
+    audio = np.frombuffer(data, dtype='<i2').reshape(-1, channels)
+    return audio, sample_rate
+
+
+def _resample_ratio(sample_rate: int, target_rate: int) -> Tuple[int, int]:
+    """Reduce target_rate / sample_rate to (up, down)."""
+    from math import gcd
+    
+    divisor = gcd(sample_rate, target_rate)
+    return target_rate // divisor, sample_rate // divisor
+
+
+class PolyphaseResampler:
+    """Streaming rational resampler (upsample by up, filter, keep every down-th)."""
+    
+    def __init__(self, up: int, down: int, zero_crossings: int = 16, rolloff: float = 0.945):
+        """
+        Design the anti-aliasing filter.
+        
+        Args:
+            up: Interpolation factor
+            down: Decimation factor
+            zero_crossings: Filter half-length in zero crossings of the
+                sinc; more is sharper and slower
+            rolloff: Cutoff as a fraction of the lower Nyquist frequency
+        """
+        self.up = up
+        self.down = down
+        
+        # Kaiser-windowed sinc at the upsampled rate, split into `up` phases
+        # so only the taps that meet nonzero input samples are computed
+        cutoff = rolloff * 0.5 / max(up, down)
+        taps = -(-(2 * zero_crossings * max(up, down) + 1) // up)
+        length = taps * up
+        # Odd-length core centred on a whole sample, so the delay is exact
+        delay = (length - 1) // 2
+        n = np.arange(2 * delay + 1) - delay
+        prototype = np.zeros(length)
+        prototype[:len(n)] = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(len(n), 8.6)
+        prototype *= up / prototype.sum()
+        # phases[p, j] weights input sample base - taps + 1 + j (oldest first)
+        self._phases = prototype.reshape(taps, up).T[:, ::-1].astype(np.float32)
+        self._taps = taps
+        self._delay = delay
+        self.reset()
+    
+    def reset(self):
+        """Forget the input history."""
+        self._history = np.zeros(self._taps - 1, dtype=np.float32)
+        self._offset = 1 - self._taps  # input index of _history[0]
+        self._seen = 0
+        self._produced = 0
+    
+    def process(self, samples: np.ndarray, final: bool = False) -> np.ndarray:
+        """
+        Resample the next block.
+        
+        Args:
+            samples: Mono float32 samples
+            final: Last block: also produce the output held back for the
+                filter delay, then reset
+        
+        Returns:
+            Resampled float32 samples
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        self._seen += len(samples)
+        if final:
+            samples = np.concatenate((samples, np.zeros(self._delay // self.up + 2,
+                                                        dtype=np.float32)))
+        buffer = np.concatenate((self._history, samples))
+        available = self._offset + len(buffer)
+        
+        if final:
+            end = -(-self._seen * self.up // self.down)
+        else:
+            # Outputs whose newest input sample has arrived
+            end = -(-(available * self.up - self._delay) // self.down)
+        outputs = np.arange(self._produced, max(end, self._produced))
+        
+        result = np.zeros(0, dtype=np.float32)
+        if len(outputs):
+            position = outputs * self.down + self._delay
+            base = position // self.up
+            windows = np.lib.stride_tricks.sliding_window_view(buffer, self._taps)
+            result = np.einsum('nk,nk->n', windows[base - (self._taps - 1) - self._offset],
+                               self._phases[position % self.up])
+        
+        if final:
+            self.reset()
+            return result
+        self._produced += len(outputs)
+        keep = (self._produced * self.down + self._delay) // self.up - (self._taps - 1)
+        self._history = buffer[keep - self._offset:].copy()
+        self._offset = keep
+        return result
+
+
+class AudioConverter:
+    """Block-by-block conversion of PCM to mono 16-bit at a target rate."""
+    
+    def __init__(self, sample_rate: int, target_rate: int = 16000, channels: int = 1,
+                 sample_width: int = 2, zero_crossings: int = 16):
+        """
+        Initialize the converter.
+        
+        Args:
+            sample_rate: Input sample rate in Hz
+            target_rate: Output sample rate in Hz (the recognizer's)
+            channels: Interleaved input channels, averaged into one
+            sample_width: Bytes per input sample: 1 (unsigned 8-bit), 2, 3
+                or 4 (signed little-endian PCM)
+            zero_crossings: Resampling filter length (see PolyphaseResampler)
+        """
+        if sample_width not in (1, 2, 3, 4):
+            raise ValueError(f"Unsupported sample width: {sample_width} bytes")
+        self.sample_rate = sample_rate
+        self.target_rate = target_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        
+        self.resampler = None
+        if sample_rate != target_rate:
+            up, down = _resample_ratio(sample_rate, target_rate)
+            self.resampler = PolyphaseResampler(up, down, zero_crossings)
+    
+    @property
+    def passthrough(self) -> bool:
+        """True when the input is already mono 16-bit at the target rate."""
+        return self.resampler is None and self.channels == 1 and self.sample_width == 2
+    
+    def convert(self, data: bytes, final: bool = False) -> np.ndarray:
+        """
+        Convert the next block of PCM frames.
+        
+        Args:
+            data: Raw interleaved PCM (whole frames) as bytes or any buffer,
+                e.g. a slice of a memory-mapped file
+            final: Last block (flushes the resampler)
+        
+        Returns:
+            int16 samples at the target rate; a view of data when no
+            conversion is needed
+        """
+        if self.passthrough:
+            return np.frombuffer(data, dtype='<i2')
+        
+        samples = self._to_float(data)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        if self.resampler is not None:
+            samples = self.resampler.process(samples, final=final)
+        return np.clip(np.rint(samples * 32768.0), -32768, 32767).astype('<i2')
+    
+    def flush(self) -> np.ndarray:
+        """
+        Get the resampler's held-back output after the last block.
+        
+        Returns:
+            Remaining int16 samples
+        """
+        return self.convert(b"", final=True)
+    
+    def _to_float(self, data: bytes) -> np.ndarray:
+        """Decode interleaved PCM to float32 in [-1, 1]."""
+        width = self.sample_width
+        if width == 1:
+            return (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        if width == 3:
+            # Place each 24-bit sample in the top bytes of an int32
+            packed = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+            wide = np.zeros((len(packed), 4), dtype=np.uint8)
+            wide[:, 1:] = packed
+            return wide.view('<i4').reshape(-1).astype(np.float32) / 2147483648.0
+        raw = np.frombuffer(data, dtype='<i2' if width == 2 else '<i4')
+        return raw.astype(np.float32) / float(2 ** (8 * width - 1))
+
+
+def wav_layout(f) -> Dict[str, int]:
+    """
+    Parse the RIFF header of a PCM WAV file.
+    
+    Args:
+        f: Binary file object positioned at the start of the file
+    
+    Returns:
+        Dictionary with 'channels', 'sample_rate', 'sample_width' and the
+        byte 'offset' and 'size' of the sample data
+    
+    Raises:
+        ValueError: If the file is not an uncompressed PCM WAV
+    """
+    import struct
+    
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        raise ValueError("Not a WAV file")
+    
+    layout = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            raise ValueError("WAV file has no data chunk")
+        chunk_id = chunk[:4]
+        size = struct.unpack('<I', chunk[4:])[0]
+        if chunk_id == b'fmt ':
+            fmt = f.read(size)
+            tag, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+            if tag == 0xFFFE and len(fmt) >= 26:
+                # WAVE_FORMAT_EXTENSIBLE: the real format is the subformat
+                tag = struct.unpack('<H', fmt[24:26])[0]
+            if tag != 1:
+                raise ValueError("WAV file must be uncompressed PCM")
+            layout = {'channels': channels, 'sample_rate': sample_rate,
+                      'sample_width': (bits + 7) // 8}
+            f.seek(size & 1, 1)
+        elif chunk_id == b'data':
+            if layout is None:
+                raise ValueError("WAV file has no format chunk")
+            layout['offset'] = f.tell()
+            # Interrupted recordings leave a placeholder size
+            available = os.fstat(f.fileno()).st_size - layout['offset']
+            layout['size'] = min(size, available)
+            return layout
+        else:
+            f.seek(size + (size & 1), 1)
+
+
+def stream_wav(file_path: str, target_rate: int = 16000, block_frames: int = 8000,
+               use_mmap: bool = True) -> Iterator[np.ndarray]:
+    """
+    Read a PCM WAV file as mono 16-bit blocks at a target rate.
+    
+    Any channel count, sample rate and 8/16/24/32-bit PCM are converted
+    block by block, so the whole file is never held in memory. The sample
+    data is memory-mapped: blocks that need no conversion are read-only
+    views of the mapping, so no bytes object is allocated per block.
+    
+    Args:
+        file_path: Path to WAV file
+        target_rate: Output sample rate in Hz
+        block_frames: Input frames per block; larger blocks mean fewer
+            calls into the recognizer
+        use_mmap: Map the file (reads are used when it can't be mapped)
+    
+    Yields:
+        int16 sample arrays (views valid while the file is being read)
+    """
+    import mmap
+    
+    with open(file_path, "rb") as f:
+        layout = wav_layout(f)
+        converter = AudioConverter(layout['sample_rate'], target_rate=target_rate,
+                                   channels=layout['channels'],
+                                   sample_width=layout['sample_width'])
+        frame_bytes = layout['channels'] * layout['sample_width']
+        block_bytes = max(1, block_frames) * frame_bytes
+        end = layout['offset'] + layout['size'] // frame_bytes * frame_bytes
+        
+        mapping = None
+        if use_mmap and end > layout['offset']:
+            try:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapping = None
+        
+        try:
+            f.seek(layout['offset'])
+            for start in range(layout['offset'], end, block_bytes):
+                count = min(block_bytes, end - start)
+                if mapping is not None:
+                    data = np.frombuffer(mapping, dtype=np.uint8, count=count, offset=start)
+                else:
+                    data = f.read(count)
+                block = converter.convert(data)
+                if len(block):
+                    yield block
+            if not converter.passthrough:
+                block = converter.flush()
+                if len(block):
+                    yield block
+        finally:
+            if mapping is not None:
+                data = block = None
+                try:
+                    mapping.close()
+                except BufferError:
+                    # The caller still holds a block; unmapped once it is freed
+                    pass
+
+
 def play_audio(audio_data: np.ndarray, sample_rate: int = 16000):
     """
     Play audio data.
@@ -64,6 +623,8 @@ def play_audio(audio_data: np.ndarray, sample_rate: int = 16000):
         audio_data: Audio data to play
         sample_rate: Sample rate in Hz
     """
+    import sounddevice as sd
+    
     print("Playing audio...")
     sd.play(audio_data, samplerate=sample_rate)
     sd.wait()
@@ -77,6 +638,7 @@ def check_microphone() -> bool:
         True if microphone is available
     """
     try:
+        import sounddevice as sd
         default_device = sd.default.device[0]
         if default_device is not None:
             info = sd.query_devices(default_device)
@@ -97,6 +659,8 @@ def get_audio_info() -> dict:
     Returns:
         Dictionary with audio device information
     """
+    import sounddevice as sd
+    
     info = {
         'default_input': sd.default.device[0],
         'default_output': sd.default.device[1],
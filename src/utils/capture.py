@@ -0,0 +1,247 @@
+"""
+Ring-buffer audio capture.
+Keeps the microphone stream open and writes every block into a
+preallocated int16 ring buffer, so listening for hours uses a fixed amount
+of memory. Samples are addressed by absolute position, which lets a
+recognition start a little before it was triggered (pre-roll) and lets the
+recognizer read audio as memoryviews of the buffer instead of copies.
+"""
+import threading
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-size circular buffer of samples indexed by absolute position."""
+
+    def __init__(self, capacity: int, dtype: str = 'int16'):
+        """
+        Allocate the buffer.
+
+        Args:
+            capacity: Samples kept (older ones are overwritten)
+            dtype: Sample format
+        """
+        self.capacity = max(1, int(capacity))
+        self._buffer = np.zeros(self.capacity, dtype=dtype)
+        # Byte view used by write(): memoryview slice assignment is a plain
+        # memcpy, cheaper than numpy indexing inside the audio callback
+        self._bytes = memoryview(self._buffer).cast('B')
+        self._itemsize = self._buffer.itemsize
+        self._written = 0
+
+    @property
+    def written(self) -> int:
+        """Total samples written so far (position of the next sample)."""
+        return self._written
+
+    @property
+    def oldest(self) -> int:
+        """Position of the oldest sample still in the buffer."""
+        return max(0, self._written - self.capacity)
+
+    def write(self, samples):
+        """
+        Append samples without allocating a buffer (at most two copies).
+
+        Args:
+            samples: Samples of the buffer's dtype, as an array (e.g. the
+                (frames, 1) block of a mono stream) or any buffer object
+        """
+        view = memoryview(samples)
+        if not view.c_contiguous:
+            view = memoryview(np.ascontiguousarray(samples))
+        data = view.cast('B')
+        size = self._itemsize
+        count = len(data) // size
+        if count == 0:
+            return
+        if count > self.capacity:
+            data = data[(count - self.capacity) * size:]
+        start = (self._written + count - len(data) // size) % self.capacity * size
+        first = min(len(data), len(self._bytes) - start)
+        self._bytes[start:start + first] = data[:first]
+        if first < len(data):
+            self._bytes[:len(data) - first] = data[first:]
+        # Published after the copy so readers never see unwritten samples
+        self._written += count
+
+    def chunks(self, start: int, end: Optional[int] = None,
+               chunk_samples: Optional[int] = None) -> Iterator[memoryview]:
+        """
+        Read a range as byte memoryviews of the buffer (no copies).
+
+        The views alias the buffer: use them before the writer laps them
+        (capacity samples later).
+
+        Args:
+            start: First position (clipped to the oldest sample kept)
+            end: Position after the last sample (defaults to written)
+            chunk_samples: Maximum samples per view (views also split where
+                the buffer wraps around)
+
+        Yields:
+            Byte memoryviews covering [start, end) in order
+        """
+        end = self._written if end is None else min(end, self._written)
+        position = max(start, self.oldest)
+        size = self._itemsize
+        while position < end:
+            index = position % self.capacity
+            length = min(end - position, self.capacity - index)
+            if chunk_samples:
+                length = min(length, chunk_samples)
+            yield self._bytes[index * size:(index + length) * size]
+            position += length
+
+    def view(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """
+        Get a range as an array.
+
+        Args:
+            start: First position (clipped to the oldest sample kept)
+            end: Position after the last sample (defaults to written)
+
+        Returns:
+            A view of the buffer, or a copy if the range wraps around
+        """
+        end = self._written if end is None else min(end, self._written)
+        start = min(max(start, self.oldest), end)
+        first = start % self.capacity
+        if first + (end - start) <= self.capacity:
+            return self._buffer[first:first + end - start]
+        return np.concatenate((self._buffer[first:],
+                               self._buffer[:end - start - (self.capacity - first)]))
+
+
+class AudioCapture:
+    """Microphone input stream writing into a RingBuffer."""
+
+    def __init__(self, sample_rate: int = 16000, block_size: int = 1600,
+                 buffer_seconds: float = 30.0, preroll: float = 0.3,
+                 device: Optional[int] = None):
+        """
+        Initialize the capture (the stream opens on start()).
+
+        Args:
+            sample_rate: Sample rate in Hz
+            block_size: Samples per stream callback
+            buffer_seconds: Audio kept in the ring buffer; bounds the longest
+                recording and how far a reader may fall behind
+            preroll: Seconds of audio before mark() included in a recording,
+                so speech that started before the trigger isn't clipped
+            device: Input device index (None uses the default)
+        """
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.preroll = preroll
+        self.device = device
+        self.ring = RingBuffer(int(sample_rate * buffer_seconds))
+        self.overflows = 0
+
+        self._stream = None
+        self._condition = threading.Condition()
+        self._waiters = 0
+
+    @property
+    def running(self) -> bool:
+        """True while the input stream is open."""
+        return self._stream is not None
+
+    @property
+    def position(self) -> int:
+        """Absolute position of the next captured sample."""
+        return self.ring.written
+
+    @property
+    def capacity_seconds(self) -> float:
+        """Seconds of audio the ring buffer holds."""
+        return self.ring.capacity / self.sample_rate
+
+    def start(self):
+        """Open the input stream (no-op if already running)."""
+        if self._stream is not None:
+            return
+        import sounddevice as sd
+
+        stream = sd.InputStream(samplerate=self.sample_rate, blocksize=self.block_size,
+                                channels=1, dtype='int16', device=self.device,
+                                callback=self._callback)
+        try:
+            stream.start()
+        except Exception:
+            stream.close()
+            raise
+        self._stream = stream
+
+    def stop(self):
+        """Close the input stream and wake up readers."""
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
+        with self._condition:
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def mark(self, preroll: Optional[float] = None) -> int:
+        """
+        Position where a recording triggered now should start.
+
+        Args:
+            preroll: Seconds before now to include (defaults to self.preroll)
+
+        Returns:
+            Absolute position, never older than the buffer
+        """
+        if preroll is None:
+            preroll = self.preroll
+        return max(self.ring.oldest, self.ring.written - int(self.sample_rate * preroll))
+
+    def wait(self, position: int, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until audio past a position has been captured.
+
+        Args:
+            position: Absolute position
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if samples at or after position are available
+        """
+        with self._condition:
+            self._waiters += 1
+            try:
+                return self._condition.wait_for(
+                    lambda: self.ring.written > position or self._stream is None, timeout
+                ) and self.ring.written > position
+            finally:
+                self._waiters -= 1
+
+    def chunks(self, start: int, end: Optional[int] = None,
+               chunk_samples: Optional[int] = None) -> Iterator[memoryview]:
+        """Byte memoryviews of captured audio (see RingBuffer.chunks)."""
+        return self.ring.chunks(start, end, chunk_samples)
+
+    def view(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """Captured audio as an int16 array (see RingBuffer.view)."""
+        return self.ring.view(start, end)
+
+    def _callback(self, indata, frames, time_info, status):
+        """Sounddevice callback: copy the block into the ring and wake readers."""
+        if status:
+            self.overflows += 1
+        self.ring.write(indata)
+        # Waiters register under the lock before checking the position, so
+        # skipping the lock when nobody waits cannot miss a wake-up
+        if self._waiters:
+            with self._condition:
+                self._condition.notify_all()
@@ -0,0 +1,221 @@
+"""
+Latency instrumentation.
+Times pipeline stages with the monotonic perf_counter clock, keeps rolling
+histograms per stage and exports JSON snapshots or forwards every
+measurement to user-supplied hooks.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List
+
+
+class RollingHistogram:
+    """Fixed-size window of recent values with percentile summaries."""
+
+    __slots__ = ('values', 'count')
+
+    def __init__(self, window: int = 1000):
+        self.values = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value: float):
+        """Record a value (O(1); percentiles are computed on demand)."""
+        self.values.append(value)
+        self.count += 1
+
+    def summary(self, scale: float = 1.0) -> Dict[str, float]:
+        """
+        Summarize the window.
+
+        Args:
+            scale: Factor applied to every reported value (e.g. 1000 for ms)
+
+        Returns:
+            Dictionary with count (all time), mean, p50, p95, p99 and max
+            (over the window)
+        """
+        ordered = sorted(self.values)
+        if not ordered:
+            return {'count': self.count, 'mean': 0.0, 'p50': 0.0,
+                    'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+        def pct(p):
+            index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+            return ordered[index] * scale
+
+        return {
+            'count': self.count,
+            'mean': sum(ordered) / len(ordered) * scale,
+            'p50': pct(50),
+            'p95': pct(95),
+            'p99': pct(99),
+            'max': ordered[-1] * scale
+        }
+
+
+class Span:
+    """Times one stage; use through Metrics.span()."""
+
+    __slots__ = ('metrics', 'stage', 'start', 'elapsed')
+
+    def __init__(self, metrics: 'Metrics', stage: str):
+        self.metrics = metrics
+        self.stage = stage
+        self.start = 0.0
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        self.metrics.record(self.stage, self.elapsed)
+        return False
+
+
+class _NullSpan:
+    """Span used when metrics are disabled."""
+
+    __slots__ = ()
+    elapsed = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """Per-stage latency and real-time-factor collector."""
+
+    def __init__(self, enabled: bool = True, window: int = 1000):
+        """
+        Initialize the collector.
+
+        Args:
+            enabled: When False, spans and records are no-ops
+            window: Number of recent values kept per histogram
+        """
+        self.enabled = enabled
+        self.window = window
+        self._latencies: Dict[str, RollingHistogram] = {}
+        self._ratios: Dict[str, RollingHistogram] = {}
+        self._hooks: List[Callable[[str, float], None]] = []
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def span(self, stage: str):
+        """
+        Time a block of code as one stage.
+
+        Args:
+            stage: Stage name (e.g. 'asr', 'nlu', 'action', 'tts')
+
+        Returns:
+            Context manager; its 'elapsed' attribute holds the duration
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, stage)
+
+    def record(self, stage: str, seconds: float):
+        """
+        Record a stage latency.
+
+        Args:
+            stage: Stage name
+            seconds: Duration in seconds
+        """
+        if not self.enabled:
+            return
+        self._add(self._latencies, stage, seconds)
+
+    def record_rtf(self, processing_seconds: float, audio_seconds: float, name: str = 'asr'):
+        """
+        Record a real-time factor (processing time / audio duration).
+
+        Args:
+            processing_seconds: Time spent decoding
+            audio_seconds: Duration of the decoded audio
+            name: Ratio name
+        """
+        if not self.enabled or audio_seconds <= 0:
+            return
+        self._add(self._ratios, f"{name}_rtf", processing_seconds / audio_seconds)
+
+    def _add(self, table: Dict[str, RollingHistogram], name: str, value: float):
+        with self._lock:
+            histogram = table.get(name)
+            if histogram is None:
+                histogram = table[name] = RollingHistogram(self.window)
+            histogram.add(value)
+        for hook in self._hooks:
+            try:
+                hook(name, value)
+            except Exception as e:
+                print(f"Warning: Metrics hook failed: {e}")
+
+    def add_hook(self, hook: Callable[[str, float], None]):
+        """
+        Forward every measurement to an exporter.
+
+        Hooks run synchronously on the measuring thread and should be cheap
+        (e.g. push to a queue or increment a counter).
+
+        Args:
+            hook: Callable receiving (name, value); latencies are in seconds,
+                ratios are named '<name>_rtf'
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[str, float], None]):
+        """Stop forwarding measurements to a hook."""
+        self._hooks.remove(hook)
+
+    def reset(self):
+        """Drop all recorded values."""
+        with self._lock:
+            self._latencies.clear()
+            self._ratios.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Summarize everything recorded.
+
+        Returns:
+            JSON-serializable dictionary with per-stage latency summaries in
+            milliseconds and real-time-factor summaries
+        """
+        with self._lock:
+            latencies = {name: h.summary(scale=1000.0) for name, h in self._latencies.items()}
+            ratios = {name: h.summary() for name, h in self._ratios.items()}
+        return {
+            'enabled': self.enabled,
+            'timestamp': time.time(),
+            'uptime': time.time() - self._started,
+            'latency_ms': latencies,
+            'ratios': ratios
+        }
+
+    def write_snapshot(self, path: str):
+        """
+        Write the snapshot to a JSON file atomically.
+
+        Args:
+            path: Output file path
+        """
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Warning: Could not write metrics snapshot: {e}")
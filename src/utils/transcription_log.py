@@ -0,0 +1,230 @@
+"""
+Structured transcription log.
+Queues one record per recognized command and writes them as JSON lines on a
+background thread, in batches flushed by count or age. The file is rotated
+by size and old files are gzip-compressed, so the voice path never waits on
+disk I/O.
+"""
+import atexit
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class TranscriptionLog:
+    """Buffered, rotating JSONL writer running on its own thread."""
+
+    def __init__(self, path: str, max_bytes: int = 5 * 1024 * 1024, backups: int = 5,
+                 flush_records: int = 64, flush_interval: float = 1.0,
+                 max_pending: int = 10000, compress: bool = True):
+        """
+        Start the writer.
+
+        Args:
+            path: JSONL file path (its directory is created if needed)
+            max_bytes: Rotate the file once it reaches this size (0 never rotates)
+            backups: Rotated files kept as path.1(.gz) ... path.N(.gz)
+            flush_records: Write as soon as this many records are queued
+            flush_interval: Write queued records at most this many seconds
+                after the first one was queued
+            max_pending: Records held in memory while the disk is slow; the
+                oldest are dropped beyond this
+            compress: Gzip rotated files
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_records = max(1, flush_records)
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, max_pending)
+        self.compress = compress
+        self.dropped = 0
+        # Records that could not be serialized (skipped by the writer)
+        self.invalid = 0
+
+        self._pending: deque = deque()
+        self._first_pending = 0.0
+        self._queued = 0
+        self._done = 0
+        self._flush_requested = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._file = None
+
+        self._thread = threading.Thread(target=self._run, name="transcription-log", daemon=True)
+        self._thread.start()
+        # Interpreter exit still drains the queue if close() was never called
+        atexit.register(self.close)
+
+    @property
+    def pending(self) -> int:
+        """Number of records waiting to be written."""
+        with self._condition:
+            return len(self._pending)
+
+    def log(self, text: str, intent: Optional[str] = None, confidence: Optional[float] = None,
+            latencies: Optional[Dict[str, float]] = None, **fields) -> bool:
+        """
+        Queue a transcription record (never touches the disk).
+
+        Args:
+            text: Recognized text
+            intent: Matched intent name
+            confidence: Intent confidence
+            latencies: Stage latencies in seconds (e.g. {'asr': 0.8, 'nlu': 0.001})
+            **fields: Extra JSON-serializable fields stored with the record
+
+        Returns:
+            True if queued, False if the log is closed
+        """
+        record = {'timestamp': time.time(), 'text': text, 'intent': intent,
+                  'confidence': confidence, 'latency_ms': latencies or {}}
+        if fields:
+            record.update(fields)
+
+        with self._condition:
+            if self._closed:
+                return False
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self.dropped += 1
+                self._done += 1
+            if not self._pending:
+                self._first_pending = time.monotonic()
+            self._pending.append(record)
+            self._queued += 1
+            # Wake the writer to start the age timer or to write a full batch
+            if len(self._pending) == 1 or len(self._pending) >= self.flush_records:
+                self._condition.notify_all()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write everything queued so far.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            True if the queued records were written
+        """
+        with self._condition:
+            target = self._queued
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: self._done >= target, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Write the remaining records and stop the writer.
+
+        Args:
+            timeout: Maximum seconds to wait for the writer (None waits forever)
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._wait_for_batch()
+                batch = list(self._pending)
+                self._pending.clear()
+                self._flush_requested = False
+                closed = self._closed
+
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    # Never let one bad batch stop the writer
+                    print(f"Warning: Could not write transcription log: {e}")
+
+            with self._condition:
+                self._done += len(batch)
+                self._condition.notify_all()
+
+            # log() refuses records once closed, so this batch was the last
+            if closed:
+                break
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _wait_for_batch(self):
+        """Block (holding the condition) until a batch is due."""
+        while not (self._closed or self._flush_requested
+                   or len(self._pending) >= self.flush_records):
+            if not self._pending:
+                self._condition.wait()
+                continue
+            remaining = self._first_pending + self.flush_interval - time.monotonic()
+            if remaining <= 0:
+                return
+            self._condition.wait(remaining)
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        lines = []
+        for record in batch:
+            try:
+                record['timestamp'] = datetime.fromtimestamp(
+                    record['timestamp']).isoformat(timespec='milliseconds')
+                record['latency_ms'] = {stage: round(seconds * 1000.0, 3)
+                                        for stage, seconds in record['latency_ms'].items()}
+                lines.append(json.dumps(record, ensure_ascii=False))
+            except (TypeError, ValueError) as e:
+                self.invalid += 1
+                print(f"Warning: Skipping transcription log record: {e}")
+        if not lines:
+            return
+        lines.append('')
+
+        try:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write('\n'.join(lines))
+            self._file.flush()
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except Exception as e:
+            print(f"Warning: Could not write transcription log: {e}")
+
+    def _rotate(self):
+        """Shift path.N backups up by one and move the current file to path.1."""
+        self._file.close()
+        self._file = None
+
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+
+        suffix = '.gz' if self.compress else ''
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}{suffix}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}{suffix}")
+
+        target = f"{self.path}.1{suffix}"
+        if self.compress:
+            temp_path = f"{target}.tmp"
+            with open(self.path, 'rb') as src, gzip.open(temp_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(temp_path, target)
+            os.remove(self.path)
+        else:
+            os.replace(self.path, target)
@@ -1,15 +1,20 @@
 """
 Tests for actions module.
 """
+import asyncio
 import pytest
 import sys
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from executor.actions import execute, get_system_status, list_available_intents
+from executor.actions import (execute, get_system_status, list_available_intents,
+                              register_action, unregister_action)
+from executor.registry import ActionRegistry
 
 
 class TestActions:
@@ -82,6 +87,71 @@ class TestActions:
         assert isinstance(response, str)
 
 
+
+class TestActionRegistry:
+    """Test cases for the action registry."""
+    
+    def test_register_plugin_action(self):
+        """Test plugin actions are dispatched and listed."""
+        try:
+            register_action('abrir_puerta', lambda data: f"Abriendo: {data['raw_text']}")
+            assert execute({'intent': 'abrir_puerta', 'raw_text': 'abre'}) == "Abriendo: abre"
+            assert 'abrir_puerta' in list_available_intents()
+        finally:
+            unregister_action('abrir_puerta')
+        assert 'abrir_puerta' not in list_available_intents()
+        assert execute({'intent': 'abrir_puerta', 'raw_text': 'abre'}) == \
+            "Lo siento, no pude procesar tu solicitud."
+    
+    def test_sync_action_timeout(self):
+        """Test a slow action answers with its fallback without waiting."""
+        registry = ActionRegistry()
+        release = threading.Event()
+        registry.register('lento', lambda data: release.wait(5) and "tarde",
+                          timeout=0.05, fallback="Sigo en ello")
+        start = time.perf_counter()
+        assert registry.execute({'intent': 'lento'}) == "Sigo en ello"
+        assert time.perf_counter() - start < 1.0
+        release.set()
+        registry.shutdown()
+    
+    def test_async_actions(self):
+        """Test coroutine actions run on the loop and are cancelled on timeout."""
+        registry = ActionRegistry()
+        cancelled = threading.Event()
+        
+        async def quick(data):
+            await asyncio.sleep(0)
+            return "rápido"
+        
+        async def slow(data):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        registry.register('rapido', quick)
+        registry.register('lento', slow, timeout=0.05)
+        assert registry.execute({'intent': 'rapido'}) == "rápido"
+        assert registry.execute({'intent': 'lento'}) == registry.timeout_response
+        assert cancelled.wait(1)
+        registry.shutdown()
+    
+    def test_failing_action(self):
+        """Test an action that raises answers with the default response."""
+        registry = ActionRegistry()
+        
+        def broken(data):
+            raise RuntimeError("sin conexión")
+        
+        registry.register('inline', broken)
+        registry.register('pooled', broken, timeout=1.0)
+        assert registry.execute({'intent': 'inline'}) == registry.default_response
+        assert registry.execute({'intent': 'pooled'}) == registry.default_response
+        registry.shutdown()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
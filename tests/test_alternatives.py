@@ -0,0 +1,66 @@
+"""
+Tests for N-best ASR alternatives.
+"""
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from asr.alternatives import Transcript, combine_alternatives, parse_alternatives
+
+
+def alternatives_json(*hypotheses):
+    """Vosk Result() JSON with alternatives."""
+    return json.dumps({'alternatives': [{'text': text, 'confidence': confidence}
+                                        for text, confidence in hypotheses]})
+
+
+class TestAlternatives:
+    """Test cases for N-best parsing and combination."""
+
+    def test_parse_alternatives(self):
+        """Test ranked hypotheses keep their order and drop empty ones."""
+        result = json.loads(alternatives_json(("apaga la lus", 210.5),
+                                              ("apaga la luz", 200.0), ("", 10.0)))
+        assert parse_alternatives(result) == [
+            {'text': "apaga la lus", 'confidence': 210.5},
+            {'text': "apaga la luz", 'confidence': 200.0},
+        ]
+
+    def test_parse_single_result(self):
+        """Test results without alternatives use the mean word confidence."""
+        result = {'text': "hola mundo", 'result': [{'word': 'hola', 'conf': 1.0},
+                                                  {'word': 'mundo', 'conf': 0.5}]}
+        assert parse_alternatives(result) == [{'text': "hola mundo", 'confidence': 0.75}]
+        assert parse_alternatives({'text': ""}) == []
+
+    def test_combine_segments(self):
+        """Test multi-segment hypotheses swap one segment at a time."""
+        segments = [
+            [{'text': "oye", 'confidence': 100.0}, {'text': "hoy", 'confidence': 95.0}],
+            [{'text': "apaga la lus", 'confidence': 200.0},
+             {'text': "apaga la luz", 'confidence': 198.0}],
+        ]
+        hypotheses = combine_alternatives(segments, limit=3)
+        assert [h['text'] for h in hypotheses] == [
+            "oye apaga la lus", "oye apaga la luz", "hoy apaga la lus"
+        ]
+        assert hypotheses[0]['confidence'] == 300.0
+        assert len(combine_alternatives(segments, limit=1)) == 1
+
+    def test_transcript(self):
+        """Test a transcript joins the best text of every segment."""
+        transcript = Transcript()
+        assert transcript.add(alternatives_json(("oye", 50.0))) == "oye"
+        assert transcript.add(json.dumps({'text': ""})) == ""
+        transcript.add(alternatives_json(("apaga la lus", 20.0), ("apaga la luz", 19.0)))
+        assert transcript.text == "oye apaga la lus"
+        assert transcript.alternatives(2)[1]['text'] == "oye apaga la luz"
+        assert Transcript().alternatives(3) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,263 @@
+"""
+Tests for audio utilities (voice activity detection).
+"""
+import pytest
+import sys
+from pathlib import Path
+
+np = pytest.importorskip("numpy")
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from utils.audio import (
+    AudioConverter, detect_voice_activity, stream_wav, trim_silence, VoiceActivityDetector,
+    wav_layout
+)
+from utils.capture import AudioCapture, RingBuffer
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds: float, amplitude: float = 0.3) -> np.ndarray:
+    """Generate a 220 Hz tone as int16."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (amplitude * 32767 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def silence(seconds: float) -> np.ndarray:
+    """Generate digital silence as int16."""
+    return np.zeros(int(SAMPLE_RATE * seconds), dtype=np.int16)
+
+
+class TestVoiceActivity:
+    """Test cases for VAD and endpointing."""
+    
+    def test_detects_speech_frames(self):
+        """Test that loud frames are speech and silent frames are not."""
+        audio = np.concatenate([silence(0.3), tone(0.3), silence(0.3)])
+        speech = detect_voice_activity(audio, SAMPLE_RATE, frame_ms=30)
+        assert not speech[:9].any()
+        assert speech[11:19].all()
+        assert not speech[-9:].any()
+    
+    def test_trim_silence(self):
+        """Test leading and trailing silence is removed."""
+        audio = np.concatenate([silence(1.0), tone(0.5), silence(1.0)])
+        trimmed = trim_silence(audio, SAMPLE_RATE, padding_ms=0)
+        assert abs(len(trimmed) - int(0.5 * SAMPLE_RATE)) < 0.06 * SAMPLE_RATE
+    
+    def test_trim_all_silence(self):
+        """Test trimming pure silence returns an empty array."""
+        assert len(trim_silence(silence(1.0), SAMPLE_RATE)) == 0
+    
+    def test_endpoint_after_hangover(self):
+        """Test the detector ends the utterance after the hangover."""
+        vad = VoiceActivityDetector(sample_rate=SAMPLE_RATE, hangover=0.3)
+        assert not vad.process(silence(0.5))
+        assert not vad.process(tone(0.5))
+        assert vad.speech_started
+        assert not vad.process(silence(0.1))
+        assert vad.process(silence(0.3))
+    
+    def test_no_endpoint_without_speech(self):
+        """Test silence alone never ends the utterance."""
+        vad = VoiceActivityDetector(sample_rate=SAMPLE_RATE, hangover=0.3)
+        for _ in range(20):
+            assert not vad.process(silence(0.1))
+        assert not vad.speech_started
+
+
+
+class TestRingBuffer:
+    """Test cases for the capture ring buffer."""
+    
+    def test_wraps_around(self):
+        """Test positions stay absolute after the buffer wraps."""
+        ring = RingBuffer(10)
+        ring.write(np.arange(7, dtype=np.int16))
+        ring.write(np.arange(7, 14, dtype=np.int16))
+        assert ring.written == 14
+        assert ring.oldest == 4
+        assert list(ring.view(4)) == list(range(4, 14))
+        assert list(ring.view(0, 6)) == [4, 5]
+    
+    def test_oversized_write_keeps_newest(self):
+        """Test a write larger than the buffer keeps its last samples."""
+        ring = RingBuffer(4)
+        ring.write(np.arange(3, dtype=np.int16))
+        ring.write(np.arange(10, dtype=np.int16))
+        assert ring.written == 13
+        assert list(ring.view(0)) == [6, 7, 8, 9]
+    
+    def test_chunks_are_views(self):
+        """Test chunks are byte views of the buffer, split at the wrap."""
+        ring = RingBuffer(8)
+        ring.write(np.arange(6, dtype=np.int16))
+        ring.write(np.arange(6, 11, dtype=np.int16))
+        chunks = list(ring.chunks(4, chunk_samples=3))
+        assert [len(chunk) for chunk in chunks] == [6, 2, 6]
+        samples = np.frombuffer(b''.join(chunks), dtype=np.int16)
+        assert list(samples) == list(range(4, 11))
+        assert np.shares_memory(np.frombuffer(chunks[0], dtype=np.int16), ring._buffer)
+        assert ring.view(3, 7).base is ring._buffer
+
+
+class TestAudioCapture:
+    """Test cases for ring-buffer capture (fed without an audio device)."""
+    
+    def test_preroll_and_flat_memory(self):
+        """Test mark() reaches back by the pre-roll and memory stays bounded."""
+        capture = AudioCapture(sample_rate=SAMPLE_RATE, buffer_seconds=2.0, preroll=0.25)
+        block = tone(0.1).reshape(-1, 1)
+        for _ in range(600):
+            capture._callback(block, len(block), None, None)
+        assert capture.position == 600 * len(block)
+        assert capture.ring._buffer.nbytes == 2 * SAMPLE_RATE * 2
+        assert capture.position - capture.mark() == int(0.25 * SAMPLE_RATE)
+        assert capture.mark(preroll=10.0) == capture.ring.oldest
+    
+    def test_wait_for_audio(self):
+        """Test readers are woken by the callback."""
+        capture = AudioCapture(sample_rate=SAMPLE_RATE)
+        assert not capture.wait(0, timeout=0.01)
+        capture._callback(silence(0.1).reshape(-1, 1), 1600, None, None)
+        assert capture.wait(0, timeout=0.01)
+        assert len(capture.view(0)) == 1600
+
+
+
+def sine(sample_rate: int, seconds: float, frequency: float = 1000.0) -> np.ndarray:
+    """Generate a half-scale sine as float."""
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return 0.5 * np.sin(2 * np.pi * frequency * t)
+
+
+class TestAudioConverter:
+    """Test cases for down-mix, resampling and sample format conversion."""
+    
+    @pytest.mark.parametrize("rate", [8000, 22050, 44100, 48000])
+    def test_resample_stereo(self, rate):
+        """Test a stereo tone comes out mono at 16 kHz, in phase and in level."""
+        wave = sine(rate, 1.0)
+        data = (np.stack([wave, wave], axis=1) * 32767).astype('<i2').tobytes()
+        converter = AudioConverter(rate, target_rate=SAMPLE_RATE, channels=2)
+        blocks = [converter.convert(data[i:i + 4000]) for i in range(0, len(data), 4000)]
+        out = np.concatenate(blocks + [converter.flush()])
+        assert len(out) == SAMPLE_RATE
+        expected = sine(SAMPLE_RATE, 1.0) * 32768
+        assert np.abs(out[100:-100] - expected[100:-100]).max() < 8
+    
+    def test_block_size_does_not_matter(self):
+        """Test streaming output equals converting the file in one go."""
+        data = (sine(44100, 0.5) * 32767).astype('<i2').tobytes()
+        whole = AudioConverter(44100)
+        expected = np.concatenate([whole.convert(data), whole.flush()])
+        streamed = AudioConverter(44100)
+        blocks = [streamed.convert(data[i:i + 302]) for i in range(0, len(data), 302)]
+        assert np.array_equal(np.concatenate(blocks + [streamed.flush()]), expected)
+    
+    def test_removes_aliases(self):
+        """Test content above the new Nyquist frequency is filtered out."""
+        data = (sine(48000, 0.5, frequency=12000) * 32767).astype('<i2').tobytes()
+        converter = AudioConverter(48000)
+        out = np.concatenate([converter.convert(data), converter.flush()])
+        assert np.abs(out[100:-100]).max() < 50
+    
+    @pytest.mark.parametrize("width", [1, 3, 4])
+    def test_sample_formats(self, width):
+        """Test 8, 24 and 32-bit PCM decode to the same 16-bit samples."""
+        wave = sine(SAMPLE_RATE, 0.1)
+        if width == 1:
+            data = np.round(wave * 127 + 128).astype(np.uint8).tobytes()
+        else:
+            scaled = np.round(wave * 2 ** (8 * width - 1)).astype('<i4')
+            data = scaled.tobytes() if width == 4 else \
+                scaled.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+        out = AudioConverter(SAMPLE_RATE, sample_width=width).convert(data)
+        tolerance = 260 if width == 1 else 1
+        assert np.abs(out - wave * 32768).max() <= tolerance
+    
+    def test_passthrough_is_a_view(self):
+        """Test model-format audio is not copied."""
+        data = tone(0.1).tobytes()
+        converter = AudioConverter(SAMPLE_RATE)
+        out = converter.convert(data)
+        assert converter.passthrough
+        assert not out.flags.owndata and np.array_equal(out, tone(0.1))
+    
+    def test_stream_wav(self, tmp_path):
+        """Test a 48 kHz stereo WAV is read as 16 kHz mono blocks."""
+        import wave as wavefile
+        
+        path = str(tmp_path / "stereo.wav")
+        samples = (sine(48000, 1.5) * 32767).astype('<i2')
+        with wavefile.open(path, "wb") as wf:
+            wf.setnchannels(2)
+            wf.setsampwidth(2)
+            wf.setframerate(48000)
+            wf.writeframes(np.repeat(samples, 2).tobytes())
+        blocks = list(stream_wav(path, target_rate=SAMPLE_RATE, block_frames=8000))
+        assert all(block.dtype == np.int16 for block in blocks)
+        assert sum(len(block) for block in blocks) == int(1.5 * SAMPLE_RATE)
+
+
+def riff(chunks) -> bytes:
+    """Assemble a RIFF/WAVE file from (id, payload) chunks."""
+    import struct
+    
+    body = b"WAVE"
+    for chunk_id, payload in chunks:
+        body += chunk_id + struct.pack('<I', len(payload)) + payload
+        body += b"\0" * (len(payload) & 1)
+    return b"RIFF" + struct.pack('<I', len(body)) + body
+
+
+class TestMappedWav:
+    """Test cases for the memory-mapped WAV reader."""
+    
+    def test_mapped_blocks_are_views(self, tmp_path):
+        """Test model-format files are read without copies, in chunks of the size asked."""
+        import struct
+        
+        samples = tone(1.0)
+        fmt = struct.pack('<HHIIHH', 1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16)
+        path = tmp_path / "mono.wav"
+        path.write_bytes(riff([(b"fmt ", fmt), (b"LIST", b"odd"), (b"data", samples.tobytes())]))
+        
+        blocks = list(stream_wav(str(path), block_frames=5000))
+        assert [len(block) for block in blocks] == [5000, 5000, 5000, 1000]
+        assert all(isinstance(block.base, np.ndarray) and not block.flags.writeable
+                   for block in blocks)
+        assert np.array_equal(np.concatenate(blocks), samples)
+        read = list(stream_wav(str(path), block_frames=5000, use_mmap=False))
+        assert np.array_equal(np.concatenate(read), samples)
+    
+    def test_layout(self, tmp_path):
+        """Test extensible headers, truncated data and compressed files."""
+        import struct
+        
+        extensible = struct.pack('<HHIIHHHHIH14s', 0xFFFE, 2, 48000, 48000 * 6, 6, 24,
+                                 22, 24, 3, 1, b"\0" * 14)
+        path = tmp_path / "extensible.wav"
+        path.write_bytes(riff([(b"fmt ", extensible), (b"data", b"")]) + b"\0" * 600)
+        with open(path, "rb") as f:
+            layout = wav_layout(f)
+        assert (layout['channels'], layout['sample_rate'], layout['sample_width']) == (2, 48000, 3)
+        assert layout['size'] == 0
+        
+        # A recorder that died before writing the data size
+        data = bytearray(path.read_bytes())
+        data[64:68] = struct.pack('<I', 0xFFFFFFFF)
+        path.write_bytes(bytes(data))
+        with open(path, "rb") as f:
+            assert wav_layout(f)['size'] == 600
+        
+        float_fmt = struct.pack('<HHIIHH', 3, 1, SAMPLE_RATE, SAMPLE_RATE * 4, 4, 32)
+        path.write_bytes(riff([(b"fmt ", float_fmt), (b"data", b"\0" * 8)]))
+        with pytest.raises(ValueError):
+            list(stream_wav(str(path)))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,97 @@
+"""
+Tests for batch transcription.
+"""
+import json
+import pytest
+import sys
+import wave
+from pathlib import Path
+
+np = pytest.importorskip("numpy")
+vosk = pytest.importorskip("vosk")
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from asr.batch import find_wav_files, transcribe_file
+
+
+class FakeRecognizer:
+    """KaldiRecognizer stand-in ending a segment every second of audio."""
+
+    instances = []
+
+    def __init__(self, model, sample_rate):
+        self.sample_rate = sample_rate
+        self.received = 0
+        self._pending = 0
+        self.instances.append(self)
+
+    def AcceptWaveform(self, data):
+        self.received += len(data)
+        self._pending += len(data)
+        if self._pending >= 2 * self.sample_rate:
+            self._pending = 0
+            return True
+        return False
+
+    def Result(self):
+        return json.dumps({'text': "enciende la luz"})
+
+    def FinalResult(self):
+        return json.dumps({'text': "por favor" if self._pending else ""})
+
+
+def write_wav(path, sample_rate, channels, seconds):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    samples = (8000 * np.sin(2 * np.pi * 300 * t)).astype('<i2')
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(np.repeat(samples, channels).tobytes())
+
+
+class TestBatch:
+    """Test cases for transcribe_file."""
+
+    def test_stereo_48k_file(self, tmp_path, monkeypatch):
+        """Test a 48 kHz stereo recording is converted to the model format."""
+        monkeypatch.setattr(vosk, "KaldiRecognizer", FakeRecognizer)
+        path = tmp_path / "archivo.wav"
+        write_wav(path, 48000, 2, 2.5)
+
+        record = transcribe_file(model=None, file_path=str(path))
+
+        assert record['error'] is None
+        assert record['text'] == "enciende la luz enciende la luz por favor"
+        assert record['duration'] == pytest.approx(2.5)
+        recognizer = FakeRecognizer.instances[-1]
+        assert recognizer.sample_rate == 16000
+        assert recognizer.received == int(2.5 * 16000) * 2
+
+    def test_compressed_file_is_reported(self, tmp_path, monkeypatch):
+        """Test files that are not PCM WAV give an error record."""
+        monkeypatch.setattr(vosk, "KaldiRecognizer", FakeRecognizer)
+        path = tmp_path / "audio.wav"
+        path.write_bytes(b"ID3 not a wav file")
+
+        record = transcribe_file(model=None, file_path=str(path))
+
+        assert record['text'] is None
+        assert "WAV" in record['error']
+
+    def test_find_wav_files_ignores_case(self, tmp_path):
+        """Test recordings with upper-case extensions are found."""
+        (tmp_path / "sub").mkdir()
+        for name in ("a.wav", "B.WAV", "sub/c.Wav", "notes.txt", "wav"):
+            (tmp_path / name).write_bytes(b"")
+
+        found = [Path(path).relative_to(tmp_path).as_posix()
+                 for path in find_wav_files(str(tmp_path))]
+        assert found == ["B.WAV", "a.wav", "sub/c.Wav"]
+        assert len(find_wav_files(str(tmp_path), recursive=False)) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
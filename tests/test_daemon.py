@@ -0,0 +1,146 @@
+"""
+Tests for the recognizer daemon and its client.
+"""
+import json
+import os
+import pytest
+import socket
+import stat
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from main import VoiceRecognizer
+from server.client import DaemonClient
+from server.daemon import MAX_FRAME_BYTES, RecognizerDaemon, default_socket_path
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'),
+                                reason="Unix domain sockets not available")
+
+
+class FakeASR:
+    """Stand-in for VoskASR that counts the PCM bytes it receives."""
+    
+    sample_rate = 16000
+    
+    def recognize_pcm(self, chunks):
+        total = sum(len(chunk) for chunk in chunks)
+        return f"{total} bytes"
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """Run a daemon on a temporary socket."""
+    recognizer = VoiceRecognizer(text_only=True)
+    recognizer._asr = FakeASR()
+    server = RecognizerDaemon(recognizer, socket_path=str(tmp_path / "vr.sock"))
+    server.start()
+    yield server
+    server.shutdown()
+
+
+class TestDaemon:
+    """Test cases for daemon requests."""
+    
+    def test_ping(self, daemon):
+        """Test the daemon answers pings."""
+        with DaemonClient(daemon.socket_path) as client:
+            assert client.ping()
+    
+    def test_process_text(self, daemon):
+        """Test text commands go through NLU and the executor."""
+        with DaemonClient(daemon.socket_path) as client:
+            response = client.process_text("enciende la luz")
+            assert response['ok']
+            assert response['intent'] == 'encender_luz'
+            assert 'luz' in response['response'].lower()
+    
+    def test_stream_then_reuse_connection(self, daemon):
+        """Test PCM streaming and a follow-up request on the same connection."""
+        with DaemonClient(daemon.socket_path) as client:
+            response = client.stream_pcm([b'\x00' * 100, b'\x00' * 50])
+            assert response == {'ok': True, 'text': '150 bytes'}
+            assert client.ping()
+    
+    def test_large_chunks_are_split(self, daemon):
+        """Test the client never sends a frame over the daemon's limit."""
+        with DaemonClient(daemon.socket_path) as client:
+            response = client.stream_pcm([b'\x00' * (MAX_FRAME_BYTES * 2 + 10)])
+            assert response == {'ok': True, 'text': f"{MAX_FRAME_BYTES * 2 + 10} bytes"}
+    
+    def test_oversized_frame_closes_connection(self, daemon):
+        """Test a frame header over the limit is refused without reading it."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(daemon.socket_path)
+            sock.sendall(b'{"command": "stream"}\n' + (0xFFFFFFFF).to_bytes(4, 'big'))
+            rfile = sock.makefile('rb')
+            response = json.loads(rfile.readline())
+            assert not response['ok']
+            assert 'limit' in response['error']
+            assert rfile.readline() == b''
+        with DaemonClient(daemon.socket_path) as client:
+            assert client.ping()
+    
+    def test_stream_wrong_sample_rate(self, daemon):
+        """Test mismatched sample rates are rejected without desyncing."""
+        with DaemonClient(daemon.socket_path) as client:
+            response = client.stream_pcm([b'\x00' * 100], sample_rate=8000)
+            assert not response['ok']
+            assert client.ping()
+    
+    def test_unknown_command(self, daemon):
+        """Test unknown commands return an error."""
+        with DaemonClient(daemon.socket_path) as client:
+            response = client.request({'command': 'dance'})
+            assert not response['ok']
+    
+    def test_socket_removed_on_shutdown(self, tmp_path):
+        """Test the socket file is cleaned up."""
+        path = tmp_path / "vr.sock"
+        server = RecognizerDaemon(VoiceRecognizer(text_only=True), socket_path=str(path))
+        server.start()
+        assert path.exists()
+        server.shutdown()
+        assert not path.exists()
+    
+    def test_default_socket_is_per_user(self, tmp_path, monkeypatch):
+        """Test the default socket lives in a private directory and is 0600."""
+        monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+        assert default_socket_path() == str(tmp_path / "voice-recognizer.sock")
+        
+        monkeypatch.delenv('XDG_RUNTIME_DIR')
+        monkeypatch.setattr(tempfile, 'gettempdir', lambda: str(tmp_path))
+        path = default_socket_path()
+        assert os.path.dirname(path) == str(tmp_path / f"voice-recognizer-{os.getuid()}")
+        
+        server = RecognizerDaemon(VoiceRecognizer(text_only=True), socket_path=path)
+        server.start()
+        try:
+            assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+            with DaemonClient(path) as client:
+                assert client.ping()
+        finally:
+            server.shutdown()
+    
+    def test_shared_socket_directory_is_refused(self, tmp_path, monkeypatch):
+        """Test a per-user directory others can write to is not trusted."""
+        monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+        monkeypatch.setattr(tempfile, 'gettempdir', lambda: str(tmp_path))
+        path = default_socket_path()
+        os.mkdir(os.path.dirname(path))
+        os.chmod(os.path.dirname(path), 0o777)
+        
+        server = RecognizerDaemon(VoiceRecognizer(text_only=True), socket_path=path)
+        with pytest.raises(RuntimeError):
+            server.start()
+        with pytest.raises(RuntimeError):
+            DaemonClient(path).ping()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
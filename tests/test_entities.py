@@ -0,0 +1,132 @@
+"""
+Tests for entity extraction.
+"""
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nlu.entities import extract_entities, read_number, tokenize
+from nlu.matcher import match_intent, match_intents
+from executor.actions import execute
+
+
+class TestNumbers:
+    """Test cases for number words."""
+
+    @pytest.mark.parametrize("text,value", [
+        ("veinte", 20),
+        ("treinta y cinco", 35),
+        ("veintidós", 22),
+        ("ciento veinte", 120),
+        ("dos mil veinte", 2020),
+        ("twenty five", 25),
+        ("one hundred and five", 105),
+        ("42", 42),
+    ])
+    def test_read_number(self, text, value):
+        """Test Spanish, English and digit numbers."""
+        tokens = tokenize(text)
+        assert read_number(tokens, 0) == (value, len(tokens))
+
+    def test_free_numbers(self):
+        """Test numbers that are not times or durations."""
+        assert extract_entities("pon el volumen al cincuenta") == {'numbers': [50]}
+
+    def test_article_is_not_a_number(self):
+        """Test "un"/"a" only count as one before a unit."""
+        assert 'numbers' not in extract_entities("pon un temporizador")
+        assert extract_entities("espera un minuto") == {'duration': 60}
+
+
+class TestTimesAndDurations:
+    """Test cases for times and durations."""
+
+    @pytest.mark.parametrize("text,hour,minute", [
+        ("despiértame a las siete y media", 7, 30),
+        ("a las ocho menos cuarto", 7, 45),
+        ("a las siete de la tarde", 19, 0),
+        ("a la una y cuarto", 1, 15),
+        ("a las 19:30", 19, 30),
+        ("wake me up at seven thirty pm", 19, 30),
+        ("half past seven", 7, 30),
+        ("quarter to eight", 7, 45),
+    ])
+    def test_times(self, text, hour, minute):
+        """Test clock times."""
+        assert extract_entities(text)['time'] == {'hour': hour, 'minute': minute}
+
+    @pytest.mark.parametrize("text,seconds", [
+        ("pon un temporizador de veinte minutos", 1200),
+        ("una hora y media", 5400),
+        ("media hora", 1800),
+        ("un cuarto de hora", 900),
+        ("set a timer for half an hour", 1800),
+        ("2 hours and 30 seconds", 7230),
+    ])
+    def test_durations(self, text, seconds):
+        """Test durations are summed in seconds."""
+        assert extract_entities(text) == {'duration': seconds}
+
+    def test_counted_devices_are_not_times(self):
+        """Test "las dos luces" is a count, not two o'clock."""
+        entities = extract_entities("apaga las dos luces")
+        assert 'time' not in entities
+        assert entities['numbers'] == [2]
+
+
+class TestRoomsAndDevices:
+    """Test cases for rooms and devices."""
+
+    def test_room_and_device(self):
+        """Test Spanish and English names map to canonical names."""
+        assert extract_entities("enciende la luz de la cocina") == {
+            'device': 'luz', 'room': 'cocina'
+        }
+        assert extract_entities("turn on the living room lights") == {
+            'room': 'salón', 'device': 'luz'
+        }
+
+    def test_longest_phrase_wins(self):
+        """Test multi-word names beat their first word."""
+        assert extract_entities("la luz del cuarto de baño")['room'] == 'baño'
+        assert extract_entities("apaga el aire acondicionado")['device'] == 'aire acondicionado'
+
+    def test_no_entities(self):
+        """Test plain commands have no entities."""
+        assert extract_entities("hola") == {}
+        assert extract_entities("") == {}
+
+    def test_unusual_digits(self):
+        """Test digit-like characters and malformed clock times don't raise."""
+        assert extract_entities("hola ²") == {}
+        assert extract_entities("1a:30 hola") == {'numbers': [30]}
+        assert match_intent("hola ²")['intent'] == 'saludo'
+        assert match_intent("1a:30 hola")['intent'] == 'saludo'
+        assert tokenize("1a:30 a las 7:30") == ['1a', '30', 'a', 'las', '7:30']
+
+
+class TestIntegration:
+    """Test cases for entities in intent results."""
+
+    def test_match_intent_includes_entities(self):
+        """Test match_intent and match_intents return the entities."""
+        result = match_intent("Enciende la luz de la cocina")
+        assert result['intent'] == 'encender_luz'
+        assert result['entities'] == {'device': 'luz', 'room': 'cocina'}
+        assert list(match_intents(["Enciende la luz de la cocina"])) == [result]
+        first, second = match_intents(["a las siete", "a las siete"])
+        assert first['entities'] == second['entities'] == {'time': {'hour': 7, 'minute': 0}}
+        assert first['entities'] is not second['entities']
+        assert first['entities']['time'] is not second['entities']['time']
+
+    def test_execute_uses_room(self):
+        """Test the light actions mention the room."""
+        assert execute(match_intent("apaga la luz del salón")) == "Luz del salón apagada"
+        assert execute(match_intent("enciende la luz de la cocina")) == "Luz de la cocina encendida"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,97 @@
+"""
+Tests for fuzzy intent matching.
+"""
+import pytest
+import random
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nlu.fuzzy import BKTree, FuzzyMatcher, edit_distance, fold
+from nlu.matcher import match_intent
+
+
+class TestBKTree:
+    """Test cases for BKTree."""
+    
+    def test_edit_distance(self):
+        """Test Levenshtein distance."""
+        assert edit_distance("luz", "lus") == 1
+        assert edit_distance("enciende", "encende") == 1
+        assert edit_distance("", "abc") == 3
+        assert edit_distance("kitten", "sitting") == 3
+    
+    def test_fold(self):
+        """Test accents and case are folded."""
+        assert fold("Enciendé") == "enciende"
+        assert fold("qué") == "que"
+    
+    def test_search_matches_brute_force(self):
+        """Test lookups return exactly the words within the distance."""
+        rng = random.Random(0)
+        words = {''.join(rng.choices('abcde', k=rng.randint(2, 7))) for _ in range(300)}
+        tree = BKTree(words)
+        assert len(tree) == len(words)
+        for _ in range(50):
+            query = ''.join(rng.choices('abcde', k=rng.randint(2, 7)))
+            expected = {(w, edit_distance(query, w)) for w in words
+                        if edit_distance(query, w) <= 2}
+            assert set(tree.search(query, 2)) == expected
+
+
+class TestFuzzyMatcher:
+    """Test cases for FuzzyMatcher."""
+    
+    def test_confidence_is_graded(self):
+        """Test more edits give lower confidence."""
+        matcher = FuzzyMatcher([('apagar_luz', ('apaga', 'la', 'luz'))])
+        exact = matcher.match("apaga la luz")
+        one = matcher.match("apaga la lus")
+        two = matcher.match("apaqa la lus")
+        assert exact[0] == one[0] == two[0] == 'apagar_luz'
+        assert exact[1] > one[1] > two[1]
+    
+    def test_short_words_need_exact_match(self):
+        """Test one or two letter words are not corrected."""
+        matcher = FuzzyMatcher([('saludo', ('hi',))])
+        assert matcher.match("hi") is not None
+        assert matcher.match("ho") is None
+    
+    def test_unrelated_text(self):
+        """Test unrelated text does not match."""
+        matcher = FuzzyMatcher([('encender_luz', ('enciende', 'la', 'luz'))])
+        assert matcher.match("pon música") is None
+        assert matcher.match("") is None
+
+
+class TestFuzzyMatchIntent:
+    """Test cases for match_intent with fuzzy=True."""
+    
+    def test_asr_near_misses(self):
+        """Test near-miss transcriptions map to the right intent."""
+        assert match_intent("enciendé la lus", fuzzy=True)['intent'] == 'encender_luz'
+        assert match_intent("apaga la lus", fuzzy=True)['intent'] == 'apagar_luz'
+        assert match_intent("que hora es", fuzzy=True)['intent'] == 'hora'
+    
+    def test_fuzzy_is_optional(self):
+        """Test fuzzy matching is off by default."""
+        assert match_intent("apaga la lus")['intent'] == 'unknown'
+    
+    def test_exact_matches_keep_full_confidence(self):
+        """Test pattern matches still win with confidence 0.9."""
+        result = match_intent("apaga la luz", fuzzy=True)
+        assert result['confidence'] == 0.9
+        fuzzy = match_intent("apaga la lus", fuzzy=True)
+        assert 0.0 < fuzzy['confidence'] < 0.9
+    
+    def test_unknown_stays_unknown(self):
+        """Test unrelated text is still unknown."""
+        result = match_intent("xyz abc 123", fuzzy=True)
+        assert result['intent'] == 'unknown'
+        assert result['confidence'] == 0.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
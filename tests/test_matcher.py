@@ -8,7 +8,12 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from nlu.matcher import match_intent, get_intent_description
+from nlu.matcher import (
+    match_intent, get_intent_description, get_intent_phrases,
+    get_intents_version, register_intent, unregister_intent, INTENT_PATTERNS,
+    INTENT_PHRASES, match_intents, get_cache_info, set_cache_size, match_alternatives
+)
+from executor.actions import list_available_intents
 
 
 class TestMatcher:
@@ -71,6 +76,110 @@ class TestMatcher:
         
         desc_unknown = get_intent_description('unknown_intent')
         assert 'unknown' in desc_unknown.lower()
+    
+    def test_intent_phrases(self):
+        """Test grammar phrases come from the registered intents."""
+        phrases = get_intent_phrases()
+        assert 'enciende la luz' in phrases
+        assert 'qué hora es' in phrases
+        assert phrases == sorted(set(phrases))
+    
+    def test_register_intent(self):
+        """Test registering an intent bumps the version and is matched."""
+        version = get_intents_version()
+        try:
+            register_intent('abrir_puerta', [r'\babre\s*la\s*puerta'], ['abre la puerta'])
+            assert get_intents_version() > version
+            assert 'abre la puerta' in get_intent_phrases()
+            assert match_intent("abre la puerta")['intent'] == 'abrir_puerta'
+        finally:
+            unregister_intent('abrir_puerta')
+        assert 'abrir_puerta' not in INTENT_PATTERNS
+        assert 'abrir_puerta' not in INTENT_PHRASES
+        assert match_intent("abre la puerta")['intent'] == 'unknown'
+    
+    def test_registry_is_single_source(self):
+        """Test descriptions and available intents come from the registry."""
+        try:
+            register_intent('abrir_puerta', [r'\babre\s*la\s*puerta'],
+                            description='Open door/Abrir puerta')
+            assert get_intent_description('abrir_puerta') == 'Open door/Abrir puerta'
+            assert 'abrir_puerta' in list_available_intents()
+        finally:
+            unregister_intent('abrir_puerta')
+        assert 'abrir_puerta' not in list_available_intents()
+
+    
+    def test_match_intents_keeps_order(self):
+        """Test the batch API yields one result per text, in order."""
+        texts = ["hola", "apaga la luz", "", None, "xyz", "HOLA ", "qué hora es"]
+        results = list(match_intents(texts, batch_size=3))
+        assert [r['intent'] for r in results] == [
+            'saludo', 'apagar_luz', 'unknown', 'unknown', 'unknown', 'saludo', 'hora'
+        ]
+        assert [r['raw_text'] for r in results] == texts
+        assert results == [match_intent(text) for text in texts]
+    
+    def test_cache_answers_repeats(self):
+        """Test repeated normalized texts are cache hits."""
+        set_cache_size(16)
+        match_intent("Enciende la luz", cache=True)
+        result = match_intent("  enciende la luz", cache=True)
+        assert result['intent'] == 'encender_luz'
+        assert result['raw_text'] == "  enciende la luz"
+        info = get_cache_info()
+        assert info['hits'] == 1
+        assert info['misses'] == 1
+    
+    def test_cache_is_bounded(self):
+        """Test the cache evicts least recently used texts."""
+        set_cache_size(2)
+        for text in ["hola", "qué hora es", "apaga la luz"]:
+            match_intent(text, cache=True)
+        assert get_cache_info()['size'] == 2
+    
+    def test_cache_invalidated_by_new_intents(self):
+        """Test registering an intent makes cached results stale."""
+        set_cache_size(16)
+        assert match_intent("abre la puerta", cache=True)['intent'] == 'unknown'
+        try:
+            register_intent('abrir_puerta', [r'\babre\s*la\s*puerta'])
+            assert match_intent("abre la puerta", cache=True)['intent'] == 'abrir_puerta'
+        finally:
+            unregister_intent('abrir_puerta')
+    
+    def test_match_intents_process_pool(self):
+        """Test the process pool gives the same results, including code intents."""
+        texts = ["hola", "abre la puerta", "apaga la lus", "xyz"] * 3
+        try:
+            register_intent('abrir_puerta', [r'\babre\s*la\s*puerta'])
+            expected = [match_intent(text, fuzzy=True) for text in texts]
+            set_cache_size(16)
+            assert list(match_intents(texts, fuzzy=True, workers=2)) == expected
+        finally:
+            unregister_intent('abrir_puerta')
+    
+    def test_match_alternatives_recovers_lower_hypothesis(self):
+        """Test a confident lower-ranked hypothesis beats a misheard top one."""
+        result = match_alternatives(["apaga la lus", "apaga la luz", "hola"])
+        assert result['intent'] == 'apagar_luz'
+        assert result['raw_text'] == "apaga la luz"
+        assert result['alternative'] == 1
+    
+    def test_match_alternatives_stops_at_first_confident(self):
+        """Test matching stops at the first confident hypothesis."""
+        def texts():
+            yield "hola"
+            raise AssertionError("matched past a confident hypothesis")
+        assert match_alternatives(texts())['intent'] == 'saludo'
+    
+    def test_match_alternatives_falls_back_to_best(self):
+        """Test the most confident result wins when none is confident."""
+        result = match_alternatives(["xyz", "apaga la lus"], fuzzy=True)
+        assert result['intent'] == 'apagar_luz'
+        assert result['alternative'] == 1
+        assert match_alternatives(["xyz", "abc"])['alternative'] == 0
+        assert match_alternatives([])['intent'] == 'unknown'
 
 
 if __name__ == "__main__":
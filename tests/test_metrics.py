@@ -0,0 +1,96 @@
+"""
+Tests for latency instrumentation.
+"""
+import pytest
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from utils.metrics import Metrics, RollingHistogram
+from main import VoiceRecognizer
+
+
+class TestMetrics:
+    """Test cases for Metrics."""
+    
+    def test_span_records_latency(self):
+        """Test spans time their block and land in the snapshot."""
+        metrics = Metrics()
+        with metrics.span('nlu') as span:
+            time.sleep(0.01)
+        assert span.elapsed >= 0.01
+        stage = metrics.snapshot()['latency_ms']['nlu']
+        assert stage['count'] == 1
+        assert stage['p50'] >= 10.0
+    
+    def test_percentiles(self):
+        """Test percentile summaries over the rolling window."""
+        histogram = RollingHistogram(window=100)
+        for value in range(1, 101):
+            histogram.add(value)
+        summary = histogram.summary()
+        assert summary['p50'] == 50
+        assert summary['p95'] == 95
+        assert summary['p99'] == 99
+        assert summary['max'] == 100
+    
+    def test_window_is_bounded(self):
+        """Test old values fall out of the window but are still counted."""
+        histogram = RollingHistogram(window=10)
+        for value in range(100):
+            histogram.add(value)
+        summary = histogram.summary()
+        assert summary['count'] == 100
+        assert summary['p50'] >= 90
+    
+    def test_rtf(self):
+        """Test real-time factor recording."""
+        metrics = Metrics()
+        metrics.record_rtf(0.5, 2.0)
+        assert metrics.snapshot()['ratios']['asr_rtf']['mean'] == 0.25
+    
+    def test_hooks(self):
+        """Test hooks receive every measurement."""
+        metrics = Metrics()
+        seen = []
+        metrics.add_hook(lambda name, value: seen.append(name))
+        metrics.record('tts', 0.1)
+        metrics.record_rtf(1.0, 2.0)
+        assert seen == ['tts', 'asr_rtf']
+    
+    def test_disabled(self):
+        """Test disabled metrics record nothing."""
+        metrics = Metrics(enabled=False)
+        seen = []
+        metrics.add_hook(lambda name, value: seen.append(name))
+        with metrics.span('nlu'):
+            pass
+        metrics.record('tts', 0.1)
+        snapshot = metrics.snapshot()
+        assert snapshot['latency_ms'] == {}
+        assert seen == []
+    
+    def test_write_snapshot(self, tmp_path):
+        """Test the JSON snapshot file."""
+        metrics = Metrics()
+        metrics.record('action', 0.002)
+        path = tmp_path / "metrics.json"
+        metrics.write_snapshot(str(path))
+        data = json.loads(path.read_text())
+        assert data['latency_ms']['action']['count'] == 1
+    
+    def test_process_text_is_instrumented(self):
+        """Test VoiceRecognizer records NLU and action latency."""
+        recognizer = VoiceRecognizer(text_only=True)
+        recognizer.process_text("qué hora es")
+        stages = recognizer.metrics.snapshot()['latency_ms']
+        assert stages['nlu']['count'] == 1
+        assert stages['action']['count'] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,129 @@
+"""
+Tests for the phrase index NLU backend.
+"""
+import pytest
+import random
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nlu.phrase_index import PhraseIndex, expand_pattern, tokenize
+from nlu.registry import DEFAULT_INTENTS_FILE, IntentRegistry
+
+
+def brute_force(registry, text):
+    """First declared intent with a pattern found by re.search."""
+    for name, definition in registry._code_intents.items():
+        if any(regex.search(text) for regex in definition['compiled']):
+            return name
+    return None
+
+
+class TestExpandPattern:
+    """Test cases for expand_pattern."""
+    
+    def test_alternatives_and_optional_groups(self):
+        """Test groups, '|' and '?' expand to every phrase."""
+        phrases = expand_pattern(r'\b(enciende|prende)\s*(la\s*)?luz')
+        assert set(phrases) == {
+            ('enciende', 'la', 'luz'), ('enciende', 'luz'),
+            ('prende', 'la', 'luz'), ('prende', 'luz')
+        }
+    
+    def test_optional_letter(self):
+        """Test an optional letter expands to both spellings."""
+        assert set(expand_pattern(r'\bluces?\b')) == {('luces',), ('luce',)}
+    
+    def test_non_literal_patterns(self):
+        """Test patterns that need the regex engine are rejected."""
+        for pattern in [r'\bluz\d+', r'a.b', r'[abc]', r'(?i)hola', r'(a|b)+',
+                        r'ho+la', r'(la)?', r'^hola']:
+            assert expand_pattern(pattern) is None, pattern
+    
+    def test_expansion_limit(self):
+        """Test patterns with too many expansions are left to regex."""
+        pattern = ' '.join(['(a|b|c)'] * 6)
+        assert expand_pattern(pattern) is None
+        assert len(expand_pattern(pattern, limit=1000)) == 3 ** 6
+
+
+class TestPhraseIndex:
+    """Test cases for PhraseIndex."""
+    
+    def test_lowest_priority_wins(self):
+        """Test the best priority among all occurring phrases is returned."""
+        index = PhraseIndex()
+        index.add(('enciende',), 5)
+        index.add(('la', 'luz'), 2)
+        assert index.search(tokenize("enciende la luz")) == 2
+        assert index.search(tokenize("enciende el ventilador")) == 5
+        assert index.search(tokenize("nada")) is None
+    
+    def test_failure_links(self):
+        """Test phrases overlapping a partial match are still found."""
+        index = PhraseIndex()
+        index.add(('a', 'b', 'c'), 0)
+        index.add(('b', 'd'), 1)
+        index.add(('b',), 3)
+        assert index.search(['a', 'b', 'd']) == 1
+        assert index.search(['x', 'a', 'b', 'c']) == 0
+        assert index.search(['a', 'a', 'b']) == 3
+    
+    def test_whole_words(self):
+        """Test phrases only match whole words."""
+        index = PhraseIndex()
+        index.add(('luz',), 0)
+        assert index.search(tokenize("luces")) is None
+        assert index.search(tokenize("la luz.")) == 0
+
+
+class TestIndexBackend:
+    """Test cases for the registry's index backend."""
+    
+    def test_default_intents_agree(self):
+        """Test both backends agree on the default intents."""
+        regex = IntentRegistry(DEFAULT_INTENTS_FILE)
+        index = IntentRegistry(DEFAULT_INTENTS_FILE, backend='index')
+        texts = ["hola", "buenas noches", "dime la hora", "oye apaga la luz",
+                 "apaga la luz y dime qué hora es", "turn off the light",
+                 "prender luz", "pon música", ""]
+        for text in texts:
+            assert index.match(text) == regex.match(text)
+    
+    def test_many_intents_match_brute_force(self):
+        """Test both backends equal pattern-by-pattern search across blocks."""
+        rng = random.Random(0)
+        words = ['w%d' % i for i in range(40)]
+        regex = IntentRegistry()
+        index = IntentRegistry(backend='index')
+        for i in range(150):
+            a, b, c = rng.sample(words, 3)
+            patterns = [rf'\b({a} {b}|{c})\b']
+            if i % 10 == 0:
+                patterns.append(rf'\b{a}\d+')
+            if i % 25 == 0:
+                patterns.append(rf'{b}[xy]')
+            for registry in (regex, index):
+                registry.register(f'intent_{i}', patterns)
+        
+        for _ in range(500):
+            text = ' '.join(rng.choices(words, k=rng.randint(1, 5)))
+            if rng.random() < 0.3:
+                text += ' ' + rng.choice(words) + rng.choice(['7', 'x', 'z'])
+            expected = brute_force(regex, text)
+            assert regex.match(text) == expected, text
+            assert index.match(text) == expected, text
+    
+    def test_set_backend(self):
+        """Test switching backends keeps the definitions."""
+        registry = IntentRegistry(DEFAULT_INTENTS_FILE)
+        registry.set_backend('index')
+        assert registry.match("enciende la luz") == 'encender_luz'
+        with pytest.raises(ValueError):
+            registry.set_backend('neural')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
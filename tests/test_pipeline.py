@@ -0,0 +1,162 @@
+"""
+Tests for the asyncio voice pipeline.
+"""
+import asyncio
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pipeline import VoicePipeline
+
+STAGE_TIME = 0.05
+
+
+def make_stages(log):
+    """Build stage callables that each take STAGE_TIME seconds."""
+    counter = iter(range(1000))
+    
+    def capture():
+        time.sleep(STAGE_TIME)
+        return f"audio{next(counter)}"
+    
+    def decode(audio):
+        time.sleep(STAGE_TIME)
+        return audio.replace("audio", "text")
+    
+    def handle(text):
+        time.sleep(STAGE_TIME)
+        return {'text': text, 'response': text.upper()}
+    
+    def speak(result):
+        time.sleep(STAGE_TIME)
+        log.append(result['response'])
+    
+    return capture, decode, handle, speak
+
+
+class TestVoicePipeline:
+    """Test cases for VoicePipeline."""
+    
+    def test_processes_in_order(self):
+        """Test every utterance goes through all stages in order."""
+        spoken = []
+        pipeline = VoicePipeline(*make_stages(spoken))
+        asyncio.run(pipeline.run(max_utterances=4))
+        assert spoken == ["TEXT0", "TEXT1", "TEXT2", "TEXT3"]
+        assert pipeline.stats == {'captured': 4, 'decoded': 4, 'handled': 4, 'spoken': 4}
+    
+    def test_stages_overlap(self):
+        """Test consecutive utterances overlap instead of running serially."""
+        utterances = 6
+        pipeline = VoicePipeline(*make_stages([]))
+        start = time.monotonic()
+        asyncio.run(pipeline.run(max_utterances=utterances))
+        elapsed = time.monotonic() - start
+        serial = utterances * 4 * STAGE_TIME
+        assert elapsed < serial * 0.7
+    
+    def test_dropped_utterances(self):
+        """Test None from a stage drops the utterance without stopping."""
+        spoken = []
+        capture, _, handle, speak = make_stages(spoken)
+        decode = lambda audio: None if audio == "audio1" else audio
+        pipeline = VoicePipeline(capture, decode, handle, speak)
+        asyncio.run(pipeline.run(max_utterances=3))
+        assert spoken == ["AUDIO0", "AUDIO2"]
+    
+    def test_backpressure(self):
+        """Test capture stalls when speech falls behind."""
+        spoken = []
+        capture, decode, handle, _ = make_stages(spoken)
+        gate = threading.Event()
+        
+        def slow_speak(result):
+            gate.wait(5)
+            spoken.append(result['response'])
+        
+        pipeline = VoicePipeline(capture, decode, handle, slow_speak, queue_size=1)
+        
+        async def scenario():
+            task = asyncio.ensure_future(pipeline.run(max_utterances=20))
+            await asyncio.sleep(20 * STAGE_TIME)
+            # 1 speaking + 1 queued per stage + 1 in each of decode/handle
+            captured = pipeline.stats['captured']
+            gate.set()
+            await task
+            return captured
+        
+        captured = asyncio.run(scenario())
+        assert captured <= 7
+        assert len(spoken) == 20
+    
+    def test_stop_drains_queued_utterances(self):
+        """Test stop() ends capture but finishes utterances in flight."""
+        spoken = []
+        pipeline = VoicePipeline(*make_stages(spoken))
+        
+        async def scenario():
+            task = asyncio.ensure_future(pipeline.run())
+            await asyncio.sleep(3 * STAGE_TIME)
+            pipeline.stop()
+            await asyncio.wait_for(task, 2)
+        
+        asyncio.run(scenario())
+        assert len(spoken) == pipeline.stats['captured'] > 0
+    
+    def test_cancellation(self):
+        """Test cancelling run() shuts every stage down."""
+        pipeline = VoicePipeline(*make_stages([]))
+        
+        async def scenario():
+            task = asyncio.ensure_future(pipeline.run())
+            await asyncio.sleep(3 * STAGE_TIME)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        
+        asyncio.run(scenario())
+        assert pipeline._loop is None
+    
+    def test_capture_failures_back_off_and_stop(self):
+        """Test a failing capture is retried with backoff, then surfaced."""
+        attempts = []
+        
+        def capture():
+            attempts.append(time.monotonic())
+            raise OSError("no input device")
+        
+        _, decode, handle, speak = make_stages([])
+        pipeline = VoicePipeline(capture, decode, handle, speak,
+                                 max_capture_errors=3, capture_retry_delay=STAGE_TIME)
+        with pytest.raises(RuntimeError, match="no input device"):
+            asyncio.run(asyncio.wait_for(pipeline.run(), 2))
+        assert len(attempts) == 3
+        # Waits of one and then two retry delays
+        assert attempts[1] - attempts[0] >= STAGE_TIME * 0.9
+        assert attempts[2] - attempts[1] >= 2 * STAGE_TIME * 0.9
+        assert pipeline._loop is None
+    
+    def test_capture_recovers(self):
+        """Test isolated capture failures don't stop the pipeline."""
+        spoken = []
+        capture, decode, handle, speak = make_stages(spoken)
+        calls = iter(range(1000))
+        
+        def flaky_capture():
+            if next(calls) % 2:
+                raise OSError("buffer overflow")
+            return capture()
+        
+        pipeline = VoicePipeline(flaky_capture, decode, handle, speak,
+                                 max_capture_errors=2, capture_retry_delay=0.01)
+        asyncio.run(pipeline.run(max_utterances=3))
+        assert spoken == ["TEXT0", "TEXT1", "TEXT2"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,107 @@
+"""
+Tests for the recognizer pool.
+"""
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from asr.recognizer_pool import RecognizerPool
+
+
+class FakeRecognizer:
+    """Stand-in for KaldiRecognizer that counts resets."""
+    
+    def __init__(self):
+        self.resets = 0
+    
+    def Reset(self):
+        self.resets += 1
+
+
+class TestRecognizerPool:
+    """Test cases for RecognizerPool."""
+    
+    def test_creates_lazily(self):
+        """Test recognizers are only created on demand."""
+        pool = RecognizerPool(model=None, max_size=3, factory=FakeRecognizer)
+        assert pool.size == 0
+        rec = pool.acquire()
+        assert isinstance(rec, FakeRecognizer)
+        assert pool.size == 1
+        assert pool.in_use == 1
+    
+    def test_reuses_and_resets(self):
+        """Test released recognizers are reset and reused."""
+        pool = RecognizerPool(model=None, max_size=2, factory=FakeRecognizer)
+        rec = pool.acquire()
+        pool.release(rec)
+        assert rec.resets == 1
+        assert pool.acquire() is rec
+        assert pool.size == 1
+    
+    def test_upper_bound_non_blocking(self):
+        """Test the pool never grows past max_size."""
+        pool = RecognizerPool(model=None, max_size=2, factory=FakeRecognizer)
+        pool.acquire()
+        pool.acquire()
+        assert pool.acquire(block=False) is None
+        assert pool.size == 2
+    
+    def test_acquire_timeout(self):
+        """Test acquire returns None after the timeout."""
+        pool = RecognizerPool(model=None, max_size=1, factory=FakeRecognizer)
+        pool.acquire()
+        start = time.monotonic()
+        assert pool.acquire(timeout=0.05) is None
+        assert time.monotonic() - start >= 0.05
+    
+    def test_blocked_acquire_wakes_on_release(self):
+        """Test a waiting session gets the recognizer when it is released."""
+        pool = RecognizerPool(model=None, max_size=1, factory=FakeRecognizer)
+        rec = pool.acquire()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=2)))
+        waiter.start()
+        time.sleep(0.05)
+        pool.release(rec)
+        waiter.join()
+        assert got == [rec]
+    
+    def test_session_timeout(self):
+        """Test session raises TimeoutError when the pool is exhausted."""
+        pool = RecognizerPool(model=None, max_size=1, factory=FakeRecognizer)
+        with pool.session():
+            with pytest.raises(TimeoutError):
+                with pool.session(timeout=0.01):
+                    pass
+        assert pool.in_use == 0
+    
+    def test_set_grammar_drops_old_recognizers(self):
+        """Test recognizers built before a grammar change are not reused."""
+        pool = RecognizerPool(model=None, max_size=2, factory=FakeRecognizer)
+        idle = pool.acquire()
+        busy = pool.acquire()
+        pool.release(idle)
+        
+        pool.set_grammar('["hola", "[unk]"]')
+        assert pool.grammar == '["hola", "[unk]"]'
+        assert pool.size == 1
+        
+        pool.release(busy)
+        assert pool.size == 0
+        fresh = pool.acquire()
+        assert fresh is not idle and fresh is not busy
+    
+    def test_invalid_size(self):
+        """Test max_size must be positive."""
+        with pytest.raises(ValueError):
+            RecognizerPool(model=None, max_size=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,119 @@
+"""
+Tests for the intent registry.
+"""
+import pytest
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from nlu.registry import IntentRegistry
+
+
+def write_intents(path, intents):
+    """Write a definition file."""
+    path.write_text(json.dumps({'intents': intents}), encoding='utf-8')
+
+
+class TestIntentRegistry:
+    """Test cases for IntentRegistry."""
+    
+    def test_priority_follows_declaration_order(self, tmp_path):
+        """Test the first declared intent wins when several match."""
+        path = tmp_path / "intents.json"
+        write_intents(path, [
+            {'name': 'luz', 'patterns': [r'\bluz\b']},
+            {'name': 'encender', 'patterns': [r'\benciende\b']},
+        ])
+        registry = IntentRegistry(str(path))
+        # 'enciende' appears first in the text, but 'luz' has priority
+        assert registry.match("enciende la luz") == 'luz'
+        assert registry.match("enciende el ventilador") == 'encender'
+        assert registry.match("nada") is None
+    
+    def test_combined_matches_like_separate_search(self):
+        """Test the combined matcher agrees with pattern-by-pattern search."""
+        from nlu.matcher import get_registry
+        registry = get_registry()
+        matcher = registry._matcher
+        assert matcher.combinable
+        texts = ["hola", "dime la hora por favor", "oye apaga la luz",
+                 "apaga la luz y dime qué hora es", "turn on the light",
+                 "pon música", ""]
+        for text in texts:
+            expected = next((matcher.names[index] for index, regex in matcher.fallback
+                             if regex.search(text)), None)
+            assert registry.match(text) == expected
+    
+    def test_top_level_alternation(self):
+        """Test a shared leading \\b is not hoisted over a top-level '|'."""
+        registry = IntentRegistry()
+        registry.register('saludo', [r'\bhola\b'])
+        registry.register('numero', [r'\buno|dos'])
+        assert registry.match("veintidos") == 'numero'
+        assert registry.match("hola") == 'saludo'
+    
+    def test_backreference_falls_back(self):
+        """Test patterns with numbered backreferences still match correctly."""
+        registry = IntentRegistry()
+        registry.register('saludo', [r'\bhola\b'])
+        registry.register('eco', [r'\b(\w+) \1\b'])
+        assert not registry._matcher.combinable
+        assert registry.match("bla bla") == 'eco'
+        assert registry.match("hola hola") == 'saludo'
+    
+    def test_invalid_pattern(self):
+        """Test invalid patterns are rejected at registration."""
+        registry = IntentRegistry()
+        with pytest.raises(ValueError):
+            registry.register('roto', ['(sin cerrar'])
+    
+    def test_code_intents_survive_reload(self, tmp_path):
+        """Test reloading the file keeps intents registered from code."""
+        path = tmp_path / "intents.json"
+        write_intents(path, [{'name': 'saludo', 'patterns': [r'\bhola\b']}])
+        registry = IntentRegistry(str(path))
+        registry.register('puerta', [r'\bpuerta\b'], ['abre la puerta'])
+        write_intents(path, [{'name': 'hora', 'patterns': [r'\bhora\b']}])
+        registry.load(str(path))
+        assert registry.names() == ['hora', 'puerta']
+        assert registry.phrases['puerta'] == ['abre la puerta']
+    
+    def test_hot_reload(self, tmp_path):
+        """Test a changed definition file is picked up and bumps the version."""
+        path = tmp_path / "intents.json"
+        write_intents(path, [{'name': 'saludo', 'patterns': [r'\bhola\b'],
+                              'description': 'Greeting'}])
+        registry = IntentRegistry(str(path), reload_interval=0)
+        version = registry.version
+        
+        write_intents(path, [{'name': 'despedida', 'patterns': [r'\badiós\b']}])
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        registry.maybe_reload()
+        
+        assert registry.version > version
+        assert registry.match("adiós") == 'despedida'
+        assert registry.match("hola") is None
+        assert registry.descriptions == {}
+    
+    def test_broken_reload_keeps_definitions(self, tmp_path, capsys):
+        """Test a broken file is reported and the old definitions kept."""
+        path = tmp_path / "intents.json"
+        write_intents(path, [{'name': 'saludo', 'patterns': [r'\bhola\b']}])
+        registry = IntentRegistry(str(path), reload_interval=0)
+        
+        path.write_text("{not json", encoding='utf-8')
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        registry.maybe_reload()
+        
+        assert registry.match("hola") == 'saludo'
+        assert 'Could not reload intents' in capsys.readouterr().out
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,125 @@
+"""
+Tests for lazily parsed recognition results.
+"""
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from asr.result import RecognitionResult, partial_text, segment_text
+from asr.alternatives import Transcript
+
+
+def vosk_json(words, text=None):
+    """Format a result the way Vosk prints it."""
+    data = {
+        'result': [{'conf': conf, 'end': end, 'start': start, 'word': word}
+                   for word, start, end, conf in words],
+        'text': text if text is not None else ' '.join(word for word, *_ in words)
+    }
+    return json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False).replace('": ', '" : ')
+
+
+FIRST = vosk_json([('apaga', 0.0, 0.4, 0.9), ('la', 0.4, 0.5, 1.0), ('luz', 0.5, 0.9, 0.3)])
+SECOND = vosk_json([('cocina', 3.0, 3.6, 0.8)])
+
+
+class TestText:
+    """Test cases for text extraction."""
+
+    def test_segment_text(self):
+        """Test the text of plain, empty and N-best results."""
+        assert segment_text(FIRST) == "apaga la luz"
+        assert segment_text('{\n  "text" : ""\n}') == ""
+        nbest = json.dumps({'alternatives': [{'confidence': 200.0, 'text': ' hola '},
+                                             {'confidence': 150.0, 'text': 'ola'}]})
+        assert segment_text(nbest) == "hola"
+
+    def test_escaped_text_falls_back(self):
+        """Test escaped strings are decoded by the JSON parser."""
+        assert segment_text(json.dumps({'text': 'di "hola"'})) == 'di "hola"'
+
+    def test_partial_text(self):
+        """Test partial hypotheses."""
+        assert partial_text('{\n  "partial" : "enciende la"\n}') == "enciende la"
+        assert partial_text('{"partial": ""}') == ""
+
+
+class TestRecognitionResult:
+    """Test cases for RecognitionResult."""
+
+    def test_text_joins_segments(self):
+        """Test segments are joined and empty ones skipped."""
+        result = RecognitionResult([FIRST, '{"text": ""}', SECOND])
+        assert result.text == "apaga la luz cocina"
+        assert bool(result)
+        assert not RecognitionResult()
+
+    def test_word_columns(self):
+        """Test word timings and confidences are decoded into columns."""
+        result = RecognitionResult([FIRST, SECOND])
+        assert result.words == ('apaga', 'la', 'luz', 'cocina')
+        assert list(result.start) == [0.0, 0.4, 0.5, 3.0]
+        assert list(result.end) == [0.4, 0.5, 0.9, 3.6]
+        assert len(result) == 4
+        assert list(result)[2] == ('luz', 0.5, 0.9, 0.3)
+
+    def test_confidence(self):
+        """Test mean confidence and low-confidence words."""
+        result = RecognitionResult([FIRST])
+        assert result.confidence == pytest.approx((0.9 + 1.0 + 0.3) / 3)
+        assert result.low_confidence_words(0.5) == ['luz']
+        assert RecognitionResult(['{"text": "hola"}']).confidence == 1.0
+        assert RecognitionResult(['{"text": ""}']).confidence == 0.0
+
+    def test_add_resets_cache(self):
+        """Test adding a segment invalidates parsed fields."""
+        result = RecognitionResult([FIRST])
+        assert len(result) == 3
+        result.add(SECOND)
+        assert result.text == "apaga la luz cocina"
+        assert len(result) == 4
+
+    def test_escaped_word_falls_back(self):
+        """Test words the fast path cannot read go through the JSON parser."""
+        raw = vosk_json([('di', 0.0, 0.2, 1.0), ('"hola"', 0.2, 0.6, 0.7)])
+        result = RecognitionResult([raw])
+        assert result.words == ('di', '"hola"')
+        assert list(result.conf) == [1.0, 0.7]
+
+    def test_alternatives_output(self):
+        """Test N-best output uses the best alternative."""
+        raw = json.dumps({'alternatives': [
+            {'confidence': 210.0, 'text': 'hola',
+             'result': [{'start': 0.1, 'end': 0.5, 'word': 'hola'}]},
+            {'confidence': 180.0, 'text': 'ola'}
+        ]})
+        result = RecognitionResult([raw])
+        assert result.text == "hola"
+        assert list(result) == [('hola', 0.1, 0.5, 1.0)]
+
+    def test_to_dict(self):
+        """Test conversion to plain data."""
+        data = RecognitionResult([SECOND]).to_dict()
+        assert data == {
+            'text': 'cocina',
+            'confidence': 0.8,
+            'words': [{'word': 'cocina', 'start': 3.0, 'end': 3.6, 'conf': 0.8}]
+        }
+        json.dumps(data)
+
+    def test_transcript_keeps_result(self):
+        """Test Transcript feeds its RecognitionResult."""
+        transcript = Transcript()
+        assert transcript.add(FIRST) == "apaga la luz"
+        transcript.add(SECOND)
+        assert transcript.text == "apaga la luz cocina"
+        assert transcript.result.words[-1] == 'cocina'
+        assert transcript.alternatives(3)[0]['text'] == "apaga la luz cocina"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,165 @@
+"""
+Tests for streaming recognition from the microphone.
+"""
+import contextlib
+import io
+import json
+import pytest
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("vosk")
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from asr.vosk_asr import VoskASR
+
+SAMPLE_RATE = 16000
+BLOCK = 1600
+WORDS = ["enciende", "la", "luz"]
+
+
+class FakeInputStream:
+    """sounddevice.InputStream stand-in feeding blocks from a thread."""
+
+    def __init__(self, blocks, fail_start=False, callback=None, **kwargs):
+        self.blocks = blocks
+        self.fail_start = fail_start
+        self.callback = callback
+        self.stopped = False
+        self.closed = False
+        self._thread = None
+
+    def start(self):
+        if self.fail_start:
+            raise OSError("input device unavailable")
+        self._thread = threading.Thread(target=self._feed, daemon=True)
+        self._thread.start()
+
+    def _feed(self):
+        for block in self.blocks:
+            time.sleep(0.005)
+            if self.stopped:
+                return
+            self.callback(block.reshape(-1, 1), len(block), None, None)
+
+    def stop(self):
+        self.stopped = True
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRecognizer:
+    """Recognizer stand-in hypothesizing one more word per block."""
+
+    def __init__(self, final_after=None, fail_after=None):
+        self.final_after = final_after
+        self.fail_after = fail_after
+        self.blocks = 0
+
+    def AcceptWaveform(self, data):
+        self.blocks += 1
+        if self.fail_after is not None and self.blocks > self.fail_after:
+            raise RuntimeError("decoder failure")
+        return self.final_after is not None and self.blocks >= self.final_after
+
+    def PartialResult(self):
+        return json.dumps({'partial': ' '.join(WORDS[:self.blocks])})
+
+    def Result(self):
+        return json.dumps({'text': ' '.join(WORDS)})
+
+    def FinalResult(self):
+        return json.dumps({'text': ' '.join(WORDS[:self.blocks])})
+
+
+@pytest.fixture
+def microphone(monkeypatch):
+    """Replace sounddevice; the result records the opened input streams."""
+    state = types.SimpleNamespace(streams=[], fail_start=False,
+                                  blocks=[np.full(BLOCK, 1000, dtype=np.int16)] * 5)
+
+    def input_stream(**kwargs):
+        stream = FakeInputStream(state.blocks, state.fail_start, **kwargs)
+        state.streams.append(stream)
+        return stream
+
+    module = types.ModuleType("sounddevice")
+    module.InputStream = input_stream
+    monkeypatch.setitem(sys.modules, "sounddevice", module)
+    return state
+
+
+def make_asr(tmp_path, recognizer):
+    """VoskASR without a model, using a stand-in microphone recognizer."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        asr = VoskASR(model_path=str(tmp_path / "missing-model"), sample_rate=SAMPLE_RATE,
+                      preroll=0.0)
+    asr.recognizer = recognizer
+    return asr
+
+
+class TestStreaming:
+    """Test cases for stream_from_mic and recognize_streaming."""
+
+    def test_partial_then_final(self, tmp_path, microphone):
+        """Test partial hypotheses are followed by the final result."""
+        asr = make_asr(tmp_path, FakeRecognizer(final_after=3))
+        events = list(asr.stream_from_mic(max_duration=2.0, block_size=BLOCK))
+        assert [event['type'] for event in events] == ['partial', 'partial', 'final']
+        assert [event['text'] for event in events] == ["enciende", "enciende la",
+                                                       "enciende la luz"]
+        assert events[-1]['result'].text == "enciende la luz"
+        # The stream stays open between recognitions until close()
+        assert not microphone.streams[0].closed
+        asr.close()
+        assert microphone.streams[0].stopped and microphone.streams[0].closed
+
+    def test_recognize_streaming(self, tmp_path, microphone):
+        """Test recognize_streaming reports partials and returns the text."""
+        asr = make_asr(tmp_path, FakeRecognizer(final_after=3))
+        partials = []
+        assert asr.recognize_streaming(max_duration=2.0, on_partial=partials.append) == \
+            "enciende la luz"
+        assert partials == ["enciende", "enciende la"]
+        asr.close()
+
+    def test_close_ends_stream(self, tmp_path, microphone):
+        """Test close() stops listening and yields the final result."""
+        asr = make_asr(tmp_path, FakeRecognizer())
+        events = []
+        for event in asr.stream_from_mic(max_duration=10.0, block_size=BLOCK):
+            events.append(event)
+            if len(events) == 2:
+                asr.close()
+        assert events[-1]['type'] == 'final'
+        assert events[-1]['text'].startswith("enciende la")
+        assert microphone.streams[0].stopped and microphone.streams[0].closed
+        assert not asr._capture.running
+
+    def test_recognizer_error_closes_stream(self, tmp_path, microphone):
+        """Test a decoding error releases the microphone."""
+        asr = make_asr(tmp_path, FakeRecognizer(fail_after=1))
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert asr.recognize_streaming(max_duration=2.0) is None
+        assert microphone.streams[0].stopped and microphone.streams[0].closed
+        assert not asr._capture.running
+
+    def test_failed_start_closes_stream(self, tmp_path, microphone):
+        """Test a stream that fails to start is closed, not leaked."""
+        microphone.fail_start = True
+        asr = make_asr(tmp_path, FakeRecognizer(final_after=3))
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert asr.recognize_streaming(max_duration=2.0) is None
+        assert microphone.streams[0].closed
+        assert not asr._capture.running
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
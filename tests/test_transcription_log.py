@@ -0,0 +1,147 @@
+"""
+Tests for the buffered transcription log.
+"""
+import gzip
+import json
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from utils.transcription_log import TranscriptionLog
+from main import VoiceRecognizer
+
+
+def read_records(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+class TestTranscriptionLog:
+    """Test cases for TranscriptionLog."""
+    
+    def test_writes_jsonl_records(self, tmp_path):
+        """Test records are written as JSON lines with all fields."""
+        path = tmp_path / "logs" / "transcriptions.jsonl"
+        log = TranscriptionLog(str(path))
+        assert log.log("enciende la luz", intent="encender_luz", confidence=1.0,
+                       latencies={'asr': 0.5, 'nlu': 0.0012})
+        assert log.flush(timeout=5)
+        record, = read_records(path)
+        assert record['text'] == "enciende la luz"
+        assert record['intent'] == "encender_luz"
+        assert record['confidence'] == 1.0
+        assert record['latency_ms'] == {'asr': 500.0, 'nlu': 1.2}
+        assert record['timestamp'][:4].isdigit()
+        log.close()
+    
+    def test_batches_by_count_and_age(self, tmp_path):
+        """Test a full batch is written at once and a partial one after the interval."""
+        path = tmp_path / "log.jsonl"
+        log = TranscriptionLog(str(path), flush_records=3, flush_interval=0.2)
+        for index in range(3):
+            log.log(f"comando {index}")
+        deadline = time.time() + 5
+        while log.pending and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        assert len(read_records(path)) == 3
+        
+        log.log("otro")
+        time.sleep(0.05)
+        assert len(read_records(path)) == 3
+        deadline = time.time() + 5
+        while len(read_records(path)) < 4 and time.time() < deadline:
+            time.sleep(0.02)
+        assert read_records(path)[-1]['text'] == "otro"
+        log.close()
+    
+    def test_close_writes_pending_records(self, tmp_path):
+        """Test close() drains the queue and later records are refused."""
+        path = tmp_path / "log.jsonl"
+        log = TranscriptionLog(str(path), flush_records=1000, flush_interval=60)
+        for index in range(10):
+            log.log(f"comando {index}")
+        log.close()
+        assert [record['text'] for record in read_records(path)] == [
+            f"comando {index}" for index in range(10)
+        ]
+        assert log.log("tarde") is False
+        log.close()
+    
+    def test_unserializable_record_is_skipped(self, tmp_path):
+        """Test a bad record is counted and dropped without stopping the writer."""
+        path = tmp_path / "log.jsonl"
+        log = TranscriptionLog(str(path))
+        log.log("antes")
+        log.log("malo", extra=object())
+        log.log("sin latencias", latencies={'asr': "lento"})
+        assert log.flush(timeout=5)
+        log.log("después")
+        assert log.flush(timeout=5)
+        assert log._thread.is_alive()
+        assert log.invalid == 2
+        assert [record['text'] for record in read_records(path)] == ["antes", "después"]
+        log.close()
+    
+    def test_log_does_not_wait_for_disk(self, tmp_path):
+        """Test log() returns while the writer is blocked, dropping the oldest records."""
+        release = threading.Event()
+        log = TranscriptionLog(str(tmp_path / "log.jsonl"), flush_records=1, max_pending=5)
+        write = log._write
+        log._write = lambda batch: (release.wait(5), write(batch))
+        
+        log.log("primero")
+        time.sleep(0.05)
+        start = time.perf_counter()
+        for index in range(20):
+            log.log(f"comando {index}")
+        assert time.perf_counter() - start < 0.5
+        assert log.pending == 5
+        assert log.dropped == 15
+        
+        release.set()
+        log.close()
+        texts = [record['text'] for record in read_records(tmp_path / "log.jsonl")]
+        assert texts == ["primero"] + [f"comando {index}" for index in range(15, 20)]
+    
+    def test_rotation_compresses_backups(self, tmp_path):
+        """Test the file rotates by size, old files are gzipped and capped."""
+        path = tmp_path / "log.jsonl"
+        log = TranscriptionLog(str(path), max_bytes=200, backups=2, flush_records=1)
+        for index in range(12):
+            log.log(f"comando número {index}", intent="saludo")
+            log.flush(timeout=5)
+        log.close()
+        
+        assert not (tmp_path / "log.jsonl.3.gz").exists()
+        with gzip.open(tmp_path / "log.jsonl.1.gz", 'rt', encoding='utf-8') as f:
+            newest = [json.loads(line) for line in f]
+        with gzip.open(tmp_path / "log.jsonl.2.gz", 'rt', encoding='utf-8') as f:
+            older = [json.loads(line) for line in f]
+        current = read_records(path) if path.exists() else []
+        texts = [record['text'] for record in older + newest + current]
+        assert texts == [f"comando número {index}" for index in range(12 - len(texts), 12)]
+
+
+class TestRecognizerLogging:
+    """Test cases for VoiceRecognizer transcription logging."""
+    
+    def test_log_and_close(self, tmp_path):
+        """Test recognizer records include the intent and are flushed on close."""
+        path = tmp_path / "transcriptions.jsonl"
+        recognizer = VoiceRecognizer(text_only=True)
+        recognizer._log_transcription("hola", str(path), {'intent': 'saludo', 'confidence': 1.0},
+                                      {'nlu': 0.001})
+        recognizer.close()
+        record, = read_records(path)
+        assert (record['intent'], record['confidence']) == ('saludo', 1.0)
+        assert record['latency_ms'] == {'nlu': 1.0}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,105 @@
+"""
+Tests for the TTS rendering cache.
+"""
+import pytest
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tts.cache import STALE_TEMP_SECONDS, TTSCache
+
+
+def render(cache: TTSCache, key: str, size: int) -> str:
+    """Write a fake rendering of the given size and cache it."""
+    temp_path = cache.temp_path_for(key)
+    with open(temp_path, 'wb') as f:
+        f.write(b'\x00' * size)
+    return cache.put(key, temp_path)
+
+
+class TestTTSCache:
+    """Test cases for TTSCache."""
+    
+    def test_key_depends_on_voice_settings(self):
+        """Test keys change with text, voice, rate and volume."""
+        key = TTSCache.make_key("Luz encendida", "es", 150, 0.9)
+        assert key == TTSCache.make_key("Luz encendida", "es", 150, 0.9)
+        assert key != TTSCache.make_key("Luz apagada", "es", 150, 0.9)
+        assert key != TTSCache.make_key("Luz encendida", "en", 150, 0.9)
+        assert key != TTSCache.make_key("Luz encendida", "es", 200, 0.9)
+        assert key != TTSCache.make_key("Luz encendida", "es", 150, 0.5)
+    
+    def test_hit_and_miss(self, tmp_path):
+        """Test cached renderings are found and missing ones are not."""
+        cache = TTSCache(str(tmp_path), max_bytes=1000)
+        assert cache.get('a') is None
+        path = render(cache, 'a', 100)
+        assert cache.get('a') == path
+        assert os.path.exists(path)
+        assert cache.total_bytes == 100
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test the least recently used rendering is evicted first."""
+        cache = TTSCache(str(tmp_path), max_bytes=250)
+        render(cache, 'a', 100)
+        render(cache, 'b', 100)
+        cache.get('a')
+        render(cache, 'c', 100)
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert cache.total_bytes == 200
+        assert not os.path.exists(cache.path_for('b'))
+    
+    def test_oversized_rendering_not_cached(self, tmp_path):
+        """Test renderings bigger than the bound are dropped."""
+        cache = TTSCache(str(tmp_path), max_bytes=50)
+        assert render(cache, 'big', 100) is None
+        assert len(cache) == 0
+    
+    def test_reload_keeps_lru_order(self, tmp_path):
+        """Test a new cache instance indexes existing files in LRU order."""
+        cache = TTSCache(str(tmp_path), max_bytes=1000)
+        render(cache, 'a', 100)
+        render(cache, 'b', 100)
+        os.utime(cache.path_for('a'), (time.time() + 10, time.time() + 10))
+        
+        reloaded = TTSCache(str(tmp_path), max_bytes=150)
+        assert 'a' in reloaded
+        assert 'b' not in reloaded
+    
+    def test_reload_removes_partial_renderings(self, tmp_path):
+        """Test temp files left by a crash are not indexed as entries."""
+        cache = TTSCache(str(tmp_path), max_bytes=1000)
+        render(cache, 'a', 100)
+        stale = cache.temp_path_for('b')
+        with open(stale, 'wb') as f:
+            f.write(b'\x00' * 500)
+        old = time.time() - STALE_TEMP_SECONDS - 10
+        os.utime(stale, (old, old))
+        
+        reloaded = TTSCache(str(tmp_path), max_bytes=1000)
+        assert len(reloaded) == 1 and 'a' in reloaded
+        assert reloaded.total_bytes == 100
+        assert os.listdir(tmp_path) == [os.path.basename(cache.path_for('a'))]
+    
+    def test_reload_keeps_renderings_in_progress(self, tmp_path):
+        """Test another process's recent temp file is left alone."""
+        cache = TTSCache(str(tmp_path), max_bytes=1000)
+        temp_path = cache.temp_path_for('a')
+        assert str(os.getpid()) in os.path.basename(temp_path)
+        with open(temp_path, 'wb') as f:
+            f.write(b'\x00' * 100)
+        
+        reloaded = TTSCache(str(tmp_path), max_bytes=1000)
+        assert len(reloaded) == 0
+        assert os.path.exists(temp_path)
+        assert reloaded.put('a', temp_path) == reloaded.path_for('a')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
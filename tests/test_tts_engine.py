@@ -0,0 +1,91 @@
+"""
+Tests for cached rendering in the TTS engine.
+"""
+import pytest
+import os
+import sys
+import wave
+from pathlib import Path
+
+pytest.importorskip("numpy")
+pytest.importorskip("pyttsx3")
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tts.tts_engine import TTSEngine
+
+
+class FakeDriver:
+    """pyttsx3 engine stand-in rendering a short WAV per save_to_file."""
+
+    def __init__(self, frames=100, on_render=None):
+        self.frames = frames
+        self.on_render = on_render
+        self.said = []
+        self._queued = []
+
+    def say(self, text):
+        self.said.append(text)
+
+    def save_to_file(self, text, filename):
+        self._queued.append(filename)
+
+    def runAndWait(self):
+        for filename in self._queued:
+            with wave.open(filename, 'wb') as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(22050)
+                wf.writeframes(b'\x00\x00' * self.frames)
+            if self.on_render is not None:
+                self.on_render()
+        self._queued = []
+
+    def stop(self):
+        pass
+
+
+def make_engine(tmp_path, driver, max_bytes=1024 * 1024):
+    """TTSEngine with a fake driver and playback recording the played files."""
+    tts = TTSEngine(cache_dir=str(tmp_path), cache_max_bytes=max_bytes)
+    tts.engine = driver
+    tts.played = []
+    tts._play_file = lambda path: tts.played.append(os.path.exists(path)) or True
+    return tts
+
+
+class TestTTSEngineCache:
+    """Test cases for TTSEngine with a rendering cache."""
+
+    def test_rendering_is_cached(self, tmp_path):
+        """Test a miss is rendered once and then played from the cache."""
+        tts = make_engine(tmp_path, FakeDriver())
+        assert tts.speak("Luz encendida")
+        assert tts.speak("Luz encendida")
+        assert tts.played == [True, True]
+        assert len(tts.cache) == 1
+        assert tts.engine.said == []
+
+    def test_interrupted_rendering_is_discarded(self, tmp_path):
+        """Test a rendering cut short by stop() is neither cached nor played."""
+        tts = make_engine(tmp_path, None)
+        tts.engine = FakeDriver(on_render=tts.stop)
+        assert tts.speak("Luz encendida") is False
+        assert tts.played == []
+        assert tts.engine.said == []
+        assert len(tts.cache) == 0
+        assert os.listdir(tmp_path) == []
+
+    def test_oversized_rendering_is_played_once(self, tmp_path):
+        """Test a rendering too large to cache is played without synthesizing again."""
+        tts = make_engine(tmp_path, FakeDriver(frames=1000), max_bytes=100)
+        assert tts.speak("Luz encendida")
+        assert tts.played == [True]
+        assert tts.engine.said == []
+        assert len(tts.cache) == 0
+        assert os.listdir(tmp_path) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
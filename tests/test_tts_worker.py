@@ -0,0 +1,120 @@
+"""
+Tests for the asynchronous TTS worker.
+"""
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tts.worker import TTSWorker
+
+
+class FakeEngine:
+    """Stand-in for TTSEngine; speech lasts until released or stopped."""
+    
+    def __init__(self, blocking: bool = False):
+        self.spoken = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not blocking:
+            self.release.set()
+    
+    def speak(self, text):
+        self.started.set()
+        self.release.wait(5)
+        self.spoken.append(text)
+        return True
+    
+    def stop(self):
+        self.release.set()
+
+
+class TestTTSWorker:
+    """Test cases for TTSWorker."""
+    
+    def test_submit_returns_immediately(self):
+        """Test submit doesn't wait for speech and the handle completes."""
+        engine = FakeEngine(blocking=True)
+        worker = TTSWorker(lambda: engine)
+        handle = worker.submit("Luz encendida")
+        assert engine.started.wait(2)
+        assert not handle.done()
+        engine.release.set()
+        assert handle.wait(2) is True
+        worker.shutdown()
+        assert engine.spoken == ["Luz encendida"]
+    
+    def test_priority_order(self):
+        """Test higher priorities are spoken first, FIFO within a priority."""
+        engine = FakeEngine(blocking=True)
+        worker = TTSWorker(lambda: engine)
+        worker.submit("first")
+        assert engine.started.wait(2)
+        worker.submit("low", priority=0)
+        worker.submit("high", priority=5)
+        worker.submit("low2", priority=0)
+        engine.release.set()
+        assert worker.wait_idle(2)
+        worker.shutdown()
+        assert engine.spoken == ["first", "high", "low", "low2"]
+    
+    def test_barge_in(self):
+        """Test interrupt cancels pending speech and stops the current one."""
+        engine = FakeEngine(blocking=True)
+        worker = TTSWorker(lambda: engine)
+        current = worker.submit("stale")
+        assert engine.started.wait(2)
+        pending = worker.submit("also stale")
+        fresh = worker.submit("new response", interrupt=True)
+        assert current.wait(2) is False
+        assert current.future.done() and current.interrupted
+        assert pending.cancelled()
+        assert fresh.wait(2) is True
+        worker.shutdown()
+        assert engine.spoken == ["stale", "new response"]
+    
+    def test_bounded_queue_drops_oldest_low_priority(self):
+        """Test a full queue drops the oldest lowest-priority utterance."""
+        engine = FakeEngine(blocking=True)
+        worker = TTSWorker(lambda: engine, max_queue=2)
+        worker.submit("speaking")
+        assert engine.started.wait(2)
+        a = worker.submit("a")
+        b = worker.submit("b")
+        c = worker.submit("c")
+        assert a.cancelled()
+        assert not b.cancelled() and not c.cancelled()
+        assert worker.pending == 2
+        
+        urgent = worker.submit("urgent", priority=1)
+        rejected = worker.submit("ignored", priority=-1)
+        assert b.cancelled()
+        assert rejected.cancelled()
+        assert not urgent.cancelled()
+        worker.shutdown(cancel_pending=True)
+    
+    def test_cancel_pending_handle(self):
+        """Test a queued utterance can be cancelled through its handle."""
+        engine = FakeEngine(blocking=True)
+        worker = TTSWorker(lambda: engine)
+        worker.submit("speaking")
+        assert engine.started.wait(2)
+        handle = worker.submit("later")
+        assert handle.cancel()
+        assert worker.pending == 0
+        engine.release.set()
+        worker.shutdown()
+        assert engine.spoken == ["speaking"]
+    
+    def test_submit_after_shutdown(self):
+        """Test utterances submitted after shutdown are cancelled."""
+        worker = TTSWorker(FakeEngine)
+        worker.shutdown()
+        assert worker.submit("late").cancelled()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
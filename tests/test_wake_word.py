@@ -0,0 +1,135 @@
+"""
+Tests for the two-stage wake-word detector.
+"""
+import json
+import pytest
+import sys
+from pathlib import Path
+
+np = pytest.importorskip("numpy")
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from asr.wake_word import WakeWordDetector, wake_grammar
+from asr.waveform import accept_waveform
+from utils.capture import AudioCapture
+
+SAMPLE_RATE = 16000
+BLOCK = 1600
+
+
+class FakeRecognizer:
+    """Grammar recognizer stand-in that 'hears' the phrase after some audio."""
+
+    def __init__(self, phrase="oye asistente", after_bytes=16000):
+        self.phrase = phrase
+        self.after_bytes = after_bytes
+        self.received = 0
+        self.fed = 0
+        self.resets = 0
+
+    def AcceptWaveform(self, data):
+        assert isinstance(data, bytes)
+        self.received += len(data)
+        self.fed += len(data)
+        return False
+
+    def PartialResult(self):
+        text = self.phrase if self.received >= self.after_bytes else ""
+        return json.dumps({'partial': text})
+
+    def Result(self):
+        return json.dumps({'text': ""})
+
+    def Reset(self):
+        self.received = 0
+        self.resets += 1
+
+
+def speech(seconds):
+    """Voiced, speech-loud samples."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (8000 * np.sin(2 * np.pi * 150 * t)).astype(np.int16)
+
+
+def feed(detector, capture, audio):
+    """Push audio block by block; return the first detection position."""
+    for start in range(0, len(audio), BLOCK):
+        block = audio[start:start + BLOCK]
+        begin = capture.position
+        capture._callback(block.reshape(-1, 1), len(block), None, None)
+        detected = detector.process(capture, begin, capture.position)
+        if detected is not None:
+            return detected
+    return None
+
+
+class TestWakeWord:
+    """Test cases for the voice activity gate and phrase spotting."""
+
+    def test_grammar(self):
+        """Test the grammar lists the phrases plus the unknown word."""
+        assert json.loads(wake_grammar(["Oye Asistente"])) == ["oye asistente", "[unk]"]
+
+    def test_silence_is_not_decoded(self):
+        """Test the gate keeps silence away from the recognizer."""
+        recognizer = FakeRecognizer(after_bytes=0)
+        detector = WakeWordDetector(recognizer, ["oye asistente"], sample_rate=SAMPLE_RATE)
+        capture = AudioCapture(sample_rate=SAMPLE_RATE)
+        assert feed(detector, capture, np.zeros(SAMPLE_RATE * 5, dtype=np.int16)) is None
+        assert recognizer.fed == 0
+        assert detector.decoded_fraction == 0.0
+        assert detector.stats()['seconds_seen'] == 5.0
+
+    def test_detection_position(self):
+        """Test a phrase heard in speech returns the position after it."""
+        recognizer = FakeRecognizer(after_bytes=SAMPLE_RATE)
+        detector = WakeWordDetector(recognizer, ["Oye asistente"], sample_rate=SAMPLE_RATE,
+                                    preroll=0.2)
+        capture = AudioCapture(sample_rate=SAMPLE_RATE)
+        audio = np.concatenate((np.zeros(SAMPLE_RATE, dtype=np.int16), speech(2.0)))
+        position = feed(detector, capture, audio)
+        # Fed from the pre-roll before the speech until the phrase was heard
+        assert position == SAMPLE_RATE - int(0.2 * SAMPLE_RATE) + SAMPLE_RATE // 2
+        assert detector.detections == 1
+        assert 0 < detector.decoded_fraction < 1
+
+    def test_gate_closes_after_hangover(self):
+        """Test speech without the phrase resets the recognizer."""
+        recognizer = FakeRecognizer(phrase="enciende la luz", after_bytes=0)
+        detector = WakeWordDetector(recognizer, ["oye asistente"], sample_rate=SAMPLE_RATE,
+                                    hangover=0.3)
+        capture = AudioCapture(sample_rate=SAMPLE_RATE)
+        resets = recognizer.resets
+        audio = np.concatenate((speech(0.5), np.zeros(SAMPLE_RATE * 2, dtype=np.int16)))
+        assert feed(detector, capture, audio) is None
+        assert recognizer.resets == resets + 1
+        assert detector._fed is None
+        decoded = recognizer.fed
+        assert feed(detector, capture, np.zeros(SAMPLE_RATE, dtype=np.int16)) is None
+        assert recognizer.fed == decoded
+
+    def test_block_remainders_are_examined(self):
+        """Test speech in the partial frame at the end of a block opens the gate."""
+        recognizer = FakeRecognizer(after_bytes=SAMPLE_RATE * 10)
+        detector = WakeWordDetector(recognizer, ["oye asistente"], sample_rate=SAMPLE_RATE)
+        capture = AudioCapture(sample_rate=SAMPLE_RATE)
+        # 1600-sample blocks hold three 480-sample frames and 160 samples more;
+        # the burst fills only that remainder of the sixth block
+        audio = np.zeros(BLOCK * 8, dtype=np.int16)
+        audio[6 * BLOCK - 160:6 * BLOCK] = speech(0.01)
+        assert feed(detector, capture, audio) is None
+        assert recognizer.fed > 0
+        assert detector._examined == len(audio) - len(audio) % detector.frame_length
+
+    def test_accept_waveform_without_handle(self):
+        """Test buffers are copied to bytes for recognizers without a C handle."""
+        recognizer = FakeRecognizer()
+        accept_waveform(recognizer, memoryview(speech(0.1)))
+        accept_waveform(recognizer, b"\x00\x00" * 10)
+        assert recognizer.fed == 2 * BLOCK + 20
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])